@@ -4,6 +4,7 @@
 负责：
 1. 市场数据更新任务
 2. 特朗普情绪分析任务
+3. 适配器连接池空闲回收任务
 """
 
 import logging
@@ -67,6 +68,25 @@ def update_markets_in_background():
         logger.info(f"✅ 市场数据预热完成: 更新 {updated_count} 个交易所")
 
 
+def evict_idle_adapters_in_background(interval: int = 60):
+    """
+    后台线程定期回收空闲的池化适配器
+    
+    Args:
+        interval: 检查间隔（秒）
+    """
+    from exchange_adapters import evict_idle_adapters
+    
+    while True:
+        time.sleep(interval)
+        try:
+            evicted = evict_idle_adapters()
+            if evicted:
+                logger.info(f"🧹 已回收 {evicted} 个空闲适配器实例")
+        except Exception as e:
+            logger.error(f"❌ 适配器回收失败: {e}")
+
+
 def trump_sentiment_background_task():
     """
     特朗普情绪分析后台任务
@@ -138,6 +158,14 @@ def start_background_tasks():
     )
     update_thread.start()
     
+    # 启动适配器连接池回收线程
+    evict_thread = threading.Thread(
+        target=evict_idle_adapters_in_background,
+        daemon=True,
+        name="AdapterPoolEvictor"
+    )
+    evict_thread.start()
+    
     # 启动特朗普情绪分析后台任务
     trump_thread = threading.Thread(
         target=trump_sentiment_background_task,
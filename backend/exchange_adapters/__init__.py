@@ -14,8 +14,14 @@
 - BackpackAdapter: 继承 AdapterInterface，完全自定义（非 CCXT）
 """
 
+import hashlib
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Tuple
+
 from .adapter_interface import AdapterInterface, AdapterCapability, NotImplementedByAdapter
-from .default_adapter import DefaultAdapter
+from .default_adapter import DefaultAdapter, fetch_balances_parallel
 from .binance_adapter import BinanceAdapter
 from .gate_adapter import GateAdapter
 from .okx_adapter import OKXAdapter
@@ -105,6 +111,130 @@ def get_adapter(exchange_id: str, market_type: str, config: dict) -> AdapterInte
     )
 
 
+# ==================== 适配器连接池 ====================
+
+# 轮询接口（价格/持仓/K线/连通性测试）复用已初始化的适配器实例，
+# 避免每次请求都重新构造 ccxt 实例、加载市场数据和建立 TLS 连接
+# {(exchange_id, market_type, 凭证哈希): (最后使用时间, 适配器实例)}
+#
+# ⚠️ 池化实例会被多个线程（线程池、asyncio.to_thread）同时拿到，
+# 非线程安全的实例带有调用锁，调用方必须通过 adapter_lock() / call_locked() 访问交易所
+_ADAPTER_POOL: Dict[tuple, Tuple[float, AdapterInterface]] = {}
+_ADAPTER_POOL_LOCK = threading.Lock()
+ADAPTER_POOL_IDLE_TTL = 600  # 空闲超过 10 分钟的实例会被后台任务回收
+
+
+def _pool_key(exchange_id: str, market_type: str, config: dict) -> tuple:
+    """连接池键：凭证和代理只以哈希形式参与，不在内存中保留明文副本"""
+    digest = hashlib.blake2s(digest_size=8)
+    for field in ('apiKey', 'secret', 'password'):
+        digest.update(str(config.get(field) or '').encode())
+        digest.update(b'\0')
+    digest.update(repr(sorted((config.get('proxies') or {}).items())).encode())
+    return (exchange_id.lower(), market_type, digest.hexdigest())
+
+
+def get_pooled_adapter(exchange_id: str, market_type: str, config: dict) -> AdapterInterface:
+    """
+    获取池化的适配器实例（相同交易所 + 市场类型 + 凭证复用同一实例）
+    
+    与 get_adapter 参数相同；get_adapter 仍然每次创建新实例，
+    需要独立实例的场景（如单元测试、一次性脚本）继续使用 get_adapter
+    
+    Args:
+        exchange_id: 交易所 ID
+        market_type: 市场类型 ('spot' 或 'futures')
+        config: 交易所配置 (apiKey, secret, proxies 等)
+    
+    Returns:
+        交易所适配器实例（与其他线程共享，调用交易所接口时需持有 adapter_lock(adapter)）
+    """
+    key = _pool_key(exchange_id, market_type, config)
+    now = time.time()
+    
+    with _ADAPTER_POOL_LOCK:
+        entry = _ADAPTER_POOL.get(key)
+        if entry is not None:
+            _ADAPTER_POOL[key] = (now, entry[1])
+            return entry[1]
+    
+    # 在锁外构造，避免慢速初始化阻塞其他交易所的请求
+    adapter = get_adapter(exchange_id, market_type, config)
+    if not adapter.thread_safe:
+        adapter._pool_lock = threading.RLock()
+    
+    with _ADAPTER_POOL_LOCK:
+        # 并发构造时以先入池的实例为准
+        entry = _ADAPTER_POOL.setdefault(key, (now, adapter))
+        return entry[1]
+
+
+def adapter_lock(adapter: AdapterInterface) -> ContextManager:
+    """
+    获取适配器的调用锁（上下文管理器）
+    
+    池化的非线程安全实例返回该实例独占的可重入锁；
+    get_adapter 创建的独立实例和线程安全的实例返回空上下文
+    
+    示例：
+        adapter = get_pooled_adapter('binance', 'spot', config)
+        with adapter_lock(adapter):
+            adapter.fetch_balance()
+    """
+    return adapter.__dict__.get('_pool_lock') or nullcontext()
+
+
+def call_locked(adapter: AdapterInterface, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """持有 adapter_lock(adapter) 调用 func（便于传给 run_in_executor / asyncio.to_thread）"""
+    with adapter_lock(adapter):
+        return func(*args, **kwargs)
+
+
+def evict_adapter(exchange_id: str, market_type: str, config: dict) -> bool:
+    """
+    从连接池移除指定凭证的适配器（如凭证失效后，下次请求重新创建）
+    
+    Returns:
+        是否移除了实例
+    """
+    key = _pool_key(exchange_id, market_type, config)
+    with _ADAPTER_POOL_LOCK:
+        return _ADAPTER_POOL.pop(key, None) is not None
+
+
+def evict_exchange_adapters(exchange_id: str) -> int:
+    """
+    从连接池移除某个交易所的全部适配器（如轮换 API Key 后）
+    
+    Returns:
+        移除的实例数量
+    """
+    exchange_id = exchange_id.lower()
+    with _ADAPTER_POOL_LOCK:
+        keys = [key for key in _ADAPTER_POOL if key[0] == exchange_id]
+        for key in keys:
+            del _ADAPTER_POOL[key]
+    return len(keys)
+
+
+def evict_idle_adapters(max_idle: float = ADAPTER_POOL_IDLE_TTL) -> int:
+    """
+    回收空闲超时的池化适配器
+    
+    Args:
+        max_idle: 最大空闲时间（秒）
+    
+    Returns:
+        回收的实例数量
+    """
+    cutoff = time.time() - max_idle
+    with _ADAPTER_POOL_LOCK:
+        stale = [key for key, (last_used, _) in _ADAPTER_POOL.items() if last_used < cutoff]
+        for key in stale:
+            del _ADAPTER_POOL[key]
+    return len(stale)
+
+
 def list_supported_exchanges() -> dict:
     """
     列出所有支持的交易所
@@ -153,6 +283,12 @@ __all__ = [
     
     # 工具函数
     'get_adapter',
+    'get_pooled_adapter',
+    'adapter_lock',
+    'call_locked',
+    'evict_adapter',
+    'evict_exchange_adapters',
+    'evict_idle_adapters',
     'list_supported_exchanges',
     'is_exchange_supported',
     
@@ -63,6 +63,13 @@ class AdapterInterface(ABC):
     - BackpackAdapter 等特殊交易所直接继承此接口，完全自定义
     """
     
+    # 支持的功能（静态，子类在类级别声明）
+    _supported_capabilities: frozenset = frozenset()
+    
+    # 实例能否被多个线程同时调用；CCXT 同步实例不是线程安全的（限频时间戳、
+    # 延迟加载市场数据、nonce 签名都会竞争），池化时由 adapter_lock() 串行化
+    thread_safe: bool = False
+    
     def __init__(self, market_type: str, config: dict):
         """
         初始化适配器
@@ -78,9 +85,6 @@ class AdapterInterface(ABC):
         self.market_type = market_type
         self.config = config
         self.exchange_id = self._get_exchange_id()
-        
-        # 子类声明支持的功能
-        self._supported_capabilities: set = set()
     
     # ==================== 抽象方法（子类必须实现） ====================
     
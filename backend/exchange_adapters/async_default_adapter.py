@@ -0,0 +1,327 @@
+"""
+异步默认适配器（基于 ccxt.async_support）
+
+用于大量交易对 / 多交易所的行情扫描：
+- 同步 DefaultAdapter 每个请求占用一个线程
+- 这里所有请求都在同一个事件循环中并发执行，共享一个 aiohttp 连接池
+
+只实现 I/O 密集的行情/持仓查询接口，下单等功能仍使用同步 DefaultAdapter
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import ccxt.async_support as ccxt_async
+
+from . import ADAPTER_POOL_IDLE_TTL, CUSTOM_ADAPTERS, _pool_key
+from .default_adapter import DefaultAdapter, get_market_cache
+
+logger = logging.getLogger(__name__)
+
+# 每个事件循环一个共享 aiohttp 会话（aiohttp 会话不能跨事件循环使用）
+_shared_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_session_guards: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+# 每个事件循环内复用的异步适配器：{事件循环: {连接池键: (最后使用时间, 适配器)}}
+# 与同步适配器池一样，空闲超过 ADAPTER_POOL_IDLE_TTL 的实例会被回收
+_shared_adapters: Dict[asyncio.AbstractEventLoop, Dict[tuple, Tuple[float, 'AsyncDefaultAdapter']]] = {}
+
+# 正在关闭被回收实例的任务（保留引用，避免任务被垃圾回收）
+_closing_tasks: set = set()
+
+
+def get_shared_aiohttp_session() -> aiohttp.ClientSession:
+    """获取当前事件循环的共享 aiohttp 会话（keep-alive 连接池）"""
+    loop = asyncio.get_running_loop()
+    session = _shared_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        session = aiohttp.ClientSession(connector=connector, trust_env=False)
+        _shared_sessions[loop] = session
+        # 事件循环结束时（asyncio.run / uvicorn 退出会取消所有剩余任务）自动关闭会话
+        _session_guards[loop] = loop.create_task(_close_session_on_cancel(loop, session))
+        logger.info("✅ 初始化 CCXT 异步共享 HTTP 会话")
+    return session
+
+
+async def _close_session_on_cancel(loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
+    """常驻任务：被取消时关闭共享会话，避免事件循环退出后遗留未关闭的连接"""
+    try:
+        await asyncio.Event().wait()
+    finally:
+        if _shared_sessions.get(loop) is session:
+            del _shared_sessions[loop]
+        _session_guards.pop(loop, None)
+        await _close_adapters(adapter for _, adapter in _shared_adapters.pop(loop, {}).values())
+        if not session.closed:
+            await session.close()
+
+
+def get_shared_async_adapter(exchange_id: str, market_type: str, config: dict) -> 'AsyncDefaultAdapter':
+    """
+    获取当前事件循环内复用的异步适配器（相同交易所 + 市场类型 + 凭证/代理共用一个实例）
+
+    每次请求新建再关闭实例需要重新构建 CCXT 对象和市场数据；
+    复用的实例由 close_shared_aiohttp_session() 统一关闭，调用方不要自行 close()；
+    空闲超过 ADAPTER_POOL_IDLE_TTL 的实例在之后的调用中被回收并在后台关闭
+    """
+    loop = asyncio.get_running_loop()
+    adapters = _shared_adapters.setdefault(loop, {})
+    now = time.time()
+    _evict_idle_async_adapters(loop, adapters, now)
+    
+    key = _pool_key(exchange_id, market_type, config)
+    entry = adapters.get(key)
+    adapter = entry[1] if entry else None
+    # 共享会话被关闭重建后，旧实例仍指向已关闭的会话，需要重新创建
+    if adapter is None or adapter.exchange.session is not get_shared_aiohttp_session():
+        adapter = AsyncDefaultAdapter(exchange_id, market_type, config)
+    adapters[key] = (now, adapter)
+    return adapter
+
+
+def _evict_idle_async_adapters(
+    loop: asyncio.AbstractEventLoop,
+    adapters: Dict[tuple, Tuple[float, 'AsyncDefaultAdapter']],
+    now: float,
+    max_idle: float = ADAPTER_POOL_IDLE_TTL
+) -> int:
+    """
+    回收空闲超过 max_idle 秒的异步适配器，并在事件循环中后台关闭
+
+    Returns:
+        回收的实例数量
+    """
+    cutoff = now - max_idle
+    stale = [key for key, (last_used, _) in adapters.items() if last_used < cutoff]
+    if not stale:
+        return 0
+    
+    task = loop.create_task(_close_adapters([adapters.pop(key)[1] for key in stale]))
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+    logger.info(f"🧹 回收 {len(stale)} 个空闲异步适配器")
+    return len(stale)
+
+
+async def _close_adapters(adapters: Iterable['AsyncDefaultAdapter']):
+    """关闭一组复用的异步适配器"""
+    for adapter in adapters:
+        try:
+            await adapter.close()
+        except Exception as e:
+            logger.warning(f"⚠️ 关闭 {adapter.exchange_id} 异步适配器失败: {e}")
+
+
+async def close_shared_aiohttp_session():
+    """关闭当前事件循环复用的异步适配器和共享 aiohttp 会话（应用关闭时调用）"""
+    loop = asyncio.get_running_loop()
+    await _close_adapters(adapter for _, adapter in _shared_adapters.pop(loop, {}).values())
+    session = _shared_sessions.pop(loop, None)
+    guard = _session_guards.pop(loop, None)
+    if guard is not None:
+        guard.cancel()
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class AsyncDefaultAdapter:
+    """
+    异步默认适配器（基于 ccxt.async_support）
+
+    与 DefaultAdapter 返回相同的数据格式，方法均为协程。
+    需要在事件循环中创建和使用，用完调用 close()（或使用 async with）
+
+    示例：
+        async with AsyncDefaultAdapter('binance', 'spot', config) as adapter:
+            prices = await adapter.fetch_prices(['BTC/USDT', 'ETH/USDT'])
+    """
+
+    def __init__(self, exchange_id: str, market_type: str, config: dict):
+        """
+        初始化异步适配器
+
+        Args:
+            exchange_id: 交易所 ID（如 'binance', 'okx'）
+            market_type: 市场类型 ('spot' 或 'futures')
+            config: 交易所配置
+        """
+        if not hasattr(ccxt_async, exchange_id):
+            raise ValueError(f"CCXT 不支持交易所: {exchange_id}")
+
+        self.exchange_id = exchange_id
+        self.market_type = market_type
+        self.config = config
+        self._market_cache = get_market_cache()
+
+        # 模板、限频间隔和 defaultType 与同步适配器同源（含子类覆盖，如币安合约为 'future'）
+        adapter_class = CUSTOM_ADAPTERS.get(exchange_id, DefaultAdapter)
+        if not issubclass(adapter_class, DefaultAdapter):
+            adapter_class = DefaultAdapter
+        exchange_config = adapter_class._base_exchange_config(exchange_id, market_type, config)
+        exchange_config['session'] = get_shared_aiohttp_session()  # 🔗 复用共享连接池
+        exchange_config['timeout_on_exit'] = 0  # close() 默认会额外等待 250ms
+        if 'password' in config:
+            exchange_config['password'] = config['password']
+        if 'proxies' in config:
+            # aiohttp 只支持单个 HTTP 代理
+            exchange_config['aiohttp_proxy'] = config['proxies'].get('https') or config['proxies'].get('http')
+
+        self.exchange = getattr(ccxt_async, exchange_id)(exchange_config)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """释放交易所实例（共享会话不会被关闭）"""
+        await self.exchange.close()
+
+    async def load_markets(self) -> Dict[str, Any]:
+        """加载市场数据（优先使用与同步适配器共享的 MarketCache）"""
+        if self.exchange.markets:
+            return self.exchange.markets
+
+        from util.market_cache import apply_cached_markets
+
+        cached_markets = self._market_cache.load_from_cache(self.exchange_id)
+        if cached_markets:
+            apply_cached_markets(self.exchange, cached_markets)
+            return self.exchange.markets
+
+        markets = await self.exchange.load_markets()
+        self._market_cache.save_to_cache(self.exchange_id, markets)
+        return markets
+
+    # ==================== 行情接口 ====================
+
+    @staticmethod
+    def _format_price(ticker: Dict) -> Dict[str, Any]:
+        """将 CCXT ticker 转换为 {last, bid, ask, mark} 价格格式"""
+        last = float(ticker.get('last') or 0)
+        return {
+            'last': last,
+            'bid': float(ticker.get('bid') or 0),
+            'ask': float(ticker.get('ask') or 0),
+            'mark': last  # 现货无标记价格，用 last 代替
+        }
+
+    async def fetch_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取交易对价格
+
+        支持 fetchTickers 时一次请求获取；否则并发请求每个交易对
+        """
+        await self.load_markets()
+        empty = {'last': 0, 'bid': 0, 'ask': 0, 'mark': 0}
+
+        if symbols and self.exchange.has.get('fetchTickers'):
+            try:
+                tickers = await self.exchange.fetch_tickers(symbols)
+                return {
+                    symbol: self._format_price(tickers[symbol]) if symbol in tickers else dict(empty)
+                    for symbol in symbols
+                }
+            except Exception as e:
+                logger.warning(f"⚠️ {self.exchange_id} 批量获取价格失败，回退到并发逐个查询: {e}")
+
+        results = await asyncio.gather(
+            *(self.exchange.fetch_ticker(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+
+        prices = {}
+        for symbol, ticker in zip(symbols, results):
+            if isinstance(ticker, Exception):
+                logger.warning(f"❌ 获取 {symbol} 价格失败: {ticker}")
+                prices[symbol] = dict(empty)
+            else:
+                prices[symbol] = self._format_price(ticker)
+        return prices
+
+    async def fetch_klines(
+        self,
+        symbol: str,
+        interval: str = '15m',
+        limit: int = 100,
+        since: Optional[int] = None
+    ) -> List[List[Any]]:
+        """获取 K线数据，失败返回空列表"""
+        try:
+            await self.load_markets()
+            return await self.exchange.fetch_ohlcv(symbol, timeframe=interval, since=since, limit=limit)
+        except Exception as e:
+            logger.error(f"❌ {self.exchange_id} 获取K线失败 {symbol}/{interval}: {e}")
+            return []
+
+    async def fetch_klines_many(
+        self,
+        symbols: List[str],
+        interval: str = '15m',
+        limit: int = 100
+    ) -> Dict[str, List[List[Any]]]:
+        """并发获取多个交易对的 K线数据（CCXT 限频器仍然生效）"""
+        await self.load_markets()
+        results = await asyncio.gather(
+            *(self.fetch_klines(symbol, interval, limit) for symbol in symbols)
+        )
+        return dict(zip(symbols, results))
+
+    # ==================== 持仓接口 ====================
+
+    async def fetch_positions(self, symbols: Optional[List[str]] = None) -> List[Dict]:
+        """
+        获取持仓/余额（格式与 DefaultAdapter.fetch_positions 一致）
+        """
+        try:
+            if self.market_type == 'spot':
+                balance = await self.exchange.fetch_balance()
+                positions = []
+                for currency, amounts in balance.items():
+                    if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
+                        continue
+                    total = float(amounts.get('total') or 0)
+                    if total > 0:
+                        positions.append({
+                            'exchange': self.exchange_id,
+                            'type': 'spot',
+                            'symbol': currency,
+                            'free': float(amounts.get('free') or 0),
+                            'used': float(amounts.get('used') or 0),
+                            'total': total,
+                        })
+                return positions
+
+            await self.load_markets()
+            positions = []
+            for pos in await self.exchange.fetch_positions(symbols):
+                contracts = float(pos.get('contracts') or 0)
+                if contracts != 0:  # 只返回有持仓的
+                    positions.append({
+                        'exchange': self.exchange_id,
+                        'type': 'futures',
+                        'symbol': pos.get('symbol', ''),
+                        'side': pos.get('side', ''),
+                        'contracts': contracts,
+                        'contractSize': float(pos.get('contractSize') or 1),
+                        'entryPrice': float(pos.get('entryPrice') or 0),
+                        'markPrice': float(pos.get('markPrice') or 0),
+                        'unrealizedPnl': float(pos.get('unrealizedPnl') or 0),
+                        'leverage': float(pos.get('leverage') or 1),
+                        'marginType': pos.get('marginType', 'cross'),
+                    })
+            return positions
+        except Exception as e:
+            logger.error(f"❌ {self.exchange_id} 获取{self.market_type}持仓失败: {e}")
+            return []
@@ -17,6 +17,7 @@ import logging
 import base64
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
+import ccxt
 import requests
 from decimal import Decimal, ROUND_DOWN
 
@@ -25,12 +26,33 @@ try:
     HAS_CRYPTO = True
 except ImportError:
     HAS_CRYPTO = False
+
+# 可选：orjson 解析大响应（如订单历史）更快，未安装时回退到标准库 json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
     
 from .adapter_interface import AdapterInterface, AdapterCapability
+from .default_adapter import get_shared_session, RATE_LIMIT_ERRORS
 
 logger = logging.getLogger(__name__)
 
 
+# 交易对格式转换表：标准格式 BTC/USDC <-> Backpack 格式 BTC_USDC
+_SLASH_TO_UNDER = str.maketrans('/', '_')
+_UNDER_TO_SLASH = str.maketrans('_', '/')
+
+# 订单方向标准化：Backpack 使用 Bid/Ask，统一为 buy/sell
+_SIDE_MAP = {'buy': 'buy', 'bid': 'buy', 'sell': 'sell', 'ask': 'sell'}
+
+
+def _safe_float(value, default=0):
+    """安全转换为 float（模块级函数，订单标准化热路径上避免方法查找）"""
+    return float(value) if value is not None else default
+
+
 class BackpackAdapter(AdapterInterface):
     """
     Backpack 交易所适配器（非 CCXT）
@@ -42,6 +64,9 @@ class BackpackAdapter(AdapterInterface):
         - 直接继承 AdapterInterface，完全自定义实现
     """
     
+    # 初始化后不再修改实例状态，每个请求独立签名，可被多个线程同时调用
+    thread_safe = True
+    
     # Instruction 类型映射（根据官方文档）
     INSTRUCTION_MAP = {
         'balanceQuery': 'balanceQuery',
@@ -57,6 +82,19 @@ class BackpackAdapter(AdapterInterface):
         'withdrawalQueryAll': 'withdrawalQueryAll',
     }
     
+    # 声明支持的功能
+    _supported_capabilities = frozenset({
+        AdapterCapability.TEST_CONNECTIVITY,
+        AdapterCapability.LOAD_MARKETS,
+        AdapterCapability.FETCH_OHLCV,
+        AdapterCapability.FETCH_PRICES,
+        AdapterCapability.FETCH_SPOT_BALANCE,
+        AdapterCapability.FETCH_FUTURES_POSITIONS,
+        AdapterCapability.FETCH_SPOT_ORDERS,
+        AdapterCapability.FETCH_FUTURES_ORDERS,
+        AdapterCapability.CREATE_ORDER,
+    })
+    
     def __init__(self, market_type: str, config: dict):
         """
         初始化 Backpack 适配器
@@ -100,8 +138,8 @@ class BackpackAdapter(AdapterInterface):
         # Backpack API 基础 URL
         self.base_url = config.get('baseUrl', 'https://api.backpack.exchange')
         
-        # HTTP 会话
-        self.session = requests.Session()
+        # HTTP 会话：复用 Backpack 共享连接池，避免每个实例重新 TLS 握手
+        self.session = get_shared_session('backpack')
         self.timeout = int(config.get('timeout', 10000)) / 1000  # 毫秒转秒
         
         # 🌐 配置代理（参考 DefaultAdapter 实现）
@@ -133,9 +171,8 @@ class BackpackAdapter(AdapterInterface):
             else:
                 logger.debug(f"ℹ️ Backpack 未配置代理（直连）")
         
-        # 应用代理到 session
+        # 代理随每次请求传入（会话为共享会话，不能写入实例自己的代理）
         if self.proxies:
-            self.session.proxies.update(self.proxies)
             logger.info(f"🌐 Backpack 代理已应用: {self.proxies}")
         
         # 不调用父类的 __init__（因为 Backpack 不使用 CCXT）
@@ -144,19 +181,6 @@ class BackpackAdapter(AdapterInterface):
         self.exchange_id = 'backpack'
         self.exchange = None  # 不使用 CCXT
         
-        # 声明支持的功能
-        self._supported_capabilities = {
-            AdapterCapability.TEST_CONNECTIVITY,
-            AdapterCapability.LOAD_MARKETS,
-            AdapterCapability.FETCH_OHLCV,
-            AdapterCapability.FETCH_PRICES,
-            AdapterCapability.FETCH_SPOT_BALANCE,
-            AdapterCapability.FETCH_FUTURES_POSITIONS,
-            AdapterCapability.FETCH_SPOT_ORDERS,
-            AdapterCapability.FETCH_FUTURES_ORDERS,
-            AdapterCapability.CREATE_ORDER,
-        }
-        
         # 不使用市场数据缓存
         self._market_cache = None
         
@@ -227,7 +251,7 @@ class BackpackAdapter(AdapterInterface):
         查询最大可下单数量（instruction: maxOrderQuantity）
         """
         payload = {
-            "symbol": symbol.replace('/', '_'),
+            "symbol": symbol.translate(_SLASH_TO_UNDER),
             "side": "Bid" if side.lower() == "buy" else "Ask",
         }
 
@@ -371,6 +395,7 @@ class BackpackAdapter(AdapterInterface):
                     url,
                     params=params,
                     headers=headers,
+                    proxies=self.proxies,
                     timeout=self.timeout
                 )
             elif method.upper() == 'POST':
@@ -379,6 +404,7 @@ class BackpackAdapter(AdapterInterface):
                     url,
                     json=params,
                     headers=headers,
+                    proxies=self.proxies,
                     timeout=self.timeout
                 )
             elif method.upper() == 'DELETE':
@@ -387,18 +413,22 @@ class BackpackAdapter(AdapterInterface):
                     url,
                     params=params,
                     headers=headers,
+                    proxies=self.proxies,
                     timeout=self.timeout
                 )
             else:
                 raise ValueError(f"❌ 不支持的 HTTP 方法: {method}")
             
             response.raise_for_status()
-            return response.json()
+            return _json_loads(response.content)
             
         except requests.HTTPError as e:
             logger.error(f"❌ Backpack API HTTP 错误: {method} {url}")
             logger.error(f"   状态码: {e.response.status_code}")
             logger.error(f"   响应: {e.response.text}")
+            if e.response.status_code == 429:
+                # 统一为 CCXT 限频异常，由 services.rate_limiter 识别并退避重试
+                raise ccxt.RateLimitExceeded(f"Backpack 429: {e.response.text}") from e
             raise
         except requests.RequestException as e:
             logger.error(f"❌ Backpack API 请求失败: {method} {url}, 错误: {e}")
@@ -543,6 +573,8 @@ class BackpackAdapter(AdapterInterface):
             logger.info(f"✅ 获取到 {len(symbols_list)} 个交易对")
             return symbols_list
             
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 获取交易对失败: {e}")
             return []
@@ -603,7 +635,7 @@ class BackpackAdapter(AdapterInterface):
                 market_symbol = f"{symbol}_USDC"
             else:
                 # 标准格式：BTC/USDC → BTC_USDC
-                market_symbol = symbol.replace('/', '_')
+                market_symbol = symbol.translate(_SLASH_TO_UNDER)
             
             # 🔮 合约交易对需要添加 _PERP 后缀
             if self.market_type.lower() in ['futures', 'future', 'swap'] and not market_symbol.endswith('_PERP'):
@@ -672,6 +704,8 @@ class BackpackAdapter(AdapterInterface):
             logger.debug(f"✅ 获取到 {len(klines)} 条K线数据")
             return klines
             
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 获取K线失败 {symbol}/{interval}: {e}")
             return []
@@ -729,9 +763,9 @@ class BackpackAdapter(AdapterInterface):
                 # 处理合约符号：SOL_USDC_PERP → SOL/USDC
                 if raw_symbol.endswith('_PERP'):
                     base_symbol = raw_symbol[:-5]  # 去掉 _PERP
-                    standard_symbol = base_symbol.replace('_', '/')
+                    standard_symbol = base_symbol.translate(_UNDER_TO_SLASH)
                 else:
-                    standard_symbol = raw_symbol.replace('_', '/')
+                    standard_symbol = raw_symbol.translate(_UNDER_TO_SLASH)
                 
                 ticker_map[standard_symbol] = {
                     'last': float(t.get('c', 0)),  # close price
@@ -753,18 +787,22 @@ class BackpackAdapter(AdapterInterface):
                     try:
                         single_ticker = self._fetch_single_ticker(mapped_symbol)
                         result[original_symbol] = single_ticker
+                    except RATE_LIMIT_ERRORS:
+                        raise
                     except:
                         result[original_symbol] = {'last': 0, 'bid': 0, 'ask': 0, 'mark': 0}
             
             return result
             
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 批量获取价格失败: {e}")
             return {s: {'last': 0, 'bid': 0, 'ask': 0, 'mark': 0} for s in symbols}
     
     def _fetch_single_ticker(self, symbol: str) -> Dict[str, Any]:
         """获取单个交易对的 ticker（与 example 保持一致的字段处理）"""
-        market_symbol = symbol.replace('/', '_')
+        market_symbol = symbol.translate(_SLASH_TO_UNDER)
         ticker = self._request("GET", "/api/v1/ticker", params={'symbol': market_symbol}, private=False)
         
         # 字段优先级：lastPrice > c（根据实际 API 响应调整）
@@ -860,6 +898,8 @@ class BackpackAdapter(AdapterInterface):
                         (f" (过滤: {symbols})" if symbols else ""))
             return result
             
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 获取余额失败: {e}")
             # 返回空余额而不是抛异常
@@ -887,26 +927,29 @@ class BackpackAdapter(AdapterInterface):
                 # 现货：获取余额（调用 fetch_balance 并转换为持仓格式）
                 # 传递 symbols 参数以支持过滤
                 balance = self.fetch_balance(symbols=symbols)
-                positions = []
-                
-                for currency, amount in balance.get('total', {}).items():
-                    if amount > 0:
-                        positions.append({
-                            'exchange': 'backpack',
-                            'type': 'spot',
-                            'symbol': currency,
-                            'free': balance.get('free', {}).get(currency, 0),
-                            'used': balance.get('used', {}).get(currency, 0),
-                            'staked': 0,
-                            'total': amount
-                        })
-                return positions
+                free_map = balance.get('free') or {}
+                used_map = balance.get('used') or {}
+                total_map = balance.get('total') or {}
+
+                return [
+                    {
+                        'exchange': 'backpack',
+                        'type': 'spot',
+                        'symbol': currency,
+                        'free': free_map.get(currency, 0),
+                        'used': used_map.get(currency, 0),
+                        'staked': 0,
+                        'total': amount
+                    }
+                    for currency, amount in total_map.items()
+                    if amount > 0
+                ]
                 
             else:
                 # 合约：获取持仓（使用 /api/v1/open 端点）
                 params = {}
                 if symbols and len(symbols) == 1:
-                    params['symbol'] = symbols[0].replace('/', '_')
+                    params['symbol'] = symbols[0].translate(_SLASH_TO_UNDER)
                 
                 positions_data = self._request(
                     "GET",
@@ -920,20 +963,21 @@ class BackpackAdapter(AdapterInterface):
                     logger.warning(f"⚠️ 意外的 positions 响应格式: {type(positions_data)}")
                     return []
                 
+                # 请求的交易对统一为 Backpack 格式（BTC/USDC → BTC_USDC），一次构建，O(1) 查找
+                wanted = {s.split(':')[0].translate(_SLASH_TO_UNDER) for s in symbols} if symbols else None
+                
                 positions = []
                 for p in positions_data:
                     sym = p.get('symbol', '')  # 如 "SOL_USDC_PERP"
-                    contracts = float(p.get('positionAmt', p.get('contracts', 0)))
                     
-                    # 过滤交易对
-                    if symbols:
-                        standard_symbol = sym.replace('_', '/')
-                        if not any(s in standard_symbol for s in symbols):
-                            continue
+                    # 过滤交易对（精确匹配，兼容 _PERP 后缀）
+                    if wanted is not None and sym not in wanted and sym.split('_PERP')[0] not in wanted:
+                        continue
                     
+                    contracts = float(p.get('positionAmt', p.get('contracts', 0)))
                     if contracts != 0:
                         # 转换为标准格式
-                        standard_symbol = sym.replace('_', '/')
+                        standard_symbol = sym.translate(_UNDER_TO_SLASH)
                         
                         positions.append({
                             'exchange': 'backpack',
@@ -952,6 +996,8 @@ class BackpackAdapter(AdapterInterface):
                 
                 return positions
                 
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 获取持仓失败: {e}")
             return []
@@ -974,7 +1020,7 @@ class BackpackAdapter(AdapterInterface):
             
             # 如果指定了交易对
             if symbol:
-                params['symbol'] = symbol.replace('/', '_')
+                params['symbol'] = symbol.translate(_SLASH_TO_UNDER)
             
             # 时间范围（Backpack API 可能不支持，需根据实际调整）
             if since:
@@ -993,19 +1039,27 @@ class BackpackAdapter(AdapterInterface):
                 logger.warning(f"⚠️ 意外的 orders 响应格式: {type(orders_data)}")
                 return []
             
+            # 数量限制（先裁剪原始数据，避免对会被丢弃的历史订单做标准化）
+            if limit and len(orders_data) > limit:
+                orders_data = orders_data[-limit:]
+            
             # 标准化订单数据
             normalized = []
             for o in orders_data:
                 raw_symbol = o.get('symbol', '')  # 如 "SOL_USDC"
-                standard_symbol = raw_symbol.replace('_', '/')
+                standard_symbol = raw_symbol.translate(_UNDER_TO_SLASH)
                 
                 raw_side = str(o.get('side', '')).lower()
-                side_normalized = 'buy' if raw_side in ['buy', 'bid'] else 'sell' if raw_side in ['sell', 'ask'] else raw_side
+                side_normalized = _SIDE_MAP.get(raw_side, raw_side)
 
                 # 时间字段
                 order_ts = o.get('timestamp') or o.get('createdAt') or o.get('ts')
                 update_ts = o.get('lastUpdateTime') or o.get('updatedAt') or order_ts
 
+                # 数量字段（remaining 复用已转换的值）
+                amount = _safe_float(o.get('quantity', o.get('origQty')), 0)
+                filled = _safe_float(o.get('executedQuantity', o.get('executedQty')), 0)
+
                 normalized.append({
                     'orderId': str(o.get('id', o.get('orderId', ''))),
                     'exchange': 'backpack',
@@ -1014,11 +1068,11 @@ class BackpackAdapter(AdapterInterface):
                     'symbol': standard_symbol,
                     'side': side_normalized,
                     'type': o.get('orderType', o.get('type', '')).lower(),
-                    'price': self._safe_float(o.get('price'), 0),
-                    'amount': self._safe_float(o.get('quantity', o.get('origQty')), 0),
-                    'filled': self._safe_float(o.get('executedQuantity', o.get('executedQty')), 0),
-                    'remaining': self._safe_float(o.get('quantity'), 0) - self._safe_float(o.get('executedQuantity'), 0),
-                    'total': self._safe_float(o.get('quoteQuantity', o.get('cost')), 0),
+                    'price': _safe_float(o.get('price'), 0),
+                    'amount': amount,
+                    'filled': filled,
+                    'remaining': amount - filled,
+                    'total': _safe_float(o.get('quoteQuantity', o.get('cost')), 0),
                     'fee': 0,  # Backpack 需要单独查询 fee
                     'feeCurrency': '',
                     'status': o.get('status', 'unknown').lower(),
@@ -1029,12 +1083,10 @@ class BackpackAdapter(AdapterInterface):
                     'lastUpdateTime': update_ts,
                 })
             
-            # 数量限制
-            if limit and len(normalized) > limit:
-                normalized = normalized[-limit:]
-            
             return normalized
             
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Backpack 获取订单失败: {e}")
             return []
@@ -1072,7 +1124,7 @@ class BackpackAdapter(AdapterInterface):
             postOnly: 是否只做 Maker (可选)
         """
         try:
-            market_symbol = symbol.replace('/', '_')
+            market_symbol = symbol.translate(_SLASH_TO_UNDER)
             # 合约交易需使用 PERP 后缀
             if self.market_type != 'spot' and not market_symbol.endswith('_PERP'):
                 market_symbol = f"{market_symbol}_PERP"
@@ -1161,12 +1213,5 @@ class BackpackAdapter(AdapterInterface):
             return datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
         except:
             return '-'
-    
-    @staticmethod
-    def _safe_float(value, default=0):
-        """安全转换为 float"""
-        if value is None:
-            return default
-        return float(value)
 
 
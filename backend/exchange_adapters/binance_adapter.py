@@ -8,11 +8,18 @@ Binance 交易所适配器（单实例架构）
 
 import ccxt
 import logging
-from .default_adapter import DefaultAdapter
-from .adapter_interface import AdapterCapability
+import time
+from typing import Dict, Tuple
+from .default_adapter import DefaultAdapter, RATE_LIMIT_ERRORS
 
 logger = logging.getLogger(__name__)
 
+# 推断交易对时使用的计价币种（按优先级排序）
+QUOTE_CURRENCIES: Tuple[str, ...] = ('USDT', 'USDC', 'BUSD', 'FDUSD')
+# 从余额推断交易对时使用的计价币种（含 USD 本位合约）
+BALANCE_QUOTE_CURRENCIES: Tuple[str, ...] = ('USDT', 'USDC', 'BUSD', 'USD')
+# 稳定币（不单独推断交易对）
+STABLE_COINS: frozenset = frozenset(QUOTE_CURRENCIES) | {'USD'}
 
 class BinanceAdapter(DefaultAdapter):
     """
@@ -23,8 +30,22 @@ class BinanceAdapter(DefaultAdapter):
     2. 订单查询逻辑 - 必须传 symbol 参数
     """
     
+    # 币安合约的 defaultType 为 'future'（而非 'swap'）
+    _DEFAULT_TYPE_MAP = {'spot': 'spot', 'futures': 'future'}
+    
+    # 时间同步结果缓存 {exchange_id: (同步时刻, 时间差ms)}，所有实例共享
+    _time_sync_cache: Dict[str, Tuple[float, int]] = {}
+    # 时间差变化很慢，10 分钟内不重复请求服务器时间
+    TIME_SYNC_TTL = 600
+    
     def __init__(self, market_type: str, config: dict):
         """初始化 Binance 适配器"""
+        # 现货/合约交易对集合（随 markets 加载构建，见 _get_tradable_symbols）
+        self._indexed_markets = None
+        self._spot_symbols: frozenset = frozenset()
+        self._futures_symbols: frozenset = frozenset()
+        self._known_currencies: frozenset = frozenset()
+        
         # 调用父类 DefaultAdapter 的 __init__，传入 exchange_id='binance'
         super().__init__(exchange_id='binance', market_type=market_type, config=config)
     
@@ -37,29 +58,26 @@ class BinanceAdapter(DefaultAdapter):
         
         根据 market_type 创建对应配置的实例
         """
-        exchange_config = {
-            'apiKey': self.config.get('apiKey', ''),
-            'secret': self.config.get('secret', ''),
-            'enableRateLimit': True,
-            'enableTimeSync': True,  # 🔧 启用时间同步，解决时间戳错误
-            'timeout': self.config.get('timeout', 30000),
-            'options': {
-                'warnOnFetchOpenOrdersWithoutSymbol': False,  # 关闭警告
-            }
-        }
-        
-        # 根据 market_type 设置 defaultType
-        if self.market_type == 'futures':
-            exchange_config['options']['defaultType'] = 'future'
-        else:  # spot
-            exchange_config['options']['defaultType'] = 'spot'
-        
-        if 'proxies' in self.config:
-            exchange_config['proxies'] = self.config['proxies']
+        exchange_config = self._build_exchange_config()
+        exchange_config['enableTimeSync'] = True  # 🔧 启用时间同步，解决时间戳错误
+        exchange_config.setdefault('options', {})['warnOnFetchOpenOrdersWithoutSymbol'] = False  # 关闭警告
         
         self.exchange = ccxt.binance(exchange_config)
         
         # 🔧 手动触发时间同步（解决时间戳错误）
+        self._sync_time()
+    
+    def _sync_time(self):
+        """
+        检查本地与 Binance 服务器的时间差
+        
+        结果按 exchange_id 缓存 TIME_SYNC_TTL 秒，适配器频繁重建时
+        不会每次都同步请求一次服务器时间
+        """
+        cached = self._time_sync_cache.get(self.exchange_id)
+        if cached and time.time() - cached[0] < self.TIME_SYNC_TTL:
+            return
+        
         try:
             # 获取 Binance 服务器时间并计算时间差
             if hasattr(self.exchange, 'fetch_time'):
@@ -71,16 +89,10 @@ class BinanceAdapter(DefaultAdapter):
                 # 如果时间差超过 1000ms，记录警告
                 if abs(time_diff) > 1000:
                     logger.warning(f"⚠️ Binance 时间差较大: {time_diff}ms，可能导致请求失败")
+                
+                self._time_sync_cache[self.exchange_id] = (time.time(), time_diff)
         except Exception as e:
             logger.warning(f"⚠️ Binance 时间同步失败（不影响使用）: {e}")
-        
-        # 声明支持的功能
-        self._supported_capabilities = {
-            AdapterCapability.FETCH_SPOT_ORDERS,
-            AdapterCapability.FETCH_FUTURES_ORDERS,
-            AdapterCapability.FETCH_SPOT_BALANCE,
-            AdapterCapability.FETCH_FUTURES_POSITIONS,
-        }
     
     # ==================== 订单查询（Binance 特殊处理） ====================
     
@@ -114,17 +126,17 @@ class BinanceAdapter(DefaultAdapter):
         try:
             # 🎯 根据 base_currencies 推测交易对或直接使用交易对列表
             if base_currencies:
-                # 🔧 检查是否是交易对列表（元素包含 '/'）
-                is_trading_pairs = any('/' in item for item in base_currencies)
+                # 🔧 一次遍历拆分：交易对（元素包含 '/'）直接使用，币种需要推测交易对
+                pairs, bases = [], []
+                for item in base_currencies:
+                    (pairs if '/' in item else bases).append(item)
                 
-                if is_trading_pairs:
-                    # 直接使用交易对列表
-                    active_symbols = base_currencies
-                    logger.info(f"   检测到交易对列表，直接使用: {active_symbols}")
-                else:
-                    # 根据币种推测交易对
-                    logger.info(f"   根据币种列表推测交易对: {base_currencies}")
-                    active_symbols = self._get_symbols_from_base_currencies(base_currencies)
+                active_symbols = pairs
+                if pairs:
+                    logger.info(f"   检测到交易对列表，直接使用: {pairs}")
+                if bases:
+                    logger.info(f"   根据币种列表推测交易对: {bases}")
+                    active_symbols = pairs + self._get_symbols_from_base_currencies(bases)
             else:
                 logger.info(f"   未指定币种，从余额推断所有活跃交易对...")
                 active_symbols = self._get_active_symbols_from_balance_smart()
@@ -138,7 +150,7 @@ class BinanceAdapter(DefaultAdapter):
             # 逐个交易对查询订单
             for sym in active_symbols:
                 try:
-                    logger.debug(f"   查询交易对 {sym} 的订单...")
+                    logger.debug("   查询交易对 %s 的订单...", sym)
                     
                     # 获取开放订单
                     open_orders = self.exchange.fetch_open_orders(sym)
@@ -153,12 +165,16 @@ class BinanceAdapter(DefaultAdapter):
                             logger.info(f"   ✅ {sym}: 找到 {len(closed_orders)} 个已完成订单")
                             all_orders.extend(closed_orders)
                     
+                except RATE_LIMIT_ERRORS:
+                    raise
                 except Exception as e:
                     # 某个交易对查询失败不影响其他的
-                    logger.debug(f"   ⚠️ {sym}: 查询失败 - {e}")
+                    logger.debug("   ⚠️ %s: 查询失败 - %s", sym, e)
             
             logger.info(f"🎉 Binance: 总共获取到 {len(all_orders)} 个订单")
         
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Binance 获取订单失败: {e}", exc_info=True)
         
@@ -194,9 +210,13 @@ class BinanceAdapter(DefaultAdapter):
                     if symbol_orders:
                         logger.info(f"   ✅ {sym}: 找到 {len(symbol_orders)} 个开放订单")
                         orders.extend(symbol_orders)
+                except RATE_LIMIT_ERRORS:
+                    raise
                 except Exception as e:
-                    logger.debug(f"   ⚠️ {sym}: 查询失败 - {e}")
+                    logger.debug("   ⚠️ %s: 查询失败 - %s", sym, e)
         
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ Binance 获取开放订单失败: {e}", exc_info=True)
         
@@ -204,6 +224,41 @@ class BinanceAdapter(DefaultAdapter):
     
     # ==================== 辅助方法 ====================
     
+    def _get_tradable_symbols(self, market_type: str = None) -> frozenset:
+        """
+        获取指定市场类型的交易对集合
+        
+        markets 加载后一次性构建现货/合约两个 frozenset，后续只做哈希查找；
+        markets 被替换（重新加载）时自动重建
+        
+        Args:
+            market_type: 'spot' 或 'futures'/'future'，默认使用当前适配器的市场类型
+        
+        Returns:
+            交易对集合（如 frozenset({'BTC/USDT', 'ETH/USDT'})）
+        """
+        markets = self.exchange.markets or {}
+        if self._indexed_markets is not markets:
+            self._spot_symbols = frozenset(s for s, m in markets.items() if m.get('spot'))
+            self._futures_symbols = frozenset(s for s, m in markets.items() if m.get('future'))
+            # 从缓存恢复 markets 时 exchange.currencies 为空，因此同时从 markets 中收集币种
+            self._known_currencies = frozenset(self.exchange.currencies or ()) | frozenset(
+                c for m in markets.values() for c in (m.get('base'), m.get('quote')) if c
+            )
+            self._indexed_markets = markets
+        
+        market_type = market_type or self.market_type
+        return self._spot_symbols if market_type == 'spot' else self._futures_symbols
+    
+    def _get_known_currencies(self) -> frozenset:
+        """
+        获取交易所已知的币种集合（与交易对集合一起构建）
+        
+        用于从余额中筛选真实币种，余额里的 info/free/total 等字段自然被排除
+        """
+        self._get_tradable_symbols()
+        return self._known_currencies
+    
     def _get_symbols_from_base_currencies(self, base_currencies: list) -> list:
         """
         🎯 根据币种列表推测交易对
@@ -224,39 +279,30 @@ class BinanceAdapter(DefaultAdapter):
             # 🚀 使用缓存机制加载市场数据
             if not self.exchange.markets:
                 logger.info(f"   市场数据未加载，正在加载（使用缓存）...")
-                self.load_markets_safe()
+                self._load_markets_with_cache()
                 logger.info(f"   ✅ 市场数据已加载 ({len(self.exchange.markets)} 个交易对)")
             
-            # 常见的计价币种（按优先级排序）
-            quote_currencies = ['USDT', 'USDC', 'BUSD', 'FDUSD']
+            tradable = self._get_tradable_symbols()
+            market_label = '现货' if self.market_type == 'spot' else '合约'
             
             for base in base_currencies:
                 base = base.upper().strip()
                 
                 # 跳过稳定币
-                if base in quote_currencies:
+                if base in STABLE_COINS:
                     logger.debug(f"      ⏭️ 跳过稳定币: {base}")
                     continue
                 
                 found = False
-                for quote in quote_currencies:
+                for quote in QUOTE_CURRENCIES:
                     symbol = f"{base}/{quote}"
                     
-                    # 检查交易对是否存在
-                    if symbol in self.exchange.markets:
-                        market = self.exchange.markets[symbol]
-                        
-                        # 检查市场类型是否匹配
-                        if self.market_type == 'spot' and market.get('spot'):
-                            symbols.append(symbol)
-                            logger.debug(f"      ✅ {symbol} (现货)")
-                            found = True
-                            break  # 找到一个就够了，优先使用 USDT
-                        elif self.market_type == 'futures' and market.get('future'):
-                            symbols.append(symbol)
-                            logger.debug(f"      ✅ {symbol} (合约)")
-                            found = True
-                            break  # 找到一个就够了，优先使用 USDT
+                    # 检查交易对是否存在且匹配当前市场类型
+                    if symbol in tradable:
+                        symbols.append(symbol)
+                        logger.debug(f"      ✅ {symbol} ({market_label})")
+                        found = True
+                        break  # 找到一个就够了，优先使用 USDT
                 
                 if not found:
                     logger.warning(f"      ⚠️ 未找到 {base} 的有效交易对")
@@ -287,23 +333,24 @@ class BinanceAdapter(DefaultAdapter):
             # 🚀 使用缓存机制加载市场数据
             if not self.exchange.markets:
                 logger.info(f"   市场数据未加载，正在加载（使用缓存）...")
-                self.load_markets_safe()
+                self._load_markets_with_cache()
                 logger.info(f"   ✅ 市场数据已加载 ({len(self.exchange.markets)} 个交易对)")
             
             # 获取余额
             logger.debug(f"   正在获取账户余额...")
-            balance = self.exchange.fetch_balance()
+            balance = self._cached_fetch_balance()
             logger.debug(f"   ✅ 余额获取成功")
             
             # 找出有余额的币种
             nonzero_assets = []
+            known_currencies = self._get_known_currencies()
             for currency, amounts in balance.items():
-                # 跳过特殊字段
-                if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
+                # 只处理交易所已知的币种（跳过 info/free/total 等特殊字段）
+                if currency not in known_currencies:
                     continue
                 
                 # 跳过稳定币（它们不需要查询）
-                if currency in ['USDT', 'USDC', 'BUSD', 'FDUSD', 'USD']:
+                if currency in STABLE_COINS:
                     continue
                 
                 # 有余额的币种
@@ -319,29 +366,14 @@ class BinanceAdapter(DefaultAdapter):
             
             logger.info(f"   📊 找到 {len(nonzero_assets)} 个有余额的币种: {nonzero_assets}")
             
-            # 构造可能的交易对
-            quote_currencies = ['USDT', 'USDC', 'BUSD', 'FDUSD']
-            
-            for base in nonzero_assets:
-                for quote in quote_currencies:
-                    symbol = f"{base}/{quote}"
-                    
-                    # 检查交易对是否存在
-                    if symbol in self.exchange.markets:
-                        market = self.exchange.markets[symbol]
-                        
-                        # 检查市场类型是否匹配
-                        if self.market_type == 'spot' and market.get('spot'):
-                            active_symbols.append(symbol)
-                            logger.debug(f"      ✅ {symbol} (现货)")
-                        elif self.market_type == 'futures' and market.get('future'):
-                            active_symbols.append(symbol)
-                            logger.debug(f"      ✅ {symbol} (合约)")
-            
-            # 去重
-            active_symbols = list(set(active_symbols))
+            # 构造可能的交易对，与当前市场类型的交易对集合求交集（自带去重）
+            candidates = {f"{base}/{quote}" for base in nonzero_assets for quote in QUOTE_CURRENCIES}
+            active_symbols = list(candidates & self._get_tradable_symbols())
+            logger.debug(f"      ✅ {active_symbols}")
             logger.info(f"   ✅ 最终推断出 {len(active_symbols)} 个活跃交易对")
         
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"⚠️ Binance 智能推断交易对失败: {e}", exc_info=True)
         
@@ -363,12 +395,14 @@ class BinanceAdapter(DefaultAdapter):
         try:
             # 🚀 使用缓存机制加载市场数据
             if not self.exchange.markets:
-                self.load_markets_safe()
+                self._load_markets_with_cache()
             
             # 获取有余额的币种
             active_currencies = []
+            known_currencies = self._get_known_currencies()
             for currency, amounts in balance.items():
-                if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
+                # 只处理交易所已知的币种（跳过 info/free/total 等特殊字段）
+                if currency not in known_currencies:
                     continue
                 
                 # 处理 None 值
@@ -381,21 +415,15 @@ class BinanceAdapter(DefaultAdapter):
                     active_currencies.append(currency)
             
             # 构造可能的交易对
-            quote_currencies = ['USDT', 'USDC', 'BUSD', 'USD']
+            tradable = self._get_tradable_symbols(market_type)
             
             for base in active_currencies:
-                for quote in quote_currencies:
+                for quote in BALANCE_QUOTE_CURRENCIES:
                     symbol = f"{base}/{quote}"
                     
-                    # 检查交易对是否存在
-                    if symbol in self.exchange.markets:
-                        market = self.exchange.markets[symbol]
-                        
-                        # 检查市场类型
-                        if market_type == 'spot' and market.get('spot'):
-                            active_symbols.append(symbol)
-                        elif market_type == 'future' and market.get('future'):
-                            active_symbols.append(symbol)
+                    # 检查交易对是否存在且匹配市场类型
+                    if symbol in tradable:
+                        active_symbols.append(symbol)
         
         except Exception as e:
             print(f"⚠️ 推断活跃交易对失败: {e}")
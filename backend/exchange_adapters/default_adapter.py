@@ -6,27 +6,153 @@
 """
 
 import ccxt
+import inspect
 import logging
 import os
+import threading
 import time
-from typing import List, Dict, Optional, Any
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Optional, Any, Tuple, Iterator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .adapter_interface import AdapterInterface, AdapterCapability, NotImplementedByAdapter
 
 logger = logging.getLogger(__name__)
 
+# 交易所限频错误：查询接口不吞掉这些异常，交给调用方（services.rate_limiter）退避重试
+RATE_LIMIT_ERRORS = (ccxt.RateLimitExceeded, ccxt.DDoSProtection)
+
 # 全局市场数据缓存实例（延迟初始化）
 _market_cache_instance = None
+_market_cache_lock = threading.Lock()
 
 def get_market_cache():
-    """获取全局市场数据缓存实例（单例模式）"""
+    """获取全局市场数据缓存实例（单例模式，线程安全）"""
     global _market_cache_instance
     if _market_cache_instance is None:
-        from util.market_cache import MarketCache
-        _market_cache_instance = MarketCache()
-        logger.info("✅ 初始化全局市场数据缓存")
+        with _market_cache_lock:
+            if _market_cache_instance is None:
+                from util.market_cache import MarketCache
+                _market_cache_instance = MarketCache()
+                logger.info("✅ 初始化全局市场数据缓存")
     return _market_cache_instance
 
 
+# 连通性测试成功结果的复用时间（秒）
+CONNECTIVITY_CACHE_TTL = 2.0
+
+
+@lru_cache(maxsize=1)
+def _resolved_proxies() -> Optional[Dict[str, str]]:
+    """
+    解析环境变量 PROXY_URL 得到 REST 代理配置（只解析一次，所有适配器共享）
+    
+    Returns:
+        {'http': url, 'https': url}，未配置代理时返回 None
+    """
+    proxy_url = os.getenv('PROXY_URL', '').strip()
+    if not proxy_url:
+        return None
+    
+    # 智能处理代理 URL
+    processed_url = DefaultAdapter._process_proxy_url(proxy_url, protocol='http')
+    return {
+        'http': processed_url,
+        'https': processed_url,
+    }
+
+
+def fetch_balances_parallel(adapters: List[AdapterInterface], max_workers: int = 16) -> Dict[AdapterInterface, Dict[str, Any]]:
+    """
+    并发获取多个适配器的账户余额
+    
+    多交易所资产看板逐个调用 fetch_balance 时总耗时是各交易所延迟之和；
+    这里用线程池并发请求（配合共享 HTTP 会话），总耗时约等于最慢的一个
+    
+    Args:
+        adapters: 适配器列表
+        max_workers: 最大并发数
+    
+    Returns:
+        {adapter: balance}，单个适配器失败时返回空余额结构
+    """
+    if not adapters:
+        return {}
+    
+    def _fetch(adapter: AdapterInterface) -> Dict[str, Any]:
+        try:
+            return adapter.fetch_balance()
+        except Exception as e:
+            logger.error(f"❌ {adapter.exchange_id} 获取余额失败: {e}")
+            return {'info': {}, 'free': {}, 'used': {}, 'total': {}}
+    
+    with ThreadPoolExecutor(max_workers=min(len(adapters), max_workers)) as executor:
+        return dict(zip(adapters, executor.map(_fetch, adapters)))
+
+
+# __getattr__ 透传时表示属性不存在的哨兵
+_MISSING = object()
+
+
+# REST 共享会话：每个交易所一个（延迟初始化），同一交易所的所有适配器实例复用同一连接池
+_shared_sessions: Dict[str, requests.Session] = {}
+_shared_session_lock = threading.Lock()
+
+
+class _SharedSession(requests.Session):
+    """
+    跨实例共享的 HTTP 会话
+    
+    CCXT 实例析构时会调用 session.close()，共享会话忽略该调用，
+    避免某个适配器被回收时关闭其他实例仍在使用的 keep-alive 连接；
+    应用关闭时由 close_shared_sessions() 真正关闭
+    """
+    
+    def close(self):
+        pass
+
+
+def get_shared_session(exchange_id: str) -> requests.Session:
+    """
+    获取交易所的 REST 共享会话（每个交易所单例，keep-alive 连接池）
+    
+    按交易所划分连接池：一个交易所的突发请求不会占满其他交易所的连接。
+    代理不设置在会话上：每次请求都会传入实例自己的 proxies，
+    因此不同代理配置的实例可以安全共享同一个会话
+    """
+    session = _shared_sessions.get(exchange_id)
+    if session is None:
+        with _shared_session_lock:
+            session = _shared_sessions.get(exchange_id)
+            if session is None:
+                session = _SharedSession()
+                session.trust_env = False  # 与 CCXT 默认行为一致，代理由 config['proxies'] 控制
+                adapter = HTTPAdapter(
+                    pool_connections=10,  # 单个交易所只涉及少量域名（现货/合约/交割）
+                    pool_maxsize=50,
+                    # 只重试连接阶段的错误，已发出的下单请求不会被重复提交
+                    max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.2)
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _shared_sessions[exchange_id] = session
+                logger.info(f"✅ 初始化 {exchange_id} 共享 HTTP 会话")
+    return session
+
+
+def close_shared_sessions():
+    """关闭所有 REST 共享会话，释放 keep-alive 连接（应用关闭时调用）"""
+    with _shared_session_lock:
+        sessions = list(_shared_sessions.values())
+        _shared_sessions.clear()
+    for session in sessions:
+        requests.Session.close(session)
+
+
 class DefaultAdapter(AdapterInterface):
     """
     默认适配器（基于 CCXT 的通用实现）
@@ -44,6 +170,29 @@ class DefaultAdapter(AdapterInterface):
     - BinanceAdapter 等特殊交易所继承此类，只重写差异部分
     """
     
+    # market_type → CCXT options['defaultType']
+    # 大多数交易所（如 OKX、Gate）合约使用 'swap'，子类可覆盖（币安为 'future'）
+    _DEFAULT_TYPE_MAP = {'spot': 'spot', 'futures': 'swap'}
+    
+    # CCXT 实例的固定配置模板（类加载时生成一次，只读），子类可覆盖
+    _BASE_TEMPLATE = MappingProxyType({'enableRateLimit': True})
+    
+    # 每个交易所的请求间隔（毫秒，对应 CCXT rateLimit），按交易所公开的限频设置；
+    # 未列出的交易所使用 CCXT 内置默认值
+    _RATE_LIMITS = MappingProxyType({
+        'okx': 100,   # 公共行情接口 20 次/2 秒（CCXT 默认 110）
+        'gate': 50,   # 现货/合约公共接口 200 次/10 秒
+        'binance': 50,
+    })
+    
+    # 支持的功能（默认都支持），子类有差异时在类级别覆盖
+    _supported_capabilities = frozenset({
+        AdapterCapability.FETCH_SPOT_ORDERS,
+        AdapterCapability.FETCH_FUTURES_ORDERS,
+        AdapterCapability.FETCH_SPOT_BALANCE,
+        AdapterCapability.FETCH_FUTURES_POSITIONS,
+    })
+    
     def __init__(self, exchange_id: str, market_type: str, config: dict):
         """
         初始化默认适配器
@@ -61,6 +210,19 @@ class DefaultAdapter(AdapterInterface):
         # 市场数据缓存（全局单例）
         self._market_cache = get_market_cache()
         
+        # 余额短时缓存 (时间戳, 余额数据)，合并同一轮轮询内的重复 fetch_balance
+        self._balance_cache: Tuple[float, dict] = (0, {})
+        
+        # 连通性测试成功结果 (测试时间, 结果)；缓存在实例上，凭证（含 secret/password）不同即不同实例
+        self._connectivity_cache: Tuple[float, Optional[Dict[str, Any]]] = (0, None)
+        
+        # fetch_symbols 结果缓存 {(quote, limit): symbols}，随 markets 变化失效
+        self._symbols_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._symbols_cache_markets = None
+        
+        # normalize_symbol 结果缓存 {通用符号: 交易所符号}，轮询的交易对基本固定
+        self._normalize_cache: Dict[str, str] = {}
+        
         # 调用父类初始化（会调用 _get_exchange_id 和 _initialize_exchange）
         super().__init__(market_type, config)
         
@@ -70,6 +232,27 @@ class DefaultAdapter(AdapterInterface):
         # 初始化交易所（在 super().__init__() 后调用，确保 exchange_id 已设置）
         self._initialize_exchange()
         
+        # 预先计算当前市场类型的功能支持，订单/持仓查询入口只需判断布尔值
+        is_spot = self.market_type == 'spot'
+        self._supports_orders = (
+            AdapterCapability.FETCH_SPOT_ORDERS if is_spot else AdapterCapability.FETCH_FUTURES_ORDERS
+        ) in self._supported_capabilities
+        self._supports_positions = (
+            AdapterCapability.FETCH_SPOT_BALANCE if is_spot else AdapterCapability.FETCH_FUTURES_POSITIONS
+        ) in self._supported_capabilities
+        
+        # CCXT 的 has 字典是权威的接口支持标记，初始化时读取一次
+        has = self.exchange.has if self.exchange is not None else {}
+        self._has_fetch_orders = bool(has.get('fetchOrders'))
+        self._has_fetch_open_orders = bool(has.get('fetchOpenOrders'))
+        self._has_fetch_closed_orders = bool(has.get('fetchClosedOrders'))
+        
+        # CCXT 的 fetch_positions(symbols=None, params={}) 是否接受 symbols 参数（每个交易所固定不变）
+        self._positions_accepts_symbols = (
+            bool(has.get('fetchPositionsForSymbols'))
+            or self._signature_accepts('fetch_positions', 'symbols')
+        )
+        
         # 🚀 自动加载市场数据（使用缓存）
         self._load_markets_with_cache()
     
@@ -77,6 +260,17 @@ class DefaultAdapter(AdapterInterface):
         """返回交易所 ID"""
         return self._custom_exchange_id
     
+    def _signature_accepts(self, method_name: str, param: str) -> bool:
+        """检查 CCXT 实例的方法是否接受指定参数（可变位置参数也视为接受）"""
+        method = getattr(self.exchange, method_name, None)
+        if method is None:
+            return False
+        try:
+            params = inspect.signature(method).parameters
+        except (TypeError, ValueError):
+            return False
+        return param in params or any(p.kind is inspect.Parameter.VAR_POSITIONAL for p in params.values())
+    
     # ==================== 内部辅助方法 ====================
     
     def _add_proxy_config(self):
@@ -105,22 +299,17 @@ class DefaultAdapter(AdapterInterface):
             logger.debug(f"✅ {self.exchange_id} 使用用户提供的代理配置")
             return
         
-        # 从环境变量读取代理配置
-        proxy_url = os.getenv('PROXY_URL', '').strip()
+        # 从环境变量读取代理配置（进程内只解析一次）
+        proxies = _resolved_proxies()
         
-        if proxy_url:
-            # 智能处理代理 URL
-            processed_url = self._process_proxy_url(proxy_url, protocol='http')
-            
-            self.config['proxies'] = {
-                'http': processed_url,
-                'https': processed_url,
-            }
-            logger.info(f"🌐 {self.exchange_id} REST API 已配置代理: {processed_url}")
+        if proxies:
+            self.config['proxies'] = proxies
+            logger.info(f"🌐 {self.exchange_id} REST API 已配置代理: {proxies['https']}")
         else:
             logger.debug(f"ℹ️ {self.exchange_id} 未配置代理（直连）")
     
-    def _process_proxy_url(self, proxy_url: str, protocol: str = 'http') -> str:
+    @staticmethod
+    def _process_proxy_url(proxy_url: str, protocol: str = 'http') -> str:
         """
         处理代理 URL，自动添加协议前缀
         
@@ -160,42 +349,61 @@ class DefaultAdapter(AdapterInterface):
             exchange_class = getattr(ccxt, self.exchange_id)
             
             # 基础配置
-            exchange_config = {
-                'apiKey': self.config.get('apiKey', ''),
-                'secret': self.config.get('secret', ''),
-                'enableRateLimit': True,
-                'timeout': self.config.get('timeout', 30000),
-            }
+            exchange_config = self._build_exchange_config()
             
             # 可选配置
             if 'password' in self.config:
                 exchange_config['password'] = self.config['password']
             
-            if 'proxies' in self.config:
-                exchange_config['proxies'] = self.config['proxies']
-            
-            # 根据 market_type 设置 defaultType
-            if self.market_type == 'futures':
-                # 币安使用 'future'，其他交易所（如 OKX、Gate）使用 'swap'
-                default_type = 'future' if self.exchange_id == 'binance' else 'swap'
-                exchange_config['options'] = {'defaultType': default_type}
-            elif self.market_type == 'spot':
-                exchange_config['options'] = {'defaultType': 'spot'}
-            
             # 创建实例
             self.exchange = exchange_class(exchange_config)
             
-            # 声明支持的功能（默认都支持）
-            self._supported_capabilities = {
-                AdapterCapability.FETCH_SPOT_ORDERS,
-                AdapterCapability.FETCH_FUTURES_ORDERS,
-                AdapterCapability.FETCH_SPOT_BALANCE,
-                AdapterCapability.FETCH_FUTURES_POSITIONS,
-            }
-            
         except Exception as e:
             raise ValueError(f"初始化 {self.exchange_id} 失败: {e}")
     
+    @classmethod
+    def _base_exchange_config(cls, exchange_id: str, market_type: str, config: dict) -> Dict[str, Any]:
+        """
+        生成与 HTTP 客户端无关的 CCXT 实例配置（同步适配器与 AsyncDefaultAdapter 共用）
+        
+        包含类级模板（_BASE_TEMPLATE）、apiKey/secret/timeout、_RATE_LIMITS 请求间隔，
+        以及由 _DEFAULT_TYPE_MAP 决定的 options['defaultType']，子类覆盖这些类属性后两条路径保持一致
+        """
+        exchange_config = {
+            **cls._BASE_TEMPLATE,
+            'apiKey': config.get('apiKey', ''),
+            'secret': config.get('secret', ''),
+            'timeout': config.get('timeout', 30000),
+        }
+        
+        rate_limit = cls._RATE_LIMITS.get(exchange_id)
+        if rate_limit:
+            exchange_config['rateLimit'] = rate_limit
+        
+        # 根据 market_type 设置 defaultType
+        default_type = cls._DEFAULT_TYPE_MAP.get(market_type)
+        if default_type:
+            exchange_config['options'] = {'defaultType': default_type}
+        
+        return exchange_config
+    
+    def _build_exchange_config(self) -> Dict[str, Any]:
+        """
+        基于类级模板合并凭证，生成 CCXT 实例配置
+        
+        所有子类都经由此处创建实例，统一开启 CCXT 限频器（enableRateLimit + _RATE_LIMITS），
+        避免触发 429 后的连锁延迟。
+        在 _base_exchange_config 的基础上加入共享会话和代理；
+        password 等交易所特有字段由各适配器自行追加
+        """
+        exchange_config = self._base_exchange_config(self.exchange_id, self.market_type, self.config)
+        exchange_config['session'] = get_shared_session(self.exchange_id)  # 🔗 复用 keep-alive 连接，避免每个实例重复 TLS 握手
+        
+        if 'proxies' in self.config:
+            exchange_config['proxies'] = self.config['proxies']
+        
+        return exchange_config
+    
     # ==================== 市场数据缓存（CCXT 特有） ====================
     
     def _load_markets_with_cache(self):
@@ -219,7 +427,8 @@ class DefaultAdapter(AdapterInterface):
             
             if cached_markets:
                 # 缓存有效，直接使用
-                self.exchange.markets = cached_markets
+                from util.market_cache import apply_cached_markets
+                apply_cached_markets(self.exchange, cached_markets)
                 logger.info(f"✅ {self.exchange_id} 使用缓存的市场数据 ({len(cached_markets)} 个交易对)")
             else:
                 # 缓存无效，从 API 加载
@@ -254,6 +463,8 @@ class DefaultAdapter(AdapterInterface):
                 logger.info(f"🔄 {self.exchange_id} 强制从 API 重新加载市场数据...")
                 markets = self.exchange.load_markets()
                 self._market_cache.save_to_cache(self.exchange_id, markets)
+                self._symbols_cache.clear()
+                self._normalize_cache.clear()
                 logger.info(f"✅ {self.exchange_id} 市场数据已重新加载 ({len(markets)} 个交易对)")
             else:
                 # 使用缓存策略
@@ -263,13 +474,6 @@ class DefaultAdapter(AdapterInterface):
             logger.error(f"❌ {self.exchange_id} 重新加载市场数据失败: {e}")
             raise
     
-    def load_markets(self, reload: bool = False):
-        """
-        加载市场数据（CCXT 兼容接口）
-        """
-        if self.exchange:
-            self.exchange.load_markets(reload)
-    
     # ==================== 直接访问底层 CCXT 实例 ====================
     
     def get_exchange(self) -> ccxt.Exchange:
@@ -297,8 +501,14 @@ class DefaultAdapter(AdapterInterface):
             raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
         
         # 转发到 CCXT 实例（单实例架构，非常明确）
-        if self.exchange is not None and hasattr(self.exchange, name):
-            return getattr(self.exchange, name)
+        if self.exchange is not None:
+            attr = getattr(self.exchange, name, _MISSING)
+            if attr is not _MISSING:
+                # 方法缓存到实例上，下次直接命中，不再经过 __getattr__；
+                # markets/tickers 等数据属性会变化，不缓存
+                if callable(attr):
+                    object.__setattr__(self, name, attr)
+                return attr
         
         # 方法不存在
         raise AttributeError(
@@ -323,26 +533,27 @@ class DefaultAdapter(AdapterInterface):
         获取所有订单（包括开放的和已完成的）
         """
         # 检查是否支持
-        capability = (AdapterCapability.FETCH_SPOT_ORDERS 
-                     if self.market_type == 'spot' 
-                     else AdapterCapability.FETCH_FUTURES_ORDERS)
-        
-        if not self.supports_capability(capability):
+        if not self._supports_orders:
             raise NotImplementedByAdapter(
                 f"❌ {self.exchange_id} 的{self.market_type}订单查询功能需要定制适配，但尚未实现"
             )
         
         try:
-            logger.debug(f"🔧 {self.exchange_id} ({self.market_type}) fetch_orders: symbol={symbol}, base_currencies={base_currencies}, since={since}, limit={limit}")
+            logger.debug(
+                "🔧 %s (%s) fetch_orders: symbol=%s, base_currencies=%s, since=%s, limit=%s",
+                self.exchange_id, self.market_type, symbol, base_currencies, since, limit
+            )
             
             # 默认实现：尝试使用 CCXT 的 fetch_orders
             all_orders = self._fetch_orders_default(symbol, since, limit, base_currencies)
-            logger.debug(f"   原始订单数量: {len(all_orders)}")
+            logger.debug("   原始订单数量: %s", len(all_orders))
             
             normalized = self._normalize_orders(all_orders, self.market_type)
-            logger.debug(f"   标准化后订单数量: {len(normalized)}")
+            logger.debug("   标准化后订单数量: %s", len(normalized))
             
             return normalized
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ {self.exchange_id} 获取{self.market_type}订单失败: {e}")
             logger.error(f"   错误详情:", exc_info=True)
@@ -353,11 +564,7 @@ class DefaultAdapter(AdapterInterface):
         获取开放订单
         """
         # 检查是否支持
-        capability = (AdapterCapability.FETCH_SPOT_ORDERS 
-                     if self.market_type == 'spot' 
-                     else AdapterCapability.FETCH_FUTURES_ORDERS)
-        
-        if not self.supports_capability(capability):
+        if not self._supports_orders:
             raise NotImplementedByAdapter(
                 f"❌ {self.exchange_id} 的{self.market_type}订单查询功能需要定制适配，但尚未实现"
             )
@@ -366,6 +573,8 @@ class DefaultAdapter(AdapterInterface):
             # 默认实现：直接调用 CCXT
             open_orders = self._fetch_open_orders_default(symbol)
             return self._normalize_orders(open_orders, self.market_type)
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             print(f"❌ {self.exchange_id} 获取{self.market_type}开放订单失败: {e}")
             return []
@@ -385,12 +594,14 @@ class DefaultAdapter(AdapterInterface):
         子类可以重写此方法来处理特殊情况
         """
         # 方法1：优先尝试 fetch_orders（最全面）
-        if hasattr(self.exchange, 'fetch_orders'):
-            logger.debug(f"   使用 fetch_orders 方法")
+        if self._has_fetch_orders:
+            logger.debug("   使用 fetch_orders 方法")
             try:
                 orders = self.exchange.fetch_orders(symbol, since, limit, {})
-                logger.debug(f"   fetch_orders 返回 {len(orders)} 条")
+                logger.debug("   fetch_orders 返回 %s 条", len(orders))
                 return orders
+            except RATE_LIMIT_ERRORS:
+                raise
             except Exception as e:
                 logger.warning(f"   fetch_orders 失败: {e}，尝试降级方案")
         
@@ -398,29 +609,33 @@ class DefaultAdapter(AdapterInterface):
         all_orders = []
         
         # 获取开放订单
-        if hasattr(self.exchange, 'fetch_open_orders'):
-            logger.debug(f"   使用 fetch_open_orders 方法")
+        if self._has_fetch_open_orders:
+            logger.debug("   使用 fetch_open_orders 方法")
             try:
                 if symbol:
                     open_orders = self.exchange.fetch_open_orders(symbol)
                 else:
                     open_orders = self.exchange.fetch_open_orders()
-                logger.debug(f"   fetch_open_orders 返回 {len(open_orders)} 条")
+                logger.debug("   fetch_open_orders 返回 %s 条", len(open_orders))
                 all_orders.extend(open_orders)
+            except RATE_LIMIT_ERRORS:
+                raise
             except Exception as e:
                 logger.warning(f"   fetch_open_orders 失败: {e}")
         
         # 获取已完成订单
-        if hasattr(self.exchange, 'fetch_closed_orders'):
-            logger.debug(f"   使用 fetch_closed_orders 方法")
+        if self._has_fetch_closed_orders:
+            logger.debug("   使用 fetch_closed_orders 方法")
             try:
                 closed_orders = self.exchange.fetch_closed_orders(symbol, since, limit)
-                logger.debug(f"   fetch_closed_orders 返回 {len(closed_orders)} 条")
+                logger.debug("   fetch_closed_orders 返回 %s 条", len(closed_orders))
                 all_orders.extend(closed_orders)
+            except RATE_LIMIT_ERRORS:
+                raise
             except Exception as e:
                 logger.warning(f"   fetch_closed_orders 失败: {e}")
         
-        logger.debug(f"   总共获取到 {len(all_orders)} 条原始订单")
+        logger.debug("   总共获取到 %s 条原始订单", len(all_orders))
         return all_orders
     
     def _fetch_open_orders_default(self, symbol: Optional[str] = None) -> List[Dict]:
@@ -435,6 +650,25 @@ class DefaultAdapter(AdapterInterface):
     
     # ==================== 持仓相关接口实现 ====================
     
+    def _cached_fetch_balance(self, max_age: float = 2.0) -> dict:
+        """
+        获取账户余额（短时缓存）
+        
+        同一轮轮询中 fetch_positions 和交易对推断都会查询余额，
+        在 max_age 秒内复用上一次结果，避免重复的 HTTP 请求。
+        下单后会清空缓存（见 create_order）
+        
+        Args:
+            max_age: 缓存有效期（秒）
+        """
+        ts, balance = self._balance_cache
+        if balance and time.time() - ts < max_age:
+            return balance
+        
+        balance = self.exchange.fetch_balance()
+        self._balance_cache = (time.time(), balance)
+        return balance
+    
     def fetch_balance(self, symbols: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         获取账户余额（CCXT 格式）
@@ -460,8 +694,10 @@ class DefaultAdapter(AdapterInterface):
             # CCXT 的 fetch_balance() 通常不支持 symbols 参数
             # 大多数交易所（如 Binance）的 fetch_balance() 不接受额外参数
             # 过滤会在 position_service 的格式化方法中进行
-            balance_data = self.exchange.fetch_balance()
+            balance_data = self._cached_fetch_balance()
             return balance_data
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ {self.exchange_id} 获取现货余额失败: {e}")
             return {
@@ -482,11 +718,7 @@ class DefaultAdapter(AdapterInterface):
         Returns:
             标准化的持仓/余额列表
         """
-        capability = (AdapterCapability.FETCH_SPOT_BALANCE 
-                     if self.market_type == 'spot' 
-                     else AdapterCapability.FETCH_FUTURES_POSITIONS)
-        
-        if not self.supports_capability(capability):
+        if not self._supports_positions:
             raise NotImplementedByAdapter(
                 f"❌ {self.exchange_id} 的{self.market_type}持仓查询功能需要定制适配，但尚未实现"
             )
@@ -494,30 +726,29 @@ class DefaultAdapter(AdapterInterface):
         try:
             if self.market_type == 'spot':
                 # 现货：使用 fetch_balance
-                balance_data = self.exchange.fetch_balance()
+                balance_data = self._cached_fetch_balance()
                 return self._normalize_spot_balance(balance_data)
             else:  # futures
                 # 合约：获取持仓
-                # CCXT 的 fetch_positions(symbols=None, params={}) 支持 symbols 参数
-                # symbols 可以是字符串、字符串列表或 None
-                positions_data = self.exchange.fetch_positions(symbols)
-                return self._normalize_futures_positions(positions_data)
-        except TypeError as e:
-            # 如果传递 symbols 导致 TypeError，说明该交易所不支持，回退到不传参数
-            try:
-                if self.market_type == 'spot':
-                    balance_data = self.exchange.fetch_balance()
-                    return self._normalize_spot_balance(balance_data)
+                # symbols 参数是否可用在初始化时已确定（见 _positions_accepts_symbols）
+                if self._positions_accepts_symbols:
+                    positions_data = self.exchange.fetch_positions(symbols)
                 else:
                     positions_data = self.exchange.fetch_positions()
-                    return self._normalize_futures_positions(positions_data)
-            except Exception as e2:
-                logger.error(f"❌ {self.exchange_id} 获取{self.market_type}持仓失败: {e2}")
-                return []
+                return self._normalize_futures_positions(positions_data)
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ {self.exchange_id} 获取{self.market_type}持仓失败: {e}")
             return []
     
+    def _normalize_symbol_cached(self, symbol: str) -> str:
+        """normalize_symbol 的缓存版本（reload_markets 时清空）"""
+        normalized = self._normalize_cache.get(symbol)
+        if normalized is None:
+            normalized = self._normalize_cache[symbol] = self.normalize_symbol(symbol)
+        return normalized
+    
     # ==================== K线数据接口实现 ====================
     
     def fetch_klines(
@@ -536,7 +767,7 @@ class DefaultAdapter(AdapterInterface):
                 logger.warning(f"⚠️ {self.exchange_id} 市场数据未加载，尝试加载...")
                 self._load_markets_with_cache()
             
-            normalized_symbol = self.normalize_symbol(symbol)
+            normalized_symbol = self._normalize_symbol_cached(symbol)
             
             ohlcv = self.exchange.fetch_ohlcv(
                 normalized_symbol,
@@ -546,10 +777,53 @@ class DefaultAdapter(AdapterInterface):
             )
             
             return ohlcv
+        except RATE_LIMIT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"❌ {self.exchange_id} 获取K线失败 {symbol}/{interval}: {e}")
             return []
     
+    def fetch_klines_many(
+        self,
+        symbols: List[str],
+        interval: str = '15m',
+        limit: int = 100,
+        max_workers: int = 16
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        并发获取多个交易对的 K线数据
+        
+        K线请求是网络 I/O 密集型，使用线程池并发请求，
+        扫描大量币种时总耗时从 N 次延迟降到约 N/W 次。
+        CCXT 的 enableRateLimit 仍然生效，不会突破交易所限频
+        
+        Args:
+            symbols: 交易对列表
+            interval: K线周期
+            limit: 每个交易对的 K线数量
+            max_workers: 最大并发数
+        
+        Returns:
+            {symbol: ohlcv}，单个交易对失败时为空列表
+        """
+        if not symbols:
+            return {}
+        
+        # 在主线程中加载市场数据，避免多个线程同时加载
+        if not self.exchange.markets:
+            self._load_markets_with_cache()
+        
+        result = {}
+        with ThreadPoolExecutor(max_workers=min(len(symbols), max_workers)) as executor:
+            futures = {
+                executor.submit(self.fetch_klines, symbol, interval, limit): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                result[futures[future]] = future.result()
+        
+        return result
+    
     # ==================== 价格查询接口实现 ====================
     
     def fetch_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
@@ -563,17 +837,35 @@ class DefaultAdapter(AdapterInterface):
         
         result = {}
         
+        # 🚀 交易所支持批量接口时，一次请求获取全部 ticker
+        if symbols and self.exchange.has.get('fetchTickers'):
+            try:
+                normalized_map = {symbol: self._normalize_symbol_cached(symbol) for symbol in symbols}
+                tickers = self.exchange.fetch_tickers(list(set(normalized_map.values())))
+                
+                for symbol, normalized_symbol in normalized_map.items():
+                    ticker = tickers.get(normalized_symbol)
+                    if ticker:
+                        result[symbol] = self._format_price(ticker)
+                
+                if len(result) == len(normalized_map):
+                    return result
+            except RATE_LIMIT_ERRORS:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ {self.exchange_id} 批量获取价格失败，回退到逐个查询: {e}")
+        
+        # 逐个查询（交易所不支持批量接口，或批量结果缺失的交易对）；
+        # 批量接口触发限频时已直接抛出，不会再逐个请求
         for symbol in symbols:
+            if symbol in result:
+                continue
             try:
-                normalized_symbol = self.normalize_symbol(symbol)
+                normalized_symbol = self._normalize_symbol_cached(symbol)
                 ticker = self.exchange.fetch_ticker(normalized_symbol)
-                
-                result[symbol] = {
-                    'last': self._safe_float(ticker.get('last', 0)),
-                    'bid': self._safe_float(ticker.get('bid', 0)),
-                    'ask': self._safe_float(ticker.get('ask', 0)),
-                    'mark': self._safe_float(ticker.get('last', 0))  # 现货无标记价格，用 last 代替
-                }
+                result[symbol] = self._format_price(ticker)
+            except RATE_LIMIT_ERRORS:
+                raise
             except Exception as e:
                 logger.warning(f"❌ 获取 {symbol} 价格失败: {e}")
                 result[symbol] = {
@@ -585,6 +877,15 @@ class DefaultAdapter(AdapterInterface):
         
         return result
     
+    def _format_price(self, ticker: Dict) -> Dict[str, Any]:
+        """将 CCXT ticker 转换为 {last, bid, ask, mark} 价格格式"""
+        return {
+            'last': self._safe_float(ticker.get('last', 0)),
+            'bid': self._safe_float(ticker.get('bid', 0)),
+            'ask': self._safe_float(ticker.get('ask', 0)),
+            'mark': self._safe_float(ticker.get('last', 0))  # 现货无标记价格，用 last 代替
+        }
+    
     # ==================== 连通性测试接口实现 ====================
     
     def test_connectivity(self) -> Dict[str, Any]:
@@ -594,6 +895,18 @@ class DefaultAdapter(AdapterInterface):
         Returns:
             包含测试结果和余额数据的字典
         """
+        if not self.supports_capability(AdapterCapability.FETCH_SPOT_BALANCE):
+            return {
+                'ok': False,
+                'error': f"{self.exchange_id} 不支持余额查询，无法测试鉴权",
+                'serverTime': int(time.time() * 1000)
+            }
+        
+        # 🚀 短时间内重复的连通性测试（如前端心跳）直接复用上次成功结果
+        cached_at, cached = self._connectivity_cache
+        if cached and time.time() - cached_at < CONNECTIVITY_CACHE_TTL:
+            return {**cached, 'balance': dict(cached['balance'])}
+        
         try:
             start_time = time.time()
             
@@ -603,21 +916,24 @@ class DefaultAdapter(AdapterInterface):
             latency_ms = (time.time() - start_time) * 1000
             
             # 提取余额信息（只包含有余额的币种）
+            safe_float = self._safe_float
             balance_data = {}
             for currency, amounts in balance.items():
                 if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
                     continue
-                total = amounts.get('total', 0)
-                if total and float(total) > 0:
+                total = safe_float(amounts.get('total', 0))
+                if total > 0:
                     balance_data[currency] = str(total)
             
-            return {
+            result = {
                 'ok': True,
                 'serverTime': int(time.time() * 1000),
                 'accountId': None,  # CCXT 不提供统一的 accountId
                 'latencyMs': round(latency_ms, 2),
                 'balance': balance_data  # 返回余额数据
             }
+            self._connectivity_cache = (time.time(), result)
+            return {**result, 'balance': dict(balance_data)}
         except Exception as e:
             logger.error(f"❌ {self.exchange_id} 连通性测试失败: {e}")
             return {
@@ -640,7 +956,39 @@ class DefaultAdapter(AdapterInterface):
             logger.warning(f"⚠️ {self.exchange_id} 市场数据未加载")
             return []
         
-        symbols_list = []
+        # 🚀 相同 (quote, limit) 直接返回缓存结果（markets 被替换时整体失效）
+        markets = self.exchange.markets
+        if self._symbols_cache_markets is not markets:
+            self._symbols_cache.clear()
+            self._symbols_cache_markets = markets
+        
+        key = (quote, limit)
+        cached = self._symbols_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        if limit:
+            symbols_list = list(islice(self.iter_symbols(quote), limit))
+        else:
+            symbols_list = list(self.iter_symbols(quote))
+        
+        self._symbols_cache[key] = symbols_list
+        return list(symbols_list)
+    
+    def iter_symbols(self, quote: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐个生成活跃交易对（惰性，不构建完整列表）
+        
+        Args:
+            quote: 报价币种过滤（如 'USDT'），None 表示不过滤
+        
+        Yields:
+            与 fetch_symbols 相同格式的交易对信息
+        """
+        if not self.exchange or not self.exchange.markets:
+            return
+        
+        safe_float = self._safe_float
         
         for symbol, market in self.exchange.markets.items():
             # 过滤报价币种
@@ -651,26 +999,23 @@ class DefaultAdapter(AdapterInterface):
             if not market.get('active', True):
                 continue
             
-            symbols_list.append({
+            precision = market.get('precision', {})
+            limits = market.get('limits', {})
+            
+            yield {
                 'symbol': symbol,
                 'base': market.get('base', ''),
                 'quote': market.get('quote', ''),
-                'status': 'TRADING' if market.get('active', True) else 'HALTED',
+                'status': 'TRADING',
                 'precision': {
-                    'price': market.get('precision', {}).get('price', 8),
-                    'amount': market.get('precision', {}).get('amount', 8)
+                    'price': precision.get('price', 8),
+                    'amount': precision.get('amount', 8)
                 },
                 'limits': {
-                    'minQty': self._safe_float(market.get('limits', {}).get('amount', {}).get('min', 0)),
-                    'minNotional': self._safe_float(market.get('limits', {}).get('cost', {}).get('min', 0))
+                    'minQty': safe_float(limits.get('amount', {}).get('min', 0)),
+                    'minNotional': safe_float(limits.get('cost', {}).get('min', 0))
                 }
-            })
-            
-            # 数量限制
-            if limit and len(symbols_list) >= limit:
-                break
-        
-        return symbols_list
+            }
     
     # ==================== 数据标准化辅助方法 ====================
     
@@ -685,32 +1030,34 @@ class DefaultAdapter(AdapterInterface):
         Returns:
             统一格式的订单列表
         """
+        # 热循环中频繁使用的方法/属性绑定为局部变量
+        safe_float = self._safe_float
+        fmt_ts = self._format_timestamp
+        exchange_id = self.exchange_id
         normalized = []
         
         for order in raw_orders:
-            # 安全获取 fee 数据
-            fee_data = order.get('fee', {})
-            fee_cost_value = fee_data.get('cost', 0) if fee_data else 0
-            fee_cost = self._safe_float(fee_cost_value)
+            # 安全获取 fee 数据（只取一次）
+            fee_data = order.get('fee') or {}
             
             normalized.append({
                 'orderId': str(order.get('id', '')),
-                'exchange': self.exchange_id,
+                'exchange': exchange_id,
                 'marketType': order_type,
                 'order_type': order_type,  # 兼容旧字段
                 'symbol': order.get('symbol', ''),
                 'side': order.get('side', ''),
                 'type': order.get('type', ''),
-                'price': self._safe_float(order.get('price', 0)),
-                'amount': self._safe_float(order.get('amount', 0)),
-                'filled': self._safe_float(order.get('filled', 0)),
-                'remaining': self._safe_float(order.get('remaining', 0)),
-                'total': self._safe_float(order.get('cost', 0)),
-                'fee': fee_cost,
-                'feeCurrency': fee_data.get('currency', '') if fee_data else '',
+                'price': safe_float(order.get('price', 0)),
+                'amount': safe_float(order.get('amount', 0)),
+                'filled': safe_float(order.get('filled', 0)),
+                'remaining': safe_float(order.get('remaining', 0)),
+                'total': safe_float(order.get('cost', 0)),
+                'fee': safe_float(fee_data.get('cost', 0)),
+                'feeCurrency': fee_data.get('currency', ''),
                 'status': order.get('status', 'unknown'),
-                'orderTime': self._format_timestamp(order.get('timestamp')),
-                'updateTime': self._format_timestamp(order.get('lastTradeTimestamp')),
+                'orderTime': fmt_ts(order.get('timestamp')),
+                'updateTime': fmt_ts(order.get('lastTradeTimestamp')),
             })
         
         return normalized
@@ -719,20 +1066,22 @@ class DefaultAdapter(AdapterInterface):
         """
         标准化现货余额数据
         """
+        safe_float = self._safe_float
+        exchange_id = self.exchange_id
         positions = []
         
         for currency, amounts in balance_data.items():
             if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
                 continue
             
-            total = self._safe_float(amounts.get('total', 0))
+            total = safe_float(amounts.get('total', 0))
             if total > 0:
                 positions.append({
-                    'exchange': self.exchange_id,
+                    'exchange': exchange_id,
                     'type': 'spot',
                     'symbol': currency,
-                    'free': self._safe_float(amounts.get('free', 0)),
-                    'used': self._safe_float(amounts.get('used', 0)),
+                    'free': safe_float(amounts.get('free', 0)),
+                    'used': safe_float(amounts.get('used', 0)),
                     'total': total,
                 })
         
@@ -742,22 +1091,24 @@ class DefaultAdapter(AdapterInterface):
         """
         标准化合约持仓数据
         """
+        safe_float = self._safe_float
+        exchange_id = self.exchange_id
         positions = []
         
         for pos in positions_data:
-            contracts = self._safe_float(pos.get('contracts', 0))
+            contracts = safe_float(pos.get('contracts', 0))
             if contracts != 0:  # 只返回有持仓的
                 positions.append({
-                    'exchange': self.exchange_id,
+                    'exchange': exchange_id,
                     'type': 'futures',
                     'symbol': pos.get('symbol', ''),
                     'side': pos.get('side', ''),
                     'contracts': contracts,
-                    'contractSize': self._safe_float(pos.get('contractSize', 1), 1),
-                    'entryPrice': self._safe_float(pos.get('entryPrice', 0)),
-                    'markPrice': self._safe_float(pos.get('markPrice', 0)),
-                    'unrealizedPnl': self._safe_float(pos.get('unrealizedPnl', 0)),
-                    'leverage': self._safe_float(pos.get('leverage', 1), 1),
+                    'contractSize': safe_float(pos.get('contractSize', 1), 1),
+                    'entryPrice': safe_float(pos.get('entryPrice', 0)),
+                    'markPrice': safe_float(pos.get('markPrice', 0)),
+                    'unrealizedPnl': safe_float(pos.get('unrealizedPnl', 0)),
+                    'leverage': safe_float(pos.get('leverage', 1), 1),
                     'marginType': pos.get('marginType', 'cross'),
                 })
         
@@ -786,6 +1137,8 @@ class DefaultAdapter(AdapterInterface):
                 markets = self.exchange.load_markets(reload=True)
                 # 更新缓存
                 self._market_cache.save_to_cache(self.exchange_id, markets)
+                self._symbols_cache.clear()
+                self._normalize_cache.clear()
                 logger.info(f"✅ {self.exchange_id} 市场数据已重新加载 ({len(markets)} 个交易对)")
                 return markets
             else:
@@ -797,7 +1150,8 @@ class DefaultAdapter(AdapterInterface):
                 # 尝试从缓存加载
                 cached_markets = self._market_cache.load_from_cache(self.exchange_id)
                 if cached_markets:
-                    self.exchange.markets = cached_markets
+                    from util.market_cache import apply_cached_markets
+                    apply_cached_markets(self.exchange, cached_markets)
                     logger.info(f"✅ {self.exchange_id} 从缓存加载市场数据 ({len(cached_markets)} 个交易对)")
                     return cached_markets
                 
@@ -826,3 +1180,10 @@ class DefaultAdapter(AdapterInterface):
     def fetch_order_book(self, symbol: str, limit: int = 20) -> Dict:
         """获取订单簿（CCXT 标准接口）"""
         return self.exchange.fetch_order_book(symbol, limit)
+    
+    def create_order(self, *args, **kwargs) -> Dict:
+        """下单（CCXT 标准接口），成交后余额已变化，清空余额缓存"""
+        try:
+            return self.exchange.create_order(*args, **kwargs)
+        finally:
+            self._balance_cache = (0, {})
@@ -8,7 +8,18 @@ Gate.io 交易所适配器（单实例架构）
 
 import ccxt
 from .default_adapter import DefaultAdapter
-from .adapter_interface import AdapterCapability
+
+
+# ==================== Symbol 标准化（Gate.io 特殊处理） ====================
+
+def _to_spot_symbol(symbol: str) -> str:
+    """Gate.io 现货：'BTC/USDT' (不变)"""
+    return symbol
+
+
+def _to_futures_symbol(symbol: str) -> str:
+    """Gate.io 合约：'BTC/USDT' → 'BTC_USDT' (替换 / 为 _)"""
+    return symbol.replace('/', '_')
 
 
 class GateAdapter(DefaultAdapter):
@@ -16,6 +27,8 @@ class GateAdapter(DefaultAdapter):
     Gate.io 适配器（单实例架构）
     
     继承自 DefaultAdapter，只重写有差异的部分
+    
+    normalize_symbol 在初始化时按 market_type 绑定为 _to_spot_symbol / _to_futures_symbol
     """
     
     def __init__(self, market_type: str, config: dict):
@@ -31,49 +44,8 @@ class GateAdapter(DefaultAdapter):
         
         根据 market_type 创建对应的实例
         """
-        base_config = {
-            'apiKey': self.config.get('apiKey', ''),
-            'secret': self.config.get('secret', ''),
-            'enableRateLimit': True,
-            'timeout': self.config.get('timeout', 30000),
-        }
-        
-        if 'proxies' in self.config:
-            base_config['proxies'] = self.config['proxies']
-        
-        # 根据 market_type 设置 defaultType
-        if self.market_type == 'futures':
-            base_config['options'] = {'defaultType': 'swap'}
-        else:  # spot
-            base_config['options'] = {'defaultType': 'spot'}
-        
         # 创建实例
-        self.exchange = ccxt.gate(base_config)
+        self.exchange = ccxt.gate(self._build_exchange_config())
         
-        # 声明支持的功能
-        self._supported_capabilities = {
-            AdapterCapability.FETCH_SPOT_ORDERS,
-            AdapterCapability.FETCH_FUTURES_ORDERS,
-            AdapterCapability.FETCH_SPOT_BALANCE,
-            AdapterCapability.FETCH_FUTURES_POSITIONS,
-        }
-    
-    # ==================== Symbol 标准化（Gate.io 特殊处理） ====================
-    
-    def normalize_symbol(self, symbol: str) -> str:
-        """
-        Gate.io 特殊的符号格式
-        
-        Args:
-            symbol: 通用格式 'BTC/USDT'
-        
-        Returns:
-            Gate.io 格式：
-            - 现货：'BTC/USDT' (不变)
-            - 合约：'BTC_USDT' (替换 / 为 _)
-        """
-        if self.market_type == 'futures':
-            # Gate.io 合约：BTC/USDT → BTC_USDT
-            return symbol.replace('/', '_')
-        return symbol
- 
\ No newline at end of file
+        # 市场类型在实例生命周期内不变，直接绑定对应的符号转换函数
+        self.normalize_symbol = _to_futures_symbol if self.market_type == 'futures' else _to_spot_symbol
@@ -8,7 +8,6 @@ OKX 交易所适配器
 
 import ccxt
 from .default_adapter import DefaultAdapter
-from .adapter_interface import AdapterCapability
 
 
 class OKXAdapter(DefaultAdapter):
@@ -41,32 +40,8 @@ class OKXAdapter(DefaultAdapter):
             )
         
         # 基础配置
-        exchange_config = {
-            'apiKey': self.config.get('apiKey', ''),
-            'secret': self.config.get('secret', ''),
-            'password': self.config.get('password'),  # OKX 必需
-            'enableRateLimit': True,
-            'timeout': self.config.get('timeout', 30000),
-        }
-        
-        # 代理配置
-        if 'proxies' in self.config:
-            exchange_config['proxies'] = self.config['proxies']
-        
-        # 根据 market_type 设置 defaultType
-        if self.market_type == 'futures':
-            exchange_config['options'] = {'defaultType': 'swap'}
-        else:  # spot
-            exchange_config['options'] = {'defaultType': 'spot'}
+        exchange_config = self._build_exchange_config()
+        exchange_config['password'] = self.config.get('password')  # OKX 必需
         
         # 创建实例
         self.exchange = ccxt.okx(exchange_config)
-        
-        # 声明支持的功能
-        self._supported_capabilities = {
-            AdapterCapability.FETCH_SPOT_ORDERS,
-            AdapterCapability.FETCH_FUTURES_ORDERS,
-            AdapterCapability.FETCH_SPOT_BALANCE,
-            AdapterCapability.FETCH_FUTURES_POSITIONS,
-        }
-
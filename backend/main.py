@@ -8,12 +8,31 @@ Gap Trader Backend - 应用入口
 4. 处理应用生命周期事件
 """
 
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+import hashlib
 import logging
+import time
 
-# 导入路由模块
+# 可选：orjson 序列化响应更快（持仓/价格/K线等列表接口），未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 配置日志（降低到 INFO，静音 ccxt DEBUG 输出）
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# 降低 ccxt 日志级别，避免输出 HTTP DEBUG
+# 子模块（ccxt.base.exchange / ccxt.async_support / ccxt.pro 等）未单独设置级别，继承父 logger；
+# ccxt 的 debug 日志使用延迟格式化，被 isEnabledFor 拦截时不会创建日志记录
+logging.getLogger('ccxt').setLevel(logging.WARNING)
+
+# 导入路由模块（路由模块在导入时加载 app_config，需在日志配置之后）
 from routers import (
     system_router,
     exchange_router,
@@ -27,22 +46,10 @@ from routers import (
 
 # 导入后台任务
 from background_tasks import start_background_tasks
-
-# 配置日志（降低到 INFO，静音 ccxt DEBUG 输出）
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-# 降低 ccxt 及其子模块日志级别，避免输出 HTTP DEBUG
-for name in [
-    'ccxt',
-    'ccxt.base.exchange',
-    'ccxt.base.throttle',
-    'ccxt.async_support',
-    'ccxt.pro'
-]:
-    logging.getLogger(name).setLevel(logging.WARNING)
+from app_config import market_cache, ws_manager
+from exchange_adapters.async_default_adapter import close_shared_aiohttp_session
+from exchange_adapters.default_adapter import close_shared_sessions
+from routers.trading_link_routes import flush_trading_links
 
 logger = logging.getLogger(__name__)
 
@@ -50,34 +57,258 @@ logger = logging.getLogger(__name__)
 # FastAPI 应用创建
 # ============================================================================
 
-app = FastAPI(title="Gap Trader Backend", version="1.0.0")
+class ORJSONResponse(JSONResponse):
+    """使用 orjson 渲染的 JSON 响应（支持非字符串键和 numpy 数组）"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(
+    title="Gap Trader Backend",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse,
+)
 
 
 # ============================================================================
 # 中间件配置
 # ============================================================================
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """安全响应头中间件"""
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        return response
+# 安全响应头（模块加载时预先编码）
+_SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+
+# 前端高频轮询的 JSON 接口，跳过安全响应头（这些头只对浏览器渲染的页面有意义）
+_FAST_PATHS = ("/api/prices", "/api/positions")
 
 
+class SecurityHeadersMiddleware:
+    """
+    安全响应头中间件（纯 ASGI 实现）
+    
+    只在 http.response.start 消息上追加响应头，
+    不像 BaseHTTPMiddleware 那样为每个请求创建 Request/Response 包装和额外任务
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").startswith(_FAST_PATHS):
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + _SECURITY_HEADERS
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+class FastCORSMiddleware:
+    """
+    CORS 中间件（纯 ASGI 实现，固定来源白名单）
+    
+    等价于 CORSMiddleware(allow_origins=origins, allow_credentials=True,
+    allow_methods=["*"], allow_headers=["*"])：
+    - 直接在 scope["headers"] 中查找 Origin，用 frozenset 判断是否允许
+    - 预检响应头和简单请求响应头在初始化时预先编码
+    """
+    
+    ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    MAX_AGE = b"600"
+    
+    def __init__(self, app, origins):
+        self.app = app
+        self.allowed = frozenset(origin.encode() for origin in origins)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        allowed = origin in self.allowed
+        
+        # 预检请求：直接响应，不进入路由
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(send, origin if allowed else None, request_headers)
+            return
+        
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+        
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+        ]
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                for i, (name, value) in enumerate(headers):
+                    if name.lower() == b"vary":
+                        headers[i] = (name, value + b", Origin")
+                        break
+                else:
+                    headers.append((b"vary", b"Origin"))
+                message["headers"] = headers + cors_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+    
+    async def _preflight(self, send, origin, request_headers):
+        """预检响应（origin 为 None 表示来源不在白名单中）"""
+        headers = [
+            (b"access-control-allow-methods", self.ALLOW_METHODS),
+            (b"access-control-max-age", self.MAX_AGE),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        if request_headers is not None:
+            headers.append((b"access-control-allow-headers", request_headers))
+        
+        if origin is not None:
+            headers.append((b"access-control-allow-origin", origin))
+            status, body = 200, b"OK"
+        else:
+            status, body = 400, b"Disallowed CORS origin"
+        
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# 跨客户端相同、变化缓慢的 GET 接口：{路径: 客户端缓存时间（秒）}
+# 0 表示写操作后必须立即可见：使用 no-cache，每次都调用路由，仅在内容未变时返回 304
+_CACHEABLE_PATHS = {
+    "/api/exchanges": 86400,
+    "/api/symbols": 300,
+    "/api/markets/cache": 30,
+    "/api/markets/status": 30,
+    "/api/cookies/baidu/stats/count": 0,  # 上传/删除 Cookie 后计数需立即更新
+}
+
+
+class HTTPCacheMiddleware:
+    """
+    HTTP 缓存中间件（纯 ASGI 实现）
+    
+    对 _CACHEABLE_PATHS 中的 GET 接口：
+    - 响应追加 Cache-Control 和 ETag（响应体的 blake2s 摘要）
+    - If-None-Match 与仍在 max-age 内的 ETag 相同时，直接返回 304，不调用路由
+    - 否则调用路由，ETag 与 If-None-Match 相同时也以 304 返回（不发送响应体）
+    - max-age 为 0 的接口使用 no-cache，从不跳过路由
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        # {路径 + 查询参数: (过期时间, ETag)}
+        self._etags = {}
+    
+    async def __call__(self, scope, receive, send):
+        max_age = _CACHEABLE_PATHS.get(scope.get("path")) if scope["type"] == "http" else None
+        if max_age is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        cache_control = b"public, max-age=%d" % max_age if max_age else b"no-cache"
+        key = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+                break
+        
+        entry = self._etags.get(key) if max_age else None
+        if if_none_match and entry and entry[0] > time.monotonic() and entry[1] == if_none_match:
+            await self._send_not_modified(send, entry[1], cache_control)
+            return
+        
+        start_message = None
+        body_parts = []
+        
+        async def send_with_etag(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    start_message = False
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            
+            if start_message is False or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            # 缓冲响应体（这些接口返回的都是小 JSON），计算 ETag 后一次性发送
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = b"".join(body_parts)
+            etag = b'"%s"' % hashlib.blake2s(body, digest_size=8).hexdigest().encode()
+            if max_age:
+                if len(self._etags) >= 1024:
+                    self._etags.clear()
+                self._etags[key] = (time.monotonic() + max_age, etag)
+            
+            if if_none_match == etag:
+                await self._send_not_modified(send, etag, cache_control)
+                return
+            
+            start_message["headers"] = list(start_message.get("headers", ())) + [
+                (b"cache-control", cache_control),
+                (b"etag", etag),
+            ]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_with_etag)
+    
+    @staticmethod
+    async def _send_not_modified(send, etag: bytes, cache_control: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [(b"cache-control", cache_control), (b"etag", etag)],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+
+# 添加 HTTP 缓存中间件
+app.add_middleware(HTTPCacheMiddleware)
+
 # 添加安全响应头中间件
 app.add_middleware(SecurityHeadersMiddleware)
 
 # 配置CORS
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    FastCORSMiddleware,
+    origins=["http://localhost:5173", "http://localhost:3000"],
 )
 
 
@@ -105,8 +336,6 @@ logger.info("✅ 所有路由已注册")
 @app.on_event("startup")
 async def startup_event():
     """应用启动事件"""
-    from app_config import market_cache
-    
     logger.info("🚀 应用启动中...")
     
     # 显示缓存统计信息
@@ -127,10 +356,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭事件"""
-    from app_config import ws_manager
-    
     logger.info("🛑 应用关闭中...")
     await ws_manager.cleanup()
+    await close_shared_aiohttp_session()
+    close_shared_sessions()
+    flush_trading_links()
     logger.info("✅ 资源清理完成")
 
 
@@ -1,9 +1,21 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import json
+import logging
 from sqlalchemy import Column, Integer, String, DateTime, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.types import TypeDecorator
+
+# 可选：orjson 序列化/解析更快，未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
 
 # SQLAlchemy Base
 Base = declarative_base()
@@ -142,6 +154,32 @@ class TradingWebsiteLinkUpdate(BaseModel):
 
 # ===== Cookie 数据模型 =====
 
+class JSONText(TypeDecorator):
+    """
+    以 JSON 文本存储的 dict 字段（兼容已有的 String 列数据）
+    
+    读写时在类型层完成序列化/反序列化，服务层直接使用 dict
+    """
+    impl = String
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if not value:
+            return None
+        if HAS_ORJSON:
+            return orjson.dumps(value).decode()
+        return json.dumps(value, ensure_ascii=False)
+    
+    def process_result_value(self, value, dialect):
+        if not value:
+            return None
+        try:
+            return orjson.loads(value) if HAS_ORJSON else json.loads(value)
+        except ValueError:
+            logger.warning(f"⚠️ 无法解析 headers JSON: {value[:50]}...")
+            return None
+
+
 class BaiduCookieData(Base):
     """百度 Cookie 数据库模型（SQLAlchemy ORM）"""
     __tablename__ = "baidu_cookies"
@@ -151,7 +189,7 @@ class BaiduCookieData(Base):
     baidulocnew = Column(String(255), nullable=True, comment="BAIDULOCNEW Cookie值")
     url = Column(String(1024), nullable=True, comment="请求URL")
     timestamp = Column(String(50), nullable=True, comment="时间戳")
-    headers = Column(String, nullable=True, comment="请求头（JSON格式）")
+    headers = Column(JSONText, nullable=True, comment="请求头（JSON格式）")
     # 代理 IP 信息
     proxy_ip = Column(String(50), nullable=True, comment="代理IP地址")
     proxy_port = Column(Integer, nullable=True, comment="代理端口")
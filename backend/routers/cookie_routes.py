@@ -4,20 +4,42 @@ Cookie 数据路由
 负责接收和管理百度 Cookie 数据的 API 接口
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from typing import Dict, List, Optional, Tuple
 import logging
 import sys
 import os
+import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from models import BaiduCookieRequest, BaiduCookieResponse
-from services.cookie_service import cookie_service
+from services.cookie_service import get_cookie_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/cookies", tags=["cookies"])
 
+# 看板持续轮询列表和总数，数据变化很慢：短时间内复用结果，上传/删除时立即失效
+_COOKIE_LIST_TTL = 10.0
+_COOKIE_COUNT_TTL = 30.0
+_COOKIE_LIST_CACHE_SIZE = 16
+
+# {limit: (缓存时间, 序列化后的 JSON)}，命中时跳过数据库查询和模型序列化
+_cookie_list_cache: Dict[int, Tuple[float, bytes]] = {}
+_cookie_count_cache: Optional[Tuple[float, int]] = None
+_cache_stats = {'hits': 0, 'misses': 0}
+
+_cookie_list_adapter = TypeAdapter(List[BaiduCookieResponse])
+
+
+def _invalidate_cookie_cache():
+    """Cookie 数据变更后清空列表和总数缓存"""
+    global _cookie_count_cache
+    _cookie_list_cache.clear()
+    _cookie_count_cache = None
+
 
 @router.post("/baidu", response_model=BaiduCookieResponse)
 async def upload_baidu_cookie(cookie_data: BaiduCookieRequest):
@@ -40,9 +62,10 @@ async def upload_baidu_cookie(cookie_data: BaiduCookieRequest):
             )
         
         # 保存到数据库
-        result = cookie_service.save_cookie_data(cookie_data)
+        result = get_cookie_service().save_cookie_data(cookie_data)
         
         if result:
+            _invalidate_cookie_cache()
             logger.info(f"✅ Cookie 数据已保存到数据库（ID: {result.id}）")
             return result
         else:
@@ -61,6 +84,31 @@ async def upload_baidu_cookie(cookie_data: BaiduCookieRequest):
         )
 
 
+@router.post("/baidu/batch")
+async def upload_baidu_cookie_batch(cookies: List[BaiduCookieRequest]):
+    """
+    批量接收百度 Cookie 数据（来自 mitmproxy）
+    
+    - 以 AFD_IP 作为去重键，已存在则更新，不存在则创建
+    - AFD_IP 为空的记录会被跳过
+    - 整批数据在一个事务中写入
+    """
+    try:
+        logger.info(f"📥 接收到批量 Cookie 数据: {len(cookies)} 条")
+        result = get_cookie_service().save_cookie_batch(cookies)
+        
+        if result['inserted'] or result['updated']:
+            _invalidate_cookie_cache()
+        
+        return result
+    except Exception as e:
+        logger.error(f"❌ 批量保存 Cookie 数据失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
 @router.get("/baidu", response_model=List[BaiduCookieResponse])
 async def get_all_cookies(limit: int = 100):
     """
@@ -68,10 +116,23 @@ async def get_all_cookies(limit: int = 100):
     
     - limit: 返回数量限制（默认 100）
     """
+    now = time.monotonic()
+    entry = _cookie_list_cache.get(limit)
+    if entry and now - entry[0] < _COOKIE_LIST_TTL:
+        _cache_stats['hits'] += 1
+        return Response(content=entry[1], media_type="application/json")
+    
     try:
-        cookies = cookie_service.get_all_cookies(limit=limit)
+        _cache_stats['misses'] += 1
+        cookies = get_cookie_service().get_all_cookies(limit=limit)
+        content = _cookie_list_adapter.dump_json(cookies)
+        
+        if len(_cookie_list_cache) >= _COOKIE_LIST_CACHE_SIZE:
+            _cookie_list_cache.clear()
+        _cookie_list_cache[limit] = (now, content)
+        
         logger.info(f"📊 返回 {len(cookies)} 条 Cookie 数据")
-        return cookies
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"❌ 查询 Cookie 数据失败: {e}")
         raise HTTPException(
@@ -80,13 +141,30 @@ async def get_all_cookies(limit: int = 100):
         )
 
 
+@router.get("/baidu/export")
+def export_cookies(limit: int = Query(10000, ge=1)):
+    """
+    导出百度 Cookie 数据（NDJSON 流，每行一条记录，按创建时间降序）
+    
+    - limit: 导出数量限制（默认 10000）
+    
+    边查询边发送，不在内存中组装完整列表
+    """
+    logger.info(f"📤 导出 Cookie 数据: limit={limit}")
+    lines = (
+        cookie.model_dump_json().encode() + b"\n"
+        for cookie in get_cookie_service().iter_cookies(limit=limit)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @router.get("/baidu/{afd_ip}", response_model=BaiduCookieResponse)
 async def get_cookie_by_afd_ip(afd_ip: str):
     """
     根据 AFD_IP 查询 Cookie 数据
     """
     try:
-        cookie = cookie_service.get_cookie_by_afd_ip(afd_ip)
+        cookie = get_cookie_service().get_cookie_by_afd_ip(afd_ip)
         
         if cookie:
             logger.info(f"✅ 找到 Cookie 数据（AFD_IP: {afd_ip[:20]}...）")
@@ -112,9 +190,10 @@ async def delete_cookie(cookie_id: int):
     删除 Cookie 数据
     """
     try:
-        success = cookie_service.delete_cookie(cookie_id)
+        success = get_cookie_service().delete_cookie(cookie_id)
         
         if success:
+            _invalidate_cookie_cache()
             logger.info(f"✅ Cookie 数据已删除（ID: {cookie_id}）")
             return {"message": "Cookie deleted successfully", "id": cookie_id}
         else:
@@ -137,8 +216,16 @@ async def get_cookie_count():
     """
     获取 Cookie 数据总数统计
     """
+    global _cookie_count_cache
     try:
-        count = cookie_service.get_cookie_count()
+        now = time.monotonic()
+        if _cookie_count_cache and now - _cookie_count_cache[0] < _COOKIE_COUNT_TTL:
+            _cache_stats['hits'] += 1
+            count = _cookie_count_cache[1]
+        else:
+            _cache_stats['misses'] += 1
+            count = get_cookie_service().get_cookie_count()
+            _cookie_count_cache = (now, count)
         return {
             "total_cookies": count,
             "message": f"Total {count} cookie records in database"
@@ -150,3 +237,15 @@ async def get_cookie_count():
             detail=f"Failed to get cookie count: {str(e)}"
         )
 
+
+@router.get("/baidu/stats/cache")
+async def get_cookie_cache_stats():
+    """
+    获取 Cookie 接口缓存命中统计（用于调整 TTL）
+    """
+    return {
+        "cache_hits": _cache_stats['hits'],
+        "cache_misses": _cache_stats['misses'],
+        "list_ttl": _COOKIE_LIST_TTL,
+        "count_ttl": _COOKIE_COUNT_TTL,
+    }
@@ -6,12 +6,18 @@
 - 测试交易所连接
 """
 
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 from typing import Optional
 
+from app_config import exchange_service
+
 router = APIRouter()
 
+# 交易所列表只在部署时变化，首次请求时序列化一次，之后直接返回缓存的 JSON
+_exchanges_json: Optional[bytes] = None
+
 
 class TestExchangeRequest(BaseModel):
     """测试交易所连接的请求模型"""
@@ -24,15 +30,15 @@ class TestExchangeRequest(BaseModel):
 @router.get("/api/exchanges")
 async def get_exchanges():
     """获取所有支持的交易所列表"""
-    from app_config import exchange_service
-    return exchange_service.get_exchange_list()
+    global _exchanges_json
+    if _exchanges_json is None:
+        _exchanges_json = json.dumps(exchange_service.get_exchange_list()).encode()
+    return Response(content=_exchanges_json, media_type="application/json")
 
 
 @router.post("/api/test-exchange")
 async def test_exchange_connection(request: TestExchangeRequest):
     """测试交易所连接并获取账户余额"""
-    from app_config import exchange_service
-    
     result = await exchange_service.test_exchange_connection(
         request.exchange,
         request.apiKey,
@@ -9,14 +9,37 @@
 - 持仓查询
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Response
 from pydantic import BaseModel, ValidationError
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, Tuple, Iterator
+import hashlib
+import json
 import logging
+import time
+
+# 可选：orjson 序列化持仓结果更快，未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from app_config import market_service, price_service, position_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# 缓存统计需要扫描缓存目录并读取元数据文件，看板频繁轮询时短时间内复用结果
+_CACHE_INFO_TTL = 5.0
+_cache_info_snapshot: Optional[Tuple[float, Dict[str, Any]]] = None
+
+# 持仓结果短时缓存：前端高频轮询，交易所数据本身按秒更新
+# {请求摘要（含凭证）: (缓存时间, 序列化后的 JSON)}
+_POSITIONS_CACHE_TTL = 2.0
+_POSITIONS_CACHE_SIZE = 256
+_positions_cache: Dict[bytes, Tuple[float, bytes]] = {}
+_positions_cache_stats = {'hits': 0, 'misses': 0}
+
 
 # ============================================================================
 # Request Models
@@ -50,8 +73,6 @@ async def get_klines(
     market_type: str = Query("spot", description="市场类型 (spot/futures)")
 ):
     """获取K线数据"""
-    from app_config import market_service
-    
     try:
         result = await market_service.get_klines(exchange, symbol, interval, limit, market_type)
         return result
@@ -65,10 +86,16 @@ async def get_klines(
 @router.get("/api/markets/cache")
 async def get_cache_info():
     """获取市场数据缓存统计信息"""
-    from app_config import market_service
+    global _cache_info_snapshot
+    
+    now = time.monotonic()
+    if _cache_info_snapshot and now - _cache_info_snapshot[0] < _CACHE_INFO_TTL:
+        return _cache_info_snapshot[1]
     
     try:
-        return market_service.get_cache_info()
+        result = market_service.get_cache_info()
+        _cache_info_snapshot = (now, result)
+        return result
     except Exception as e:
         logger.error(f"获取缓存信息失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -77,7 +104,6 @@ async def get_cache_info():
 @router.get("/api/markets/status")
 async def get_markets_status():
     """获取市场数据加载状态"""
-    from app_config import market_service
     return market_service.get_markets_status()
 
 
@@ -88,8 +114,6 @@ async def get_symbols(
     limit: int = Query(100, description="返回数量限制")
 ):
     """获取指定交易所的交易对列表"""
-    from app_config import market_service
-    
     try:
         result = await market_service.get_symbols(exchange, quote, limit)
         return result
@@ -119,8 +143,6 @@ async def get_prices(request: dict):
         ]
     }
     """
-    from app_config import price_service
-    
     try:
         symbols_list = request.get('symbols', [])
         result = await price_service.get_prices(symbols_list)
@@ -136,6 +158,57 @@ async def get_prices(request: dict):
 # 持仓管理 API
 # ============================================================================
 
+def _expand_credentials(credentials: List[ExchangeCredentials]) -> Iterator[Tuple[str, str, dict]]:
+    """
+    按账户类型展开凭证，逐个产出 (小写交易所, marketType, 带 marketType 的凭证字典)
+    
+    - 统一账户（unifiedAccount=True）：只产出一次，marketType 为 'unified'
+    - 分离账户：分别产出现货和合约
+    """
+    for cred in credentials:
+        # 凭证可信（model_construct 构建），直接使用实例字典，不走 model_dump
+        cred_dict = cred.__dict__
+        exchange = (cred.exchange or '').lower()
+        
+        if cred.unifiedAccount:
+            # 🎯 统一账户：只查询一次
+            logger.info("✅ 统一账户: %s (只查询一次)", cred.exchange)
+            market_types = ('unified',)
+        else:
+            # 🔄 分离账户：分别查询现货和合约
+            logger.info("🔄 分离账户: %s (查询现货+合约)", cred.exchange)
+            market_types = ('spot', 'futures')
+        
+        for market_type in market_types:
+            expanded = cred_dict.copy()
+            expanded['marketType'] = market_type
+            yield exchange, market_type, expanded
+
+
+def _positions_cache_key(
+    expanded_credentials: List[dict],
+    expanded_symbols: Dict[Tuple[str, str], List[str]],
+    symbols: Optional[List[str]]
+) -> bytes:
+    """持仓缓存键：对凭证（含 API Key）和过滤条件做摘要，不同账户的数据互相隔离"""
+    canonical = json.dumps(
+        [expanded_credentials, sorted(expanded_symbols.items()), symbols],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.blake2s(canonical.encode(), digest_size=16).digest()
+
+
+def _store_positions(key: bytes, now: float, content: bytes):
+    """写入持仓缓存（满时先淘汰过期条目，仍满则清空）"""
+    if len(_positions_cache) >= _POSITIONS_CACHE_SIZE:
+        for stale_key in [k for k, (ts, _) in _positions_cache.items() if now - ts >= _POSITIONS_CACHE_TTL]:
+            del _positions_cache[stale_key]
+        if len(_positions_cache) >= _POSITIONS_CACHE_SIZE:
+            _positions_cache.clear()
+    _positions_cache[key] = (now, content)
+
+
 @router.post("/api/positions")
 async def get_positions(request: Any = Body(...)):
     """
@@ -149,63 +222,42 @@ async def get_positions(request: Any = Body(...)):
     - 分离账户交易所（unifiedAccount=False）：分别查询现货和合约
     - symbols: 可选的币种列表，用于过滤持仓，只返回匹配的币种（可以大幅提升查询速度）
     """
-    import time
-    from app_config import position_service
-    
     # 记录接口开始时间
     api_start_time = time.time()
     
     try:
         # 兼容处理：支持新旧两种格式
+        # 支持两种过滤格式：
+        # 1. symbolPairs: {exchange: {marketType: [symbols]}} - 前端生成的交易对映射（推荐）
+        # 2. symbols: [base_currencies] - 基础货币列表（向后兼容）
+        symbol_pairs = None
+        symbols = None
         if isinstance(request, list):
             # 旧格式：直接传递 credentials 数组
-            credentials = [ExchangeCredentials(**cred) if isinstance(cred, dict) else cred for cred in request]
-            symbols = None
+            raw_credentials = request
         elif isinstance(request, dict) and "credentials" in request:
             # 新格式：PositionsRequest 对象
-            credentials = [ExchangeCredentials(**cred) if isinstance(cred, dict) else cred for cred in request["credentials"]]
-            # 支持两种格式：
-            # 1. symbolPairs: {exchange: {marketType: [symbols]}} - 前端生成的交易对映射（推荐）
-            # 2. symbols: [base_currencies] - 基础货币列表（向后兼容）
+            raw_credentials = request["credentials"]
             symbol_pairs = request.get("symbolPairs")
             symbols = request.get("symbols")  # 向后兼容
         else:
             raise HTTPException(status_code=400, detail="无效的请求格式，请使用 {'credentials': [...]} 或 [...] 格式")
         
-        # 根据 unifiedAccount 字段决定是否扩展
-        expanded_credentials = []
-        for cred in credentials:
-            cred_dict = cred.dict()
-            
-            if cred.unifiedAccount:
-                # 🎯 统一账户：只添加一次，marketType 设为 'unified'
-                unified_cred = {**cred_dict, 'marketType': 'unified'}
-                expanded_credentials.append(unified_cred)
-                logger.info(f"✅ 统一账户: {cred.exchange} (只查询一次)")
-            else:
-                # 🔄 分离账户：分别添加现货和合约
-                spot_cred = {**cred_dict, 'marketType': 'spot'}
-                expanded_credentials.append(spot_cred)
-                
-                futures_cred = {**cred_dict, 'marketType': 'futures'}
-                expanded_credentials.append(futures_cred)
-                logger.info(f"🔄 分离账户: {cred.exchange} (查询现货+合约)")
+        # 凭证由前端生成，使用 model_construct 跳过逐字段校验
+        credentials = [
+            ExchangeCredentials.model_construct(**cred) if isinstance(cred, dict) else cred
+            for cred in raw_credentials
+        ]
         
-        # 将 symbolPairs 转换为每个交易所的 symbols
+        # 根据 unifiedAccount 字段扩展凭证，同时将 symbolPairs 转换为每个交易所的 symbols
         # 如果提供了 symbolPairs，使用它；否则使用 symbols（向后兼容）
+        expanded_credentials = []
         expanded_symbols = {}
-        if symbol_pairs:
-            # 使用前端传递的交易对映射
-            for cred in expanded_credentials:
-                exchange = cred.get('exchange', '').lower()
-                market_type = cred.get('marketType', '').lower()
-                
-                # 统一 market_type 格式
-                if market_type == 'future':
-                    market_type = 'futures'
-                
-                if exchange in symbol_pairs and market_type in symbol_pairs[exchange]:
-                    expanded_symbols[f"{exchange}_{market_type}"] = symbol_pairs[exchange][market_type]
+        for exchange, market_type, expanded_cred in _expand_credentials(credentials):
+            expanded_credentials.append(expanded_cred)
+            if symbol_pairs and market_type in symbol_pairs.get(exchange, ()):
+                # 使用前端传递的交易对映射
+                expanded_symbols[(exchange, market_type)] = symbol_pairs[exchange][market_type]
         
         if symbol_pairs:
             logger.info(f"📊 持仓查询: 收到 {len(credentials)} 个交易所凭证，扩展为 {len(expanded_credentials)} 个查询，使用前端传递的交易对映射")
@@ -214,6 +266,16 @@ async def get_positions(request: Any = Body(...)):
         else:
             logger.info(f"📊 持仓查询: 收到 {len(credentials)} 个交易所凭证，扩展为 {len(expanded_credentials)} 个查询（无币种过滤）")
         
+        # 相同凭证和过滤条件在 TTL 内直接返回缓存结果
+        cache_key = _positions_cache_key(expanded_credentials, expanded_symbols, symbols)
+        now = time.monotonic()
+        entry = _positions_cache.get(cache_key)
+        if entry and now - entry[0] < _POSITIONS_CACHE_TTL:
+            _positions_cache_stats['hits'] += 1
+            logger.info(f"⚡ 持仓查询命中缓存 (命中 {_positions_cache_stats['hits']} / 未命中 {_positions_cache_stats['misses']})")
+            return Response(content=entry[1], media_type="application/json")
+        _positions_cache_stats['misses'] += 1
+        
         # 调用服务层获取持仓
         # 如果提供了 symbolPairs，传递 expanded_symbols；否则传递 symbols（向后兼容）
         service_start_time = time.time()
@@ -234,7 +296,14 @@ async def get_positions(request: Any = Body(...)):
         if api_elapsed > 1.0:
             logger.warning(f"⚠️ [性能警告] /api/positions 接口耗时过长: {api_elapsed:.3f}秒 (超过1秒阈值)")
         
-        return result
+        # 只缓存成功的结果
+        if not result.get("success"):
+            return result
+        
+        content = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS) if HAS_ORJSON else json.dumps(result, default=str).encode()
+        # 以数据取回的时间计算 TTL，慢查询的结果不会一写入就过期
+        _store_positions(cache_key, time.monotonic(), content)
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"❌ 获取持仓失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取持仓失败: {str(e)}")
@@ -8,14 +8,22 @@
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, PositiveFloat, model_validator
+from typing import List, Optional, Dict, Literal, Tuple, Union
+import asyncio
 import logging
 import ccxt
 
+from app_config import order_service
+from exchange_adapters import get_pooled_adapter, adapter_lock, evict_adapter
+from services.rate_limiter import call_with_rate_limit
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# 批量查询 Backpack 最大可下单数量时的并发上限（避免触发交易所限频）
+BACKPACK_BATCH_CONCURRENCY = 8
+
 
 # ============================================================================
 # Request Models
@@ -44,17 +52,28 @@ class CreateOrderRequest(BaseModel):
     exchange: str
     marketType: str  # 'spot' 或 'futures'
     symbol: str  # 交易对，如 'BTC/USDT'
-    type: str  # 'limit' 或 'market'
-    side: str  # 'buy' 或 'sell'
-    amount: float  # 数量
+    type: Literal['limit', 'market']
+    side: Literal['buy', 'sell']
+    amount: PositiveFloat  # 数量（必须大于 0）
     price: Optional[float] = None  # 价格（限价单必填）
     credentials: ExchangeCredentials  # 交易所凭证
     closePosition: Optional[str] = None  # 平仓方向：'long' 或 'short'（用于合约平仓）
+    
+    @model_validator(mode='after')
+    def _price_required(self):
+        """限价单必须提供价格"""
+        if self.type == 'limit' and self.price is None:
+            raise ValueError("限价单必须提供价格")
+        return self
 
 
-class MaxOrderQuantityRequest(BaseModel):
-    """查询最大可下单数量"""
-    exchange: str
+class CreateOrdersRequest(BaseModel):
+    """批量创建订单的请求模型"""
+    orders: List[CreateOrderRequest]
+
+
+class MaxOrderQuantityItem(BaseModel):
+    """最大可下单数量的查询条件"""
     symbol: str  # 标准格式，如 'BTC/USDT'
     side: str  # 'buy' or 'sell'
     price: Optional[float] = None  # 限价单必填
@@ -62,7 +81,19 @@ class MaxOrderQuantityRequest(BaseModel):
     autoBorrow: Optional[bool] = None
     autoBorrowRepay: Optional[bool] = None
     autoLendRedeem: Optional[bool] = None
+
+
+class MaxOrderQuantityRequest(MaxOrderQuantityItem):
+    """查询最大可下单数量"""
+    exchange: str
+    credentials: ExchangeCredentials
+
+
+class MaxOrderQuantityBatchRequest(BaseModel):
+    """批量查询最大可下单数量（同一账户的多个交易对）"""
+    exchange: str
     credentials: ExchangeCredentials
+    items: List[MaxOrderQuantityItem]
 
 
 # ============================================================================
@@ -73,6 +104,25 @@ class MaxOrderQuantityRequest(BaseModel):
 # 现在直接使用前端传来的 symbol，不需要后端重新标准化
 
 
+def _expand_order_credentials(credentials: List[ExchangeCredentials]) -> List[dict]:
+    """
+    根据 unifiedAccount 字段展开凭证（每个凭证只导出一次字段）
+    
+    - 统一账户（unifiedAccount=True）：只查询一次，marketType 设为 'unified'
+    - 分离账户（unifiedAccount=False）：分别查询现货和合约
+    """
+    expanded_credentials = []
+    for cred in credentials:
+        # 请求体已通过校验，实例字典即字段值，无需 model_dump 逐字段导出
+        base = cred.__dict__
+        market_types = ('unified',) if cred.unifiedAccount else ('spot', 'futures')
+        for market_type in market_types:
+            expanded = base.copy()
+            expanded['marketType'] = market_type
+            expanded_credentials.append(expanded)
+    return expanded_credentials
+
+
 # ============================================================================
 # 订单管理 API
 # ============================================================================
@@ -85,29 +135,11 @@ async def get_orders(credentials: List[ExchangeCredentials]):
     - 统一账户交易所（unifiedAccount=True）：只查询一次，返回现货+合约数据
     - 分离账户交易所（unifiedAccount=False）：分别查询现货和合约
     """
-    from app_config import order_service
-    
     try:
         # 根据 unifiedAccount 字段决定是否扩展
-        expanded_credentials = []
-        for cred in credentials:
-            cred_dict = cred.dict()
-            
-            if cred.unifiedAccount:
-                # 🎯 统一账户：只添加一次，marketType 设为 'unified'
-                unified_cred = {**cred_dict, 'marketType': 'unified'}
-                expanded_credentials.append(unified_cred)
-                logger.info(f"✅ 统一账户: {cred.exchange} (只查询一次)")
-            else:
-                # 🔄 分离账户：分别添加现货和合约
-                spot_cred = {**cred_dict, 'marketType': 'spot'}
-                expanded_credentials.append(spot_cred)
-                
-                futures_cred = {**cred_dict, 'marketType': 'futures'}
-                expanded_credentials.append(futures_cred)
-                logger.info(f"🔄 分离账户: {cred.exchange} (查询现货+合约)")
+        expanded_credentials = _expand_order_credentials(credentials)
         
-        logger.info(f"📋 订单查询: 收到 {len(credentials)} 个交易所凭证，扩展为 {len(expanded_credentials)} 个查询")
+        logger.info("📋 订单查询: 收到 %d 个交易所凭证，扩展为 %d 个查询", len(credentials), len(expanded_credentials))
         
         # 调用服务层获取订单
         result = await order_service.get_orders(expanded_credentials)
@@ -133,8 +165,6 @@ async def get_orders_by_symbols(request: OrdersBySymbolsRequest):
         "limit": 50
     }
     """
-    from app_config import order_service
-    
     try:
         if not request.symbols or len(request.symbols) == 0:
             raise HTTPException(status_code=400, detail="symbols 不能为空")
@@ -144,53 +174,42 @@ async def get_orders_by_symbols(request: OrdersBySymbolsRequest):
             raise HTTPException(status_code=400, detail="缺少交易所凭证 credentials")
 
         # 构建币种集合（统一大写）
-        symbol_set = set()
-        for s in request.symbols:
-            if s:
-                symbol_set.add(str(s).strip().upper())
+        symbol_set = frozenset(str(s).strip().upper() for s in request.symbols if s)
 
         # 根据 unifiedAccount 字段决定是否扩展
-        expanded_credentials: List[dict] = []
-        for cred in request.credentials:
-            c = cred.dict()
-            
-            if cred.unifiedAccount:
-                # 🎯 统一账户：只添加一次，marketType 设为 'unified'
-                expanded_credentials.append({**c, "marketType": "unified"})
-                logger.info(f"✅ 统一账户: {cred.exchange} (只查询一次)")
-            else:
-                # 🔄 分离账户：分别添加现货和合约
-                expanded_credentials.append({**c, "marketType": "spot"})
-                expanded_credentials.append({**c, "marketType": "futures"})
-                logger.info(f"🔄 分离账户: {cred.exchange} (查询现货+合约)")
+        expanded_credentials = _expand_order_credentials(request.credentials)
 
         if len(expanded_credentials) == 0:
             return {"success": True, "data": [], "total": 0, "elapsed": 0.0}
 
         # 🎯 处理交易对映射（优先使用 symbolPairs，否则使用 symbols）
         symbol_pairs = None
-        if request.symbolPairs:
+        # 兼容旧客户端：symbolPairs 可能为 {} 或 {exchange: {}}，此时不构建映射
+        has_pairs = bool(request.symbolPairs) and any(request.symbolPairs.values())
+        if has_pairs:
             # 转换前端传递的格式 {exchange: {marketType: [symbols]}} 
             # 为后端使用的格式 {exchange_marketType: [symbols]}
-            symbol_pairs = {}
+            # 只遍历 symbolPairs 本身，并与实际要查询的 (交易所, 市场类型) 求交集
+            present = set()
             for cred in expanded_credentials:
-                exchange = cred.get('exchange', '').lower()
                 market_type = cred.get('marketType', '').lower()
-                
                 # 统一 market_type 格式
                 if market_type == 'future':
                     market_type = 'futures'
-                
-                if exchange in request.symbolPairs:
-                    if market_type in request.symbolPairs[exchange]:
-                        key = f"{exchange}_{market_type}"
-                        symbol_pairs[key] = request.symbolPairs[exchange][market_type]
-                        logger.info(f"📋 使用交易对映射: {key} = {symbol_pairs[key]}")
+                present.add((cred.get('exchange', '').lower(), market_type))
+            
+            symbol_pairs = {
+                f"{exchange.lower()}_{market_type.lower()}": pair_symbols
+                for exchange, market_pairs in request.symbolPairs.items()
+                for market_type, pair_symbols in market_pairs.items()
+                if (exchange.lower(), market_type.lower()) in present
+            }
+            logger.info("📋 使用交易对映射: %s", symbol_pairs)
         
         # 🎯 将币种列表传递给服务层（向后兼容）
-        symbols_list = list(symbol_set) if symbol_set else None
+        symbols_list = list(symbol_set) or None
         if symbols_list:
-            logger.info(f"📋 查询币种（向后兼容）: {symbols_list}")
+            logger.info("📋 查询币种（向后兼容）: %s", symbols_list)
         
         # 🚀 查询订单（优先使用 symbolPairs，否则使用 symbols）
         result = await order_service.get_orders(expanded_credentials, symbols=symbols_list, symbol_pairs=symbol_pairs)
@@ -198,7 +217,7 @@ async def get_orders_by_symbols(request: OrdersBySymbolsRequest):
             return result or {"success": False, "data": [], "total": 0}
 
         orders = result.get("data", [])
-        logger.info(f"✅ 查询到 {len(orders)} 个订单")
+        logger.info("✅ 查询到 %d 个订单", len(orders))
         
         return {
             "success": True,
@@ -214,6 +233,166 @@ async def get_orders_by_symbols(request: OrdersBySymbolsRequest):
         raise HTTPException(status_code=500, detail=f"按币种获取订单失败: {str(e)}")
 
 
+# 合约订单的 positionSide：平仓按平仓方向，开仓按买卖方向
+_CLOSE_POSITION_SIDE = {'long': 'LONG', 'short': 'SHORT'}
+_OPEN_POSITION_SIDE = {'buy': 'LONG', 'sell': 'SHORT'}
+
+
+def _order_adapter_config(request: CreateOrderRequest) -> Dict:
+    """
+    构建下单适配器配置
+    
+    注意：只传递基础配置，特殊配置（如 OKX 的 password）由适配器自己处理
+    """
+    return {
+        'apiKey': request.credentials.apiKey,
+        'secret': request.credentials.apiSecret,
+        'password': getattr(request.credentials, 'password', None),  # 统一传递，由适配器决定是否使用
+        'enableRateLimit': True,
+    }
+
+
+def _order_group_key(request: CreateOrderRequest) -> Tuple:
+    """同一池化适配器实例（交易所 + 市场 + 凭证）的订单分到一组"""
+    config = _order_adapter_config(request)
+    return (request.exchange.lower(), request.marketType, config['apiKey'], config['secret'], config['password'])
+
+
+def _submit_order(request: CreateOrderRequest) -> Dict:
+    """
+    通过交易所适配器提交订单（同步阻塞，包含网络请求）
+    
+    Returns:
+        标准化的订单信息
+    """
+    adapter_config = _order_adapter_config(request)
+    
+    # 注意：
+    # - 代理配置已由适配器基类自动处理（从环境变量 PROXY_URL 读取）
+    # - password 字段由适配器自动处理（OKX 会验证是否提供，其他交易所会忽略）
+    
+    # 获取池化的适配器实例（同一凭证复用已加载市场数据和 keep-alive 连接）
+    adapter = get_pooled_adapter(
+        exchange_id=request.exchange,
+        market_type=request.marketType,
+        config=adapter_config
+    )
+    
+    # 获取底层 CCXT 实例（市场数据已由适配器自动加载并缓存）
+    exchange = adapter.get_exchange()
+    
+    # 直接使用前端传来的 symbol（前端已经根据规则生成了正确格式）
+    logger.debug("📥 使用前端symbol: %s (exchange: %s, type: %s)", request.symbol, request.exchange, request.marketType)
+    
+    # 构建订单参数
+    order_params = {
+        'symbol': request.symbol,  # 使用前端传来的符号
+        'type': request.type,
+        'side': request.side,
+        'amount': request.amount,
+    }
+    
+    # 限价单需要价格
+    if request.type == 'limit':
+        order_params['price'] = request.price
+    
+    # 对于现货订单，确保不传递合约相关参数（如 positionSide）
+    # 这些参数会导致 "Order's position side does not match user's setting" 错误
+    params = {}
+    if request.marketType in ['futures', 'future']:
+        # 合约订单需要 positionSide 参数（币安双向持仓模式要求）
+        if request.closePosition:
+            # 平仓操作：根据平仓方向设置 positionSide（平多 sell + LONG，平空 buy + SHORT）
+            # 注意：不添加 reduceOnly 参数，因为币安单向持仓模式不需要，且会导致错误
+            position_side = _CLOSE_POSITION_SIDE.get(request.closePosition.lower())
+        else:
+            # 开仓操作：根据买卖方向设置 positionSide（买入做多，卖出做空）
+            position_side = _OPEN_POSITION_SIDE.get(request.side.lower())
+        if position_side:
+            params['positionSide'] = position_side
+        logger.info("📋 合约订单，closePosition=%s, positionSide=%s", request.closePosition, position_side)
+    # 现货订单明确不传递任何 params，避免 CCXT 自动添加 positionSide
+    
+    logger.info("🔧 订单参数: %r, params: %r", order_params, params)
+    
+    # 通过适配器创建订单（透传机制）
+    # 注意：CCXT 的 create_order 是同步方法（阻塞当前线程）
+    # CCXT create_order 签名: create_order(symbol, type, side, amount, price=None, params={})
+    # 对于现货订单，明确传递空的 params 以避免 positionSide 相关错误
+    # 对于合约订单，也先传递空的 params，让交易所根据账户模式自动处理
+    # 池化实例与其他请求共享，持有适配器锁避免并发使用同一个 CCXT 实例；
+    # 下单不是幂等操作，限频时不自动重试
+    try:
+        with adapter_lock(adapter):
+            order = call_with_rate_limit(
+                request.exchange, adapter.create_order,
+                retries=0,
+                symbol=order_params['symbol'],
+                type=order_params['type'],
+                side=order_params['side'],
+                amount=order_params['amount'],
+                price=order_params.get('price'),
+                params=params  # 明确传递 params，现货订单为空字典，避免 positionSide 错误
+            )
+    except ccxt.AuthenticationError:
+        # 凭证失效（如 API Key 被删除/改权限），不再复用该实例
+        evict_adapter(request.exchange, request.marketType, adapter_config)
+        raise
+    
+    logger.info("✅ 订单创建成功: %s", order.get('id', 'N/A'))
+    
+    # 返回标准化的订单信息
+    return {
+        "orderId": order.get('id'),
+        "symbol": order.get('symbol'),
+        "type": order.get('type'),
+        "side": order.get('side'),
+        "price": order.get('price'),
+        "amount": order.get('amount'),
+        "status": order.get('status'),
+        "timestamp": order.get('timestamp'),
+        "info": order.get('info', {})
+    }
+
+
+def _submit_order_group(orders: List[CreateOrderRequest]) -> List[Union[Dict, Exception]]:
+    """
+    在同一线程中逐笔提交共用一个适配器实例的订单
+    
+    Returns:
+        与 orders 顺序一致的结果，失败的订单为对应的异常
+    """
+    results = []
+    for order_request in orders:
+        try:
+            results.append(_submit_order(order_request))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _order_error_to_http(e: Exception) -> HTTPException:
+    """将下单异常转换为对应状态码的 HTTPException"""
+    if isinstance(e, ccxt.InsufficientFunds):
+        logger.error(f"❌ 余额不足: {e}")
+        return HTTPException(status_code=400, detail=f"余额不足: {str(e)}")
+    
+    if isinstance(e, ccxt.InvalidOrder):
+        logger.error(f"❌ 无效订单: {e}")
+        return HTTPException(status_code=400, detail=f"无效订单: {str(e)}")
+    
+    if isinstance(e, ccxt.ExchangeError):
+        logger.error(f"❌ 交易所错误: {e}")
+        return HTTPException(status_code=400, detail=f"交易所错误: {str(e)}")
+    
+    if isinstance(e, ccxt.NetworkError):
+        logger.error(f"❌ 网络错误: {e}")
+        return HTTPException(status_code=503, detail=f"网络错误: {str(e)}")
+    
+    logger.error(f"❌ 创建订单失败: {e}")
+    return HTTPException(status_code=500, detail=f"创建订单失败: {str(e)}")
+
+
 @router.post("/api/create-order")
 async def create_order(request: CreateOrderRequest):
     """
@@ -236,143 +415,104 @@ async def create_order(request: CreateOrderRequest):
     }
     """
     try:
-        logger.info(f"📤 收到下单请求: {request.exchange} {request.marketType} {request.symbol} "
-                   f"{request.side} {request.amount} @ {request.price if request.price else 'market'}")
-        
-        # 验证参数
-        if request.type not in ['limit', 'market']:
-            raise HTTPException(status_code=400, detail="订单类型必须是 'limit' 或 'market'")
-        
-        if request.side not in ['buy', 'sell']:
-            raise HTTPException(status_code=400, detail="订单方向必须是 'buy' 或 'sell'")
-        
-        if request.type == 'limit' and request.price is None:
-            raise HTTPException(status_code=400, detail="限价单必须提供价格")
-        
-        if request.amount <= 0:
-            raise HTTPException(status_code=400, detail="订单数量必须大于 0")
-        
-        # 🔧 使用交易所适配器层
-        from exchange_adapters import get_adapter
-        
-        # 构建适配器配置
-        # 注意：只传递基础配置，特殊配置（如 OKX 的 password）由适配器自己处理
-        adapter_config = {
-            'apiKey': request.credentials.apiKey,
-            'secret': request.credentials.apiSecret,
-            'password': getattr(request.credentials, 'password', None),  # 统一传递，由适配器决定是否使用
-            'enableRateLimit': True,
-        }
-        
-        # 注意：
-        # - 代理配置已由适配器基类自动处理（从环境变量 PROXY_URL 读取）
-        # - password 字段由适配器自动处理（OKX 会验证是否提供，其他交易所会忽略）
-        
-        # 获取适配器实例（自动处理市场类型和特殊逻辑）
-        adapter = get_adapter(
-            exchange_id=request.exchange,
-            market_type=request.marketType,
-            config=adapter_config
-        )
-        
-        # 获取底层 CCXT 实例（市场数据已由适配器自动加载并缓存）
-        exchange = adapter.get_exchange()
-        
-        # 直接使用前端传来的 symbol（前端已经根据规则生成了正确格式）
-        logger.debug(f"📥 使用前端symbol: {request.symbol} (exchange: {request.exchange}, type: {request.marketType})")
-        
-        # 构建订单参数
-        order_params = {
-            'symbol': request.symbol,  # 使用前端传来的符号
-            'type': request.type,
-            'side': request.side,
-            'amount': request.amount,
-        }
+        logger.info("📤 收到下单请求: %s %s %s %s %s @ %s",
+                    request.exchange, request.marketType, request.symbol,
+                    request.side, request.amount, request.price or 'market')
         
-        # 限价单需要价格
-        if request.type == 'limit':
-            order_params['price'] = request.price
+        # CCXT 同步下单会阻塞整个 RTT，放到线程中执行，避免卡住事件循环
+        order = await asyncio.to_thread(_submit_order, request)
         
-        # 对于现货订单，确保不传递合约相关参数（如 positionSide）
-        # 这些参数会导致 "Order's position side does not match user's setting" 错误
-        params = {}
-        if request.marketType in ['futures', 'future']:
-            # 合约订单需要 positionSide 参数（币安双向持仓模式要求）
-            if request.closePosition:
-                # 平仓操作：根据平仓方向设置 positionSide
-                # 平多仓：sell + positionSide: 'LONG'
-                # 平空仓：buy + positionSide: 'SHORT'
-                # 注意：不添加 reduceOnly 参数，因为币安单向持仓模式不需要，且会导致错误
-                if request.closePosition.lower() == 'long':
-                    params['positionSide'] = 'LONG'  # 平多仓
-                elif request.closePosition.lower() == 'short':
-                    params['positionSide'] = 'SHORT'  # 平空仓
-                logger.info(f"📋 合约平仓订单，closePosition={request.closePosition}, positionSide={params.get('positionSide')}")
-            else:
-                # 开仓操作：根据买卖方向设置 positionSide
-                # buy (买入) → LONG (做多)
-                # sell (卖出) → SHORT (做空)
-                if request.side.lower() == 'buy':
-                    params['positionSide'] = 'LONG'  # 买入 = 做多
-                elif request.side.lower() == 'sell':
-                    params['positionSide'] = 'SHORT'  # 卖出 = 做空
-                logger.info(f"📋 合约开仓订单，添加 positionSide: {params.get('positionSide')}")
-        # 现货订单明确不传递任何 params，避免 CCXT 自动添加 positionSide
-        
-        logger.info(f"🔧 订单参数: {order_params}, params: {params}")
-        
-        # 通过适配器创建订单（透传机制）
-        # 注意：CCXT 的 create_order 是同步方法，不需要 await
-        # CCXT create_order 签名: create_order(symbol, type, side, amount, price=None, params={})
-        # 对于现货订单，明确传递空的 params 以避免 positionSide 相关错误
-        # 对于合约订单，也先传递空的 params，让交易所根据账户模式自动处理
-        order = adapter.create_order(
-            symbol=order_params['symbol'],
-            type=order_params['type'],
-            side=order_params['side'],
-            amount=order_params['amount'],
-            price=order_params.get('price'),
-            params=params  # 明确传递 params，现货订单为空字典，避免 positionSide 错误
-        )
-        
-        logger.info(f"✅ 订单创建成功: {order.get('id', 'N/A')}")
-        
-        # 返回标准化的订单信息
         return {
             "success": True,
             "message": "订单创建成功",
-            "data": {
-                "orderId": order.get('id'),
-                "symbol": order.get('symbol'),
-                "type": order.get('type'),
-                "side": order.get('side'),
-                "price": order.get('price'),
-                "amount": order.get('amount'),
-                "status": order.get('status'),
-                "timestamp": order.get('timestamp'),
-                "info": order.get('info', {})
-            }
+            "data": order
         }
         
-    except ccxt.InsufficientFunds as e:
-        logger.error(f"❌ 余额不足: {e}")
-        raise HTTPException(status_code=400, detail=f"余额不足: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _order_error_to_http(e)
+
+
+@router.post("/api/create-orders")
+async def create_orders(request: CreateOrdersRequest):
+    """
+    批量创建订单（多个交易所并发下单）
     
-    except ccxt.InvalidOrder as e:
-        logger.error(f"❌ 无效订单: {e}")
-        raise HTTPException(status_code=400, detail=f"无效订单: {str(e)}")
+    订单按适配器实例（交易所 + 市场 + 凭证）分组：组内在同一线程中逐笔提交，
+    各组并发执行，总耗时约为最慢的一组而非逐笔相加；
+    单笔下单失败不影响其他订单，结果按请求顺序逐笔返回（参数校验由请求模型完成，不合法时整体返回 422）
     
-    except ccxt.ExchangeError as e:
-        logger.error(f"❌ 交易所错误: {e}")
-        raise HTTPException(status_code=400, detail=f"交易所错误: {str(e)}")
+    请求体示例:
+    {
+        "orders": [
+            {"exchange": "binance", "marketType": "spot", "symbol": "BTC/USDT", ...},
+            {"exchange": "okx", "marketType": "futures", "symbol": "BTC/USDT:USDT", ...}
+        ]
+    }
+    """
+    if not request.orders:
+        raise HTTPException(status_code=400, detail="orders 不能为空")
     
-    except ccxt.NetworkError as e:
-        logger.error(f"❌ 网络错误: {e}")
-        raise HTTPException(status_code=503, detail=f"网络错误: {str(e)}")
+    logger.info("📤 收到批量下单请求: %d 笔", len(request.orders))
     
-    except Exception as e:
-        logger.error(f"❌ 创建订单失败: {e}")
-        raise HTTPException(status_code=500, detail=f"创建订单失败: {str(e)}")
+    groups: Dict[Tuple, List[int]] = {}
+    for index, order_request in enumerate(request.orders):
+        groups.setdefault(_order_group_key(order_request), []).append(index)
+    
+    group_results = await asyncio.gather(
+        *(asyncio.to_thread(_submit_order_group, [request.orders[i] for i in indices]) for indices in groups.values()),
+        return_exceptions=True
+    )
+    
+    # 还原为请求顺序（整组异常时该组每笔订单都记为该异常）
+    results: List[Union[Dict, BaseException]] = [None] * len(request.orders)
+    for indices, group_result in zip(groups.values(), group_results):
+        for position, index in enumerate(indices):
+            results[index] = group_result if isinstance(group_result, BaseException) else group_result[position]
+    
+    items = []
+    failed = 0
+    for order_request, result in zip(request.orders, results):
+        if isinstance(result, BaseException):
+            error = result if isinstance(result, HTTPException) else _order_error_to_http(result)
+            failed += 1
+            items.append({
+                "success": False,
+                "exchange": order_request.exchange,
+                "symbol": order_request.symbol,
+                "statusCode": error.status_code,
+                "error": error.detail
+            })
+        else:
+            items.append({"success": True, "data": result})
+    
+    logger.info("✅ 批量下单完成: 成功 %d 笔，失败 %d 笔", len(items) - failed, failed)
+    
+    return {
+        "success": failed == 0,
+        "data": items,
+        "total": len(items),
+        "failed": failed
+    }
+
+
+# 透传给 BackpackAdapter.get_max_order_quantity 的字段
+_MAX_ORDER_QUANTITY_FIELDS = frozenset(MaxOrderQuantityItem.model_fields)
+
+
+def _get_backpack_adapter(credentials: ExchangeCredentials):
+    """获取池化的 Backpack 现货适配器"""
+    return get_pooled_adapter(
+        exchange_id='backpack',
+        market_type='spot',  # Backpack 现货接口
+        config={
+            'apiKey': credentials.apiKey,
+            'secret': credentials.apiSecret,
+            'password': getattr(credentials, 'password', None),
+            'enableRateLimit': True,
+        }
+    )
 
 
 @router.post("/api/backpack/max-order-quantity")
@@ -384,27 +524,11 @@ async def get_backpack_max_order_quantity(request: MaxOrderQuantityRequest):
         if request.exchange.lower() != 'backpack':
             raise HTTPException(status_code=400, detail="仅支持 backpack 交易所")
 
-        from exchange_adapters import get_adapter
+        adapter = _get_backpack_adapter(request.credentials)
 
-        adapter = get_adapter(
-            exchange_id='backpack',
-            market_type='spot',  # Backpack 现货接口
-            config={
-                'apiKey': request.credentials.apiKey,
-                'secret': request.credentials.apiSecret,
-                'password': getattr(request.credentials, 'password', None),
-                'enableRateLimit': True,
-            }
-        )
-
-        result = adapter.get_max_order_quantity(
-            symbol=request.symbol,
-            side=request.side,
-            price=request.price,
-            reduceOnly=request.reduceOnly,
-            autoBorrow=request.autoBorrow,
-            autoBorrowRepay=request.autoBorrowRepay,
-            autoLendRedeem=request.autoLendRedeem,
+        result = await asyncio.to_thread(
+            adapter.get_max_order_quantity,
+            **request.model_dump(include=_MAX_ORDER_QUANTITY_FIELDS)
         )
 
         return {
@@ -418,3 +542,42 @@ async def get_backpack_max_order_quantity(request: MaxOrderQuantityRequest):
         logger.error(f"❌ 获取 Backpack 最大可下单数量失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取最大可下单数量失败: {str(e)}")
 
+
+@router.post("/api/backpack/max-order-quantity/batch")
+async def get_backpack_max_order_quantity_batch(request: MaxOrderQuantityBatchRequest):
+    """
+    批量查询 Backpack 最大可下单数量
+
+    所有交易对共用一个适配器实例（BackpackAdapter 线程安全），并发请求（最多 BACKPACK_BATCH_CONCURRENCY 个同时进行），
+    结果与 items 顺序一致；单个交易对失败不影响其他结果
+    """
+    if request.exchange.lower() != 'backpack':
+        raise HTTPException(status_code=400, detail="仅支持 backpack 交易所")
+
+    try:
+        adapter = _get_backpack_adapter(request.credentials)
+    except Exception as e:
+        logger.error(f"❌ 创建 Backpack 适配器失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取最大可下单数量失败: {str(e)}")
+
+    semaphore = asyncio.Semaphore(BACKPACK_BATCH_CONCURRENCY)
+
+    async def query(item: MaxOrderQuantityItem):
+        async with semaphore:
+            return await asyncio.to_thread(adapter.get_max_order_quantity, **item.model_dump())
+
+    results = await asyncio.gather(*(query(item) for item in request.items), return_exceptions=True)
+
+    data = []
+    for item, result in zip(request.items, results):
+        if isinstance(result, BaseException):
+            logger.error(f"❌ 获取 Backpack {item.symbol} 最大可下单数量失败: {result}")
+            data.append({"success": False, "symbol": item.symbol, "error": str(result)})
+        else:
+            data.append({"success": True, "symbol": item.symbol, "data": result})
+
+    return {
+        "success": all(entry["success"] for entry in data),
+        "data": data,
+        "total": len(data)
+    }
@@ -7,36 +7,51 @@
 - 系统状态
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from datetime import datetime
+import json
+
+from app_config import data_generator, manager
+from exchange_adapters import CUSTOM_ADAPTERS, DEFAULT_SUPPORTED_EXCHANGES
 
 router = APIRouter()
 
+# 探活接口调用频繁（负载均衡器可能每秒请求一次），响应体在导入时预先序列化
+_ROOT_BODY = json.dumps(
+    {"message": "Gap Trader Backend API", "status": "running"}, separators=(',', ':')
+).encode()
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+
+# 适配器数量在运行期间不变
+_EXCHANGE_COUNTS = {
+    "total_exchanges": len(CUSTOM_ADAPTERS) + len(DEFAULT_SUPPORTED_EXCHANGES),
+    "custom_adapters": len(CUSTOM_ADAPTERS),
+    "default_adapters": len(DEFAULT_SUPPORTED_EXCHANGES),
+}
+
 
 @router.get("/")
 async def root():
     """根路径"""
-    return {"message": "Gap Trader Backend API", "status": "running"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @router.get("/health")
 async def health_check():
     """健康检查"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return Response(
+        content=_HEALTH_PREFIX + datetime.now().isoformat().encode() + b'"}',
+        media_type="application/json"
+    )
 
 
 @router.get("/api/status")
 async def get_status():
     """获取系统状态（Adapter 架构）"""
-    from app_config import data_generator, manager
-    from exchange_adapters import CUSTOM_ADAPTERS, DEFAULT_SUPPORTED_EXCHANGES
-    
     return {
         "is_generating": data_generator.is_running,
         "active_connections": len(manager.active_connections),
-        "total_exchanges": len(CUSTOM_ADAPTERS) + len(DEFAULT_SUPPORTED_EXCHANGES),
-        "custom_adapters": len(CUSTOM_ADAPTERS),
-        "default_adapters": len(DEFAULT_SUPPORTED_EXCHANGES),
+        **_EXCHANGE_COUNTS,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -11,12 +11,20 @@
 
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
+import asyncio
 import logging
 import json
 import os
 import uuid
 from pathlib import Path
 
+# 可选：orjson 读写链接文件更快，未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # 导入数据模型
 from models import (
     TradingWebsiteLink,
@@ -30,6 +38,9 @@ logger = logging.getLogger(__name__)
 # 链接数据存储文件路径
 LINKS_DATA_FILE = "data/trading_links.json"
 
+# 修改后延迟落盘的时间（秒），界面上连续增删改只写一次文件
+LINKS_FLUSH_INTERVAL = 0.05
+
 # 确保数据目录存在
 Path("data").mkdir(exist_ok=True)
 
@@ -38,29 +49,121 @@ Path("data").mkdir(exist_ok=True)
 # 辅助函数
 # ============================================================================
 
-def load_trading_links() -> list:
-    """从文件加载交易链接"""
+# 已解析的链接数据缓存，以文件 mtime 判断是否需要重新读取
+# data: {链接ID: 链接}，按插入顺序保存，是链接的唯一存储；按 ID 增删改查均为 O(1)
+# dirty: 内存中有尚未落盘的修改，此时以内存为准
+# flush_error: 最近一次落盘失败的错误信息，成功后清空
+_links_cache = {"mtime": 0, "data": {}, "dirty": False, "flush_error": None}
+
+# 待执行的延迟落盘任务
+_flush_task = None
+
+
+def _set_links_cache(links: dict, mtime: int):
+    """更新链接缓存"""
+    _links_cache["data"] = links
+    _links_cache["mtime"] = mtime
+
+
+def load_trading_links() -> dict:
+    """
+    从文件加载交易链接（文件未变化时直接返回内存缓存）
+    
+    Returns:
+        {链接ID: 链接}；修改后需调用 stage_trading_links() 安排落盘
+    """
     try:
-        if os.path.exists(LINKS_DATA_FILE):
-            with open(LINKS_DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        if not _links_cache["dirty"] and os.stat(LINKS_DATA_FILE).st_mtime_ns != _links_cache["mtime"]:
+            # 以已打开文件的 mtime 为准，stat 之后文件被替换也不会缓存错配的内容
+            with open(LINKS_DATA_FILE, 'rb') as f:
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+                raw = f.read()
+            links = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+            _set_links_cache({link['id']: link for link in links}, mtime)
+        
+        return _links_cache["data"]
+    except FileNotFoundError:
+        _set_links_cache({}, 0)
+        return _links_cache["data"]
     except Exception as e:
         logger.error(f"加载链接数据失败: {e}")
-        return []
+        _set_links_cache({}, 0)
+        return _links_cache["data"]
+
 
+def _write_links_file(links: dict) -> int:
+    """
+    原子写入链接文件：写临时文件并 fsync 后 os.replace，中途崩溃不会留下半个 JSON
+    
+    文件格式保持为链接列表
+    
+    Returns:
+        新文件的 mtime
+    """
+    tmp_file = f"{LINKS_DATA_FILE}.{os.getpid()}.tmp"
+    links_list = list(links.values())
+    if HAS_ORJSON:
+        data = orjson.dumps(links_list, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(links_list, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, LINKS_DATA_FILE)
+    return os.stat(LINKS_DATA_FILE).st_mtime_ns
 
-def save_trading_links(links: list) -> bool:
-    """保存交易链接到文件"""
+
+def save_trading_links(links: dict) -> bool:
+    """立即保存交易链接到文件，并同步更新内存缓存"""
     try:
-        with open(LINKS_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(links, f, ensure_ascii=False, indent=2)
+        _set_links_cache(links, _write_links_file(links))
+        _links_cache["dirty"] = False
+        _links_cache["flush_error"] = None
         return True
     except Exception as e:
         logger.error(f"保存链接数据失败: {e}")
+        _links_cache["flush_error"] = str(e)
         return False
 
 
+def flush_trading_links() -> bool:
+    """立即写出尚未落盘的修改（应用关闭时调用）"""
+    if not _links_cache["dirty"]:
+        return True
+    return save_trading_links(_links_cache["data"])
+
+
+async def _flush_trading_links_later():
+    """延迟落盘：等待 LINKS_FLUSH_INTERVAL 合并期间的所有修改，再写一次文件"""
+    global _flush_task
+    await asyncio.sleep(LINKS_FLUSH_INTERVAL)
+    _flush_task = None
+    flush_trading_links()
+
+
+def stage_trading_links():
+    """
+    标记内存中的交易链接已修改，并安排延迟落盘
+    
+    修改立即对后续请求可见；文件在 LINKS_FLUSH_INTERVAL 后统一写入。
+    上一次落盘失败时不再延迟，在当前请求内直接写入，失败则抛出 500，
+    避免在数据无法持久化时继续向前端返回成功
+    
+    Raises:
+        HTTPException: 上一次落盘失败且本次写入仍然失败
+    """
+    global _flush_task
+    _links_cache["dirty"] = True
+    if _links_cache["flush_error"] is not None:
+        if not save_trading_links(_links_cache["data"]):
+            raise HTTPException(status_code=500, detail=f"保存链接数据失败: {_links_cache['flush_error']}")
+        return
+    if _flush_task is None:
+        _flush_task = asyncio.get_running_loop().create_task(_flush_trading_links_later())
+
+
 # ============================================================================
 # 交易网站链接管理 API
 # ============================================================================
@@ -72,7 +175,7 @@ async def get_trading_links():
         links = load_trading_links()
         return {
             "success": True,
-            "data": links,
+            "data": list(links.values()),
             "total": len(links)
         }
     except Exception as e:
@@ -84,8 +187,7 @@ async def get_trading_links():
 async def get_trading_link(link_id: str):
     """获取单个交易网站链接"""
     try:
-        links = load_trading_links()
-        link = next((l for l in links if l['id'] == link_id), None)
+        link = load_trading_links().get(link_id)
         
         if link is None:
             raise HTTPException(status_code=404, detail=f"未找到ID为 {link_id} 的链接")
@@ -107,6 +209,8 @@ async def create_trading_link(link: TradingWebsiteLinkCreate):
     try:
         links = load_trading_links()
         
+        now = datetime.now().isoformat()
+        
         # 生成唯一ID
         new_link = {
             "id": str(uuid.uuid4()),
@@ -114,14 +218,13 @@ async def create_trading_link(link: TradingWebsiteLinkCreate):
             "url": link.url,
             "description": link.description,
             "category": link.category,
-            "createdAt": datetime.now().isoformat(),
-            "updatedAt": datetime.now().isoformat()
+            "createdAt": now,
+            "updatedAt": now
         }
         
-        links.append(new_link)
+        links[new_link["id"]] = new_link
         
-        if not save_trading_links(links):
-            raise HTTPException(status_code=500, detail="保存链接失败")
+        stage_trading_links()
         
         logger.info(f"✅ 创建链接成功: {link.name} -> {link.url}")
         
@@ -141,33 +244,31 @@ async def create_trading_link(link: TradingWebsiteLinkCreate):
 async def update_trading_link(link_id: str, link_update: TradingWebsiteLinkUpdate):
     """更新交易网站链接"""
     try:
-        links = load_trading_links()
-        link_index = next((i for i, l in enumerate(links) if l['id'] == link_id), None)
+        link = load_trading_links().get(link_id)
         
-        if link_index is None:
+        if link is None:
             raise HTTPException(status_code=404, detail=f"未找到ID为 {link_id} 的链接")
         
         # 更新字段
         if link_update.name is not None:
-            links[link_index]['name'] = link_update.name
+            link['name'] = link_update.name
         if link_update.url is not None:
-            links[link_index]['url'] = link_update.url
+            link['url'] = link_update.url
         if link_update.description is not None:
-            links[link_index]['description'] = link_update.description
+            link['description'] = link_update.description
         if link_update.category is not None:
-            links[link_index]['category'] = link_update.category
+            link['category'] = link_update.category
         
-        links[link_index]['updatedAt'] = datetime.now().isoformat()
+        link['updatedAt'] = datetime.now().isoformat()
         
-        if not save_trading_links(links):
-            raise HTTPException(status_code=500, detail="保存链接失败")
+        stage_trading_links()
         
         logger.info(f"✅ 更新链接成功: {link_id}")
         
         return {
             "success": True,
             "message": "链接更新成功",
-            "data": links[link_index]
+            "data": link
         }
     except HTTPException:
         raise
@@ -180,16 +281,12 @@ async def update_trading_link(link_id: str, link_update: TradingWebsiteLinkUpdat
 async def delete_trading_link(link_id: str):
     """删除交易网站链接"""
     try:
-        links = load_trading_links()
-        link_index = next((i for i, l in enumerate(links) if l['id'] == link_id), None)
+        deleted_link = load_trading_links().pop(link_id, None)
         
-        if link_index is None:
+        if deleted_link is None:
             raise HTTPException(status_code=404, detail=f"未找到ID为 {link_id} 的链接")
         
-        deleted_link = links.pop(link_index)
-        
-        if not save_trading_links(links):
-            raise HTTPException(status_code=500, detail="保存链接失败")
+        stage_trading_links()
         
         logger.info(f"✅ 删除链接成功: {deleted_link['name']}")
         
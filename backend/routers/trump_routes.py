@@ -14,14 +14,17 @@ from datetime import datetime
 from typing import Optional
 import logging
 
+# sentiment_analyzer / post_archiver 由后台任务在运行时创建，处理请求时读取模块属性
+import app_config
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/api/trump/sentiment/list")
 async def get_sentiment_list(
-    limit: int = Query(100, description="返回数量限制"),
-    offset: int = Query(0, description="偏移量"),
+    limit: int = Query(100, ge=0, description="返回数量限制"),
+    offset: int = Query(0, ge=0, description="偏移量"),
     sentiment_type: Optional[str] = Query(None, description="情绪类型筛选：bullish/bearish/neutral")
 ):
     """
@@ -32,27 +35,15 @@ async def get_sentiment_list(
         offset: 偏移量（默认0）
         sentiment_type: 情绪类型筛选（bullish=利好, bearish=利空, neutral=中性）
     """
-    from app_config import sentiment_analyzer
+    sentiment_analyzer = app_config.sentiment_analyzer
     
     try:
         if sentiment_analyzer is None:
             raise HTTPException(status_code=503, detail="情绪分析服务未初始化")
         
-        # 获取所有分析结果
-        all_analyses = sentiment_analyzer.get_all_analyses()
-        
-        # 筛选
-        if sentiment_type:
-            if sentiment_type == 'bullish':
-                all_analyses = [a for a in all_analyses if a['analysis'].get('is_bullish') is True]
-            elif sentiment_type == 'bearish':
-                all_analyses = [a for a in all_analyses if a['analysis'].get('is_bullish') is False]
-            elif sentiment_type == 'neutral':
-                all_analyses = [a for a in all_analyses if a['analysis'].get('is_bullish') is None]
-        
-        # 分页
-        total = len(all_analyses)
-        paginated = all_analyses[offset:offset + limit]
+        # 分析器内部按情绪预先分桶，只取出当前页
+        total = sentiment_analyzer.count_analyses(sentiment_type)
+        paginated = sentiment_analyzer.get_analyses(offset, limit, sentiment_type)
         
         return {
             "success": True,
@@ -71,7 +62,7 @@ async def get_sentiment_list(
 @router.get("/api/trump/sentiment/{post_id}")
 async def get_sentiment_by_id(post_id: str):
     """获取单条情绪分析详情"""
-    from app_config import sentiment_analyzer
+    sentiment_analyzer = app_config.sentiment_analyzer
     
     try:
         if sentiment_analyzer is None:
@@ -96,7 +87,7 @@ async def get_sentiment_by_id(post_id: str):
 @router.get("/api/trump/sentiment/stats")
 async def get_sentiment_stats():
     """获取情绪分析统计信息"""
-    from app_config import sentiment_analyzer
+    sentiment_analyzer = app_config.sentiment_analyzer
     
     try:
         if sentiment_analyzer is None:
@@ -114,21 +105,20 @@ async def get_sentiment_stats():
 
 
 @router.get("/api/trump/sentiment/latest")
-async def get_sentiment_latest(limit: int = Query(10, description="返回数量")):
+async def get_sentiment_latest(limit: int = Query(10, ge=0, description="返回数量")):
     """获取最新N条情绪分析"""
-    from app_config import sentiment_analyzer
+    sentiment_analyzer = app_config.sentiment_analyzer
     
     try:
         if sentiment_analyzer is None:
             raise HTTPException(status_code=503, detail="情绪分析服务未初始化")
         
-        all_analyses = sentiment_analyzer.get_all_analyses()
-        latest = all_analyses[:limit]
+        latest = sentiment_analyzer.get_analyses(0, limit)
         
         return {
             "success": True,
             "data": latest,
-            "total": len(all_analyses)
+            "total": sentiment_analyzer.count_analyses()
         }
     except Exception as e:
         logger.error(f"❌ 获取最新分析失败: {e}")
@@ -137,19 +127,18 @@ async def get_sentiment_latest(limit: int = Query(10, description="返回数量"
 
 @router.get("/api/trump/posts/list")
 async def get_trump_posts(
-    limit: int = Query(100, description="返回数量限制"),
-    offset: int = Query(0, description="偏移量")
+    limit: int = Query(100, ge=0, description="返回数量限制"),
+    offset: int = Query(0, ge=0, description="偏移量")
 ):
     """获取特朗普帖子列表（原始数据）"""
-    from app_config import post_archiver
+    post_archiver = app_config.post_archiver
     
     try:
         if post_archiver is None:
             raise HTTPException(status_code=503, detail="帖子存档服务未初始化")
         
-        all_posts = post_archiver.get_all_posts()
-        total = len(all_posts)
-        paginated = all_posts[offset:offset + limit]
+        total = post_archiver.count_posts()
+        paginated = post_archiver.get_posts(offset, limit)
         
         return {
             "success": True,
@@ -166,7 +155,8 @@ async def get_trump_posts(
 @router.get("/api/trump/status")
 async def get_trump_service_status():
     """获取特朗普情绪分析服务状态"""
-    from app_config import sentiment_analyzer, post_archiver
+    sentiment_analyzer = app_config.sentiment_analyzer
+    post_archiver = app_config.post_archiver
     
     return {
         "sentiment_analyzer_initialized": sentiment_analyzer is not None,
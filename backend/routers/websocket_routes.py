@@ -7,12 +7,13 @@ WebSocket 路由
 
 from fastapi import APIRouter, WebSocket
 
+from app_config import ws_manager
+
 router = APIRouter()
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket 连接端点 - K 线实时数据"""
-    from app_config import ws_manager
     await ws_manager.handle_websocket(websocket)
 
@@ -4,12 +4,40 @@
 提供统一的接口，屏蔽底层适配器差异
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from exchange_adapters import get_adapter, is_exchange_supported
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, List, Optional, Any, Tuple
+from exchange_adapters import get_pooled_adapter, adapter_lock, evict_exchange_adapters, is_exchange_supported
+from services.rate_limiter import call_with_rate_limit
 
 logger = logging.getLogger(__name__)
 
+# 多交易对查询订单时的默认并发数（仅线程安全的适配器并发查询，可通过 max_concurrency 属性覆盖）
+DEFAULT_SYMBOL_CONCURRENCY = 8
+
+# 异步价格查询合并：同一 (交易所, 市场) 在窗口内的请求合并为一次 fetch_prices
+PRICE_BATCH_MAX_WAIT = 0.02  # 首个请求最多等待 20ms
+PRICE_BATCH_MAX_SYMBOLS = 32  # 累计交易对达到该数量时立即发出
+
+
+class _PriceBatch:
+    """一个等待合并发出的价格查询批次"""
+    
+    def __init__(self, config: dict):
+        self.config = config  # 行情为公开数据，使用批次内首个请求的配置
+        self.symbols: Dict[str, None] = {}  # 有序去重
+        self.waiters: List[Tuple[List[str], asyncio.Future]] = []
+        self.flush_task: Optional[asyncio.Task] = None
+
+
+# 等待中的价格批次：{(exchange_id, market_type): _PriceBatch}
+_price_batches: Dict[Tuple[str, str], _PriceBatch] = {}
+
+# 进行中的 K线请求：{(exchange_id, market_type, symbol, interval, limit, since): Future}
+_inflight_klines: Dict[tuple, asyncio.Future] = {}
+
 
 class AdapterService:
     """
@@ -34,8 +62,9 @@ class AdapterService:
             {'ok': bool, 'serverTime': int, 'accountId': str, 'latencyMs': float}
         """
         try:
-            adapter = get_adapter(exchange_id, 'spot', config)
-            return adapter.test_connectivity()
+            adapter = get_pooled_adapter(exchange_id, 'spot', config)
+            with adapter_lock(adapter):
+                return call_with_rate_limit(exchange_id, adapter.test_connectivity)
         except Exception as e:
             logger.error(f"❌ {exchange_id} 连通性测试失败: {e}")
             return {'ok': False, 'error': str(e)}
@@ -62,8 +91,9 @@ class AdapterService:
             [{'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', ...}, ...]
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
-            return adapter.fetch_symbols(quote=quote, limit=limit)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
+            with adapter_lock(adapter):
+                return call_with_rate_limit(exchange_id, adapter.fetch_symbols, quote=quote, limit=limit)
         except Exception as e:
             logger.error(f"❌ {exchange_id} 获取交易对失败: {e}")
             return []
@@ -94,12 +124,43 @@ class AdapterService:
             [[timestamp, open, high, low, close, volume], ...]
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
-            return adapter.fetch_klines(symbol, interval, limit, since)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
+            with adapter_lock(adapter):
+                return call_with_rate_limit(exchange_id, adapter.fetch_klines, symbol, interval, limit, since)
         except Exception as e:
             logger.error(f"❌ {exchange_id} 获取K线失败 {symbol}/{interval}: {e}")
             return []
     
+    @staticmethod
+    async def fetch_klines_async(
+        exchange_id: str,
+        market_type: str,
+        config: dict,
+        symbol: str,
+        interval: str = '15m',
+        limit: int = 100,
+        since: Optional[int] = None
+    ) -> List[List[Any]]:
+        """
+        获取 K线数据（异步）
+        
+        相同 (交易所, 市场, 交易对, 周期, 条数, 起始时间) 的并发请求共享同一次 HTTP 请求
+        
+        Returns:
+            与 fetch_klines 相同
+        """
+        key = (exchange_id, market_type, symbol, interval, limit, since)
+        future = _inflight_klines.get(key)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(
+                AdapterService.fetch_klines, exchange_id, market_type, config, symbol, interval, limit, since
+            ))
+            _inflight_klines[key] = future
+            future.add_done_callback(lambda _: _inflight_klines.pop(key, None))
+        
+        # shield：某个调用方被取消时不影响其他等待同一请求的调用方
+        return await asyncio.shield(future)
+    
     @staticmethod
     def fetch_prices(
         exchange_id: str,
@@ -120,12 +181,79 @@ class AdapterService:
             {'BTC/USDT': {'last': 50000, 'bid': 49999, 'ask': 50001, 'mark': 50000}, ...}
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
-            return adapter.fetch_prices(symbols)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
+            with adapter_lock(adapter):
+                return call_with_rate_limit(exchange_id, adapter.fetch_prices, symbols)
         except Exception as e:
             logger.error(f"❌ {exchange_id} 批量获取价格失败: {e}")
             return {s: {'last': 0, 'bid': 0, 'ask': 0, 'mark': 0} for s in symbols}
     
+    @staticmethod
+    async def fetch_prices_async(
+        exchange_id: str,
+        market_type: str,
+        config: dict,
+        symbols: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取价格（异步，合并并发请求）
+        
+        同一交易所/市场在 PRICE_BATCH_MAX_WAIT 内的请求合并为一次 fetch_prices，
+        累计交易对达到 PRICE_BATCH_MAX_SYMBOLS 时提前发出
+        
+        Returns:
+            与 fetch_prices 相同
+        """
+        if not symbols:
+            return {}
+        
+        key = (exchange_id, market_type)
+        batch = _price_batches.get(key)
+        if batch is None:
+            batch = _price_batches[key] = _PriceBatch(config)
+            batch.flush_task = asyncio.create_task(AdapterService._flush_price_batch(key, batch))
+        
+        future = asyncio.get_running_loop().create_future()
+        batch.waiters.append((symbols, future))
+        batch.symbols.update(dict.fromkeys(symbols))
+        
+        if len(batch.symbols) >= PRICE_BATCH_MAX_SYMBOLS:
+            # 已攒够交易对：取消等待，立即发出
+            _price_batches.pop(key, None)
+            batch.flush_task.cancel()
+            batch.flush_task = asyncio.create_task(AdapterService._flush_price_batch(key, batch, wait=False))
+        
+        return await future
+    
+    @staticmethod
+    async def _flush_price_batch(key: Tuple[str, str], batch: _PriceBatch, wait: bool = True):
+        """等待合并窗口结束后发出一次批量查询，并把结果分发给各个调用方"""
+        if wait:
+            await asyncio.sleep(PRICE_BATCH_MAX_WAIT)
+            if _price_batches.get(key) is batch:
+                del _price_batches[key]
+        
+        exchange_id, market_type = key
+        try:
+            # fetch_prices 内部已处理异常（失败时返回 0 价格）
+            prices = await asyncio.to_thread(
+                AdapterService.fetch_prices, exchange_id, market_type, batch.config, list(batch.symbols)
+            )
+        except asyncio.CancelledError:
+            for _, future in batch.waiters:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        empty = {'last': 0, 'bid': 0, 'ask': 0, 'mark': 0}
+        for symbols, future in batch.waiters:
+            if not future.done():
+                future.set_result({s: prices.get(s, dict(empty)) for s in symbols})
+    
     @staticmethod
     def fetch_positions(
         exchange_id: str,
@@ -147,14 +275,12 @@ class AdapterService:
             合约：[{'exchange': '...', 'type': 'futures', 'symbol': 'BTC/USDT', 'size': 10, 'entryPrice': 50000, ...}, ...]
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
-            
-            # 对于 Backpack 等非 CCXT 适配器，直接调用 fetch_positions
-            if hasattr(adapter, 'fetch_positions') and adapter.exchange is None:
-                return adapter.fetch_positions(symbols)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
             
-            # 对于 CCXT 适配器，调用标准方法
-            return adapter.fetch_positions()
+            # 所有适配器都接受 symbols：CCXT 适配器在交易所支持时交给服务端过滤，
+            # Backpack 在本地用集合过滤
+            with adapter_lock(adapter):
+                return call_with_rate_limit(exchange_id, adapter.fetch_positions, symbols)
         except Exception as e:
             logger.error(f"❌ {exchange_id} 获取持仓失败: {e}")
             return []
@@ -183,17 +309,29 @@ class AdapterService:
             [{'orderId': '...', 'symbol': 'BTC/USDT', 'side': 'buy', 'type': 'limit', ...}, ...]
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
+            
+            if not symbols:
+                with adapter_lock(adapter):
+                    return call_with_rate_limit(exchange_id, adapter.fetch_orders, since=since, limit=limit)
+            
+            def fetch_symbol_orders(symbol: str) -> List[Dict[str, Any]]:
+                # 单个交易对失败不影响其他交易对
+                try:
+                    with adapter_lock(adapter):
+                        return call_with_rate_limit(exchange_id, adapter.fetch_orders, symbol=symbol, since=since, limit=limit)
+                except Exception as e:
+                    logger.error(f"❌ {exchange_id} 获取 {symbol} 订单失败: {e}")
+                    return []
             
-            # 如果有多个交易对，循环查询
-            if symbols:
-                all_orders = []
-                for symbol in symbols:
-                    orders = adapter.fetch_orders(symbol=symbol, since=since, limit=limit)
-                    all_orders.extend(orders)
-                return all_orders
-            else:
-                return adapter.fetch_orders(since=since, limit=limit)
+            # 池化的 CCXT 实例不能被多个线程同时使用，逐个交易对查询
+            if len(symbols) == 1 or not adapter.thread_safe:
+                return list(chain.from_iterable(map(fetch_symbol_orders, symbols)))
+            
+            # 线程安全的适配器多个交易对并发查询（网络 I/O 密集），并发数受适配器限频能力约束
+            max_workers = min(len(symbols), getattr(adapter, 'max_concurrency', DEFAULT_SYMBOL_CONCURRENCY))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(chain.from_iterable(executor.map(fetch_symbol_orders, symbols)))
         except Exception as e:
             logger.error(f"❌ {exchange_id} 获取订单失败: {e}")
             return []
@@ -232,14 +370,17 @@ class AdapterService:
             {'id': '...', 'clientOrderId': '...', 'status': '...', 'filled': 0, ...}
         """
         try:
-            adapter = get_adapter(exchange_id, market_type, config)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
             
             # 对于 Backpack 等非 CCXT 适配器
             if hasattr(adapter, 'create_order') and adapter.exchange is None:
-                return adapter.create_order(
-                    symbol, side, type_, amount, price,
-                    time_in_force, reduce_only, client_order_id
-                )
+                with adapter_lock(adapter):
+                    return call_with_rate_limit(
+                        exchange_id, adapter.create_order,
+                        symbol, side, type_, amount, price,
+                        time_in_force, reduce_only, client_order_id,
+                        retries=0
+                    )
             
             # 对于 CCXT 适配器（透传机制）
             order_params = {}
@@ -250,14 +391,18 @@ class AdapterService:
             if client_order_id:
                 order_params['clientOrderId'] = client_order_id
             
-            raw_order = adapter.create_order(
-                symbol=symbol,
-                type=type_,
-                side=side,
-                amount=amount,
-                price=price,
-                params=order_params
-            )
+            # 下单不是幂等操作，限频时不自动重试
+            with adapter_lock(adapter):
+                raw_order = call_with_rate_limit(
+                    exchange_id, adapter.create_order,
+                    retries=0,
+                    symbol=symbol,
+                    type=type_,
+                    side=side,
+                    amount=amount,
+                    price=price,
+                    params=order_params
+                )
             
             # 标准化返回
             return {
@@ -285,6 +430,18 @@ class AdapterService:
             True if supported
         """
         return is_exchange_supported(exchange_id)
-
-
-
+    
+    @staticmethod
+    def invalidate(exchange_id: str) -> int:
+        """
+        丢弃某个交易所的池化适配器（凭证轮换后调用，下次请求重新创建）
+        
+        Args:
+            exchange_id: 交易所 ID
+        
+        Returns:
+            丢弃的实例数量
+        """
+        count = evict_exchange_adapters(exchange_id)
+        logger.info(f"🗑️ 已清除 {exchange_id} 的 {count} 个池化适配器")
+        return count
@@ -8,11 +8,15 @@ Cookie 数据服务
 """
 
 import logging
-import json
-from typing import List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, delete, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import IntegrityError
 
 import sys
@@ -23,6 +27,36 @@ from models import Base, BaiduCookieData, BaiduCookieRequest, BaiduCookieRespons
 
 logger = logging.getLogger(__name__)
 
+# 按 AFD_IP 查询结果的内存缓存（写入/删除时按键失效）
+AFD_IP_CACHE_TTL = 60
+AFD_IP_CACHE_MAXSIZE = 4096
+
+# 热点路径的语句只构建一次，执行时只传参数（SQLAlchemy 按语句缓存编译结果）
+_UPSERT_COLUMNS = (
+    'afd_ip', 'baidulocnew', 'url', 'timestamp', 'headers',
+    'proxy_ip', 'proxy_port', 'proxy_city', 'proxy_addr', 'updated_at',
+)
+
+
+def _build_upsert_statement():
+    """INSERT ... ON CONFLICT(afd_ip) DO UPDATE ... RETURNING：冲突时更新除创建时间外的字段"""
+    stmt = sqlite_insert(BaiduCookieData).values(
+        {column: bindparam(column) for column in _UPSERT_COLUMNS + ('created_at',)}
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['afd_ip'],
+        set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS if column != 'afd_ip'}
+    ).returning(BaiduCookieData)
+
+
+_UPSERT_COOKIE = _build_upsert_statement()
+_SELECT_BY_AFD_IP = select(BaiduCookieData).where(BaiduCookieData.afd_ip == bindparam('afd_ip')).limit(1)
+_DELETE_BY_ID = (
+    delete(BaiduCookieData)
+    .where(BaiduCookieData.id == bindparam('cookie_id'))
+    .returning(BaiduCookieData.afd_ip)
+)
+
 
 class CookieService:
     """Cookie 数据服务"""
@@ -38,9 +72,17 @@ class CookieService:
         self.engine = create_engine(
             f"sqlite:///{db_path}",
             echo=False,  # 生产环境关闭 SQL 日志
-            connect_args={"check_same_thread": False}  # SQLite 多线程支持
+            connect_args={"check_same_thread": False},  # SQLite 多线程支持
+            poolclass=QueuePool,  # 复用连接，避免每次请求重新打开数据库文件
+            pool_size=5,
+            pool_pre_ping=True
         )
         
+        # WAL 模式：写入（mitmproxy 持续上传）不阻塞看板的读取
+        event.listen(self.engine, "connect", self._set_sqlite_pragmas)
+        # 事务由 SQLAlchemy 显式开启，写事务使用 BEGIN IMMEDIATE
+        event.listen(self.engine, "begin", self._begin_transaction)
+        
         # 创建会话工厂
         self.SessionLocal = sessionmaker(
             autocommit=False,
@@ -51,8 +93,40 @@ class CookieService:
         # 初始化数据库表
         self._init_database()
         
+        # 读缓存：{afd_ip: (缓存时间, 查询结果)}；记录总数启动时统计一次，之后随增删维护
+        self._cache_lock = threading.Lock()
+        self._afd_ip_cache: Dict[str, Tuple[float, Optional[BaiduCookieResponse]]] = {}
+        self._cache_generation = 0  # 每次失效递增，避免查询期间发生的写入被旧结果覆盖
+        self._count = self._count_rows()
+        
         logger.info(f"✅ Cookie 服务初始化完成，数据库路径: {db_path}")
     
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """新建 SQLite 连接时启用 WAL 日志模式，并交由 SQLAlchemy 控制事务开始"""
+        # 关闭 pysqlite 自带的隐式 BEGIN，改由 _begin_transaction 发出
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")  # 256MB 内存映射读取
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _begin_transaction(conn):
+        """
+        开启事务：写会话使用 BEGIN IMMEDIATE，一开始就拿到写锁
+        
+        WAL 下 DEFERRED 事务在读后升级为写时，遇到其他写者会直接返回 SQLITE_BUSY
+        """
+        if conn.get_execution_options().get("sqlite_begin_immediate"):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+    
     def _init_database(self):
         """创建数据库表（如果不存在）"""
         try:
@@ -62,17 +136,25 @@ class CookieService:
             logger.error(f"❌ 数据库初始化失败: {e}")
             raise
     
-    def get_db(self) -> Session:
-        """获取数据库会话（依赖注入）"""
+    @contextmanager
+    def get_db(self, write: bool = False) -> Iterator[Session]:
+        """
+        获取数据库会话，退出时关闭并将连接归还连接池
+        
+        Args:
+            write: 是否为写会话（事务以 BEGIN IMMEDIATE 开始）
+        """
         db = self.SessionLocal()
         try:
-            return db
+            if write:
+                db.connection(execution_options={"sqlite_begin_immediate": True})
+            yield db
         finally:
-            pass  # 会话由调用者关闭
-    
+            db.close()
+
     def _convert_to_response(self, db_obj: BaiduCookieData) -> BaiduCookieResponse:
         """
-        将数据库对象转换为响应对象（处理 headers 的 JSON 反序列化）
+        将数据库对象转换为响应对象（headers 已由 JSONText 列类型反序列化为 dict）
         
         Args:
             db_obj: 数据库对象
@@ -80,29 +162,20 @@ class CookieService:
         Returns:
             响应对象
         """
-        # 解析 headers（JSON 字符串 -> dict）
-        headers_dict = None
-        if db_obj.headers:
-            try:
-                headers_dict = json.loads(db_obj.headers)
-            except json.JSONDecodeError:
-                logger.warning(f"⚠️ 无法解析 headers JSON: {db_obj.headers[:50]}...")
-                headers_dict = None
-        
-        return BaiduCookieResponse(
-            id=db_obj.id,
-            afd_ip=db_obj.afd_ip,
-            baidulocnew=db_obj.baidulocnew,
-            url=db_obj.url,
-            timestamp=db_obj.timestamp,
-            headers=headers_dict,
-            proxy_ip=db_obj.proxy_ip,
-            proxy_port=db_obj.proxy_port,
-            proxy_city=db_obj.proxy_city,
-            proxy_addr=db_obj.proxy_addr,
-            created_at=db_obj.created_at,
-            updated_at=db_obj.updated_at
-        )
+        return BaiduCookieResponse.model_validate(db_obj)
+    
+    def _count_rows(self) -> int:
+        """从数据库统计记录总数"""
+        with self.get_db() as db:
+            return db.query(BaiduCookieData).count()
+    
+    def _after_write(self, afd_ips, count_delta: int = 0):
+        """写入提交后：使相关 AFD_IP 的缓存失效并更新记录总数"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            for afd_ip in afd_ips:
+                self._afd_ip_cache.pop(afd_ip, None)
+            self._count += count_delta
     
     def save_cookie_data(
         self, 
@@ -117,68 +190,117 @@ class CookieService:
         Returns:
             保存后的 Cookie 数据（如果成功）
         """
-        db = self.SessionLocal()
-        try:
-            # 检查 AFD_IP 是否为空
-            if not cookie_request.afd_ip:
-                logger.warning("⚠️ AFD_IP 为空，无法保存")
-                return None
-            
-            # 查询是否已存在相同的 AFD_IP
-            existing = db.query(BaiduCookieData).filter(
-                BaiduCookieData.afd_ip == cookie_request.afd_ip
-            ).first()
+        with self.get_db(write=True) as db:
+            try:
+                # 检查 AFD_IP 是否为空
+                if not cookie_request.afd_ip:
+                    logger.warning("⚠️ AFD_IP 为空，无法保存")
+                    return None
             
-            if existing:
-                # 更新现有记录
-                existing.baidulocnew = cookie_request.baidulocnew
-                existing.url = cookie_request.url
-                existing.timestamp = cookie_request.timestamp
-                existing.headers = json.dumps(cookie_request.headers, ensure_ascii=False) if cookie_request.headers else None
-                # 更新代理 IP 信息
-                existing.proxy_ip = cookie_request.proxy_ip
-                existing.proxy_port = cookie_request.proxy_port
-                existing.proxy_city = cookie_request.proxy_city
-                existing.proxy_addr = cookie_request.proxy_addr
-                existing.updated_at = datetime.utcnow()
+                now = datetime.utcnow()
+                params = {
+                    'afd_ip': cookie_request.afd_ip,
+                    'baidulocnew': cookie_request.baidulocnew,
+                    'url': cookie_request.url,
+                    'timestamp': cookie_request.timestamp,
+                    'headers': cookie_request.headers,
+                    # 代理 IP 信息
+                    'proxy_ip': cookie_request.proxy_ip,
+                    'proxy_port': cookie_request.proxy_port,
+                    'proxy_city': cookie_request.proxy_city,
+                    'proxy_addr': cookie_request.proxy_addr,
+                    'created_at': now,
+                    'updated_at': now,
+                }
                 
+                # 单条 UPSERT，RETURNING 直接取回保存后的行
+                saved = db.scalars(_UPSERT_COOKIE, params).one()
                 db.commit()
-                db.refresh(existing)
                 
-                logger.info(f"✅ Cookie 数据已更新（AFD_IP: {cookie_request.afd_ip[:20]}...）")
-                return self._convert_to_response(existing)
+                # 新插入的行创建时间即本次写入时间
+                inserted = saved.created_at == now
+                self._after_write([cookie_request.afd_ip], 1 if inserted else 0)
+                action = "已保存" if inserted else "已更新"
+                logger.info(f"✅ Cookie 数据{action}（AFD_IP: {cookie_request.afd_ip[:20]}...）")
+                return self._convert_to_response(saved)
+                
+            except IntegrityError as e:
+                db.rollback()
+                logger.error(f"❌ 数据库完整性错误（可能重复）: {e}")
+                return None
+            except Exception as e:
+                db.rollback()
+                logger.error(f"❌ 保存 Cookie 数据失败: {e}")
+                return None
+    
+    def save_cookie_batch(self, cookie_requests: List[BaiduCookieRequest]) -> Dict[str, int]:
+        """
+        批量保存 Cookie 数据（以 AFD_IP 作为去重键，单个事务提交）
+        
+        Args:
+            cookie_requests: Cookie 请求数据列表
+            
+        Returns:
+            {'inserted': 新增数量, 'updated': 更新数量, 'skipped': 跳过数量（AFD_IP 为空）}
+        """
+        # 同一批次内相同 AFD_IP 以最后一条为准
+        latest: Dict[str, BaiduCookieRequest] = {}
+        skipped = 0
+        for cookie_request in cookie_requests:
+            if cookie_request.afd_ip:
+                latest[cookie_request.afd_ip] = cookie_request
             else:
-                # 创建新记录
-                new_cookie = BaiduCookieData(
-                    afd_ip=cookie_request.afd_ip,
-                    baidulocnew=cookie_request.baidulocnew,
-                    url=cookie_request.url,
-                    timestamp=cookie_request.timestamp,
-                    headers=json.dumps(cookie_request.headers, ensure_ascii=False) if cookie_request.headers else None,
-                    # 保存代理 IP 信息
-                    proxy_ip=cookie_request.proxy_ip,
-                    proxy_port=cookie_request.proxy_port,
-                    proxy_city=cookie_request.proxy_city,
-                    proxy_addr=cookie_request.proxy_addr
+                skipped += 1
+        
+        if not latest:
+            return {'inserted': 0, 'updated': 0, 'skipped': skipped}
+        
+        with self.get_db(write=True) as db:
+            try:
+                # 一次查询出已存在记录的 ID
+                existing_ids = dict(
+                    db.query(BaiduCookieData.afd_ip, BaiduCookieData.id)
+                    .filter(BaiduCookieData.afd_ip.in_(list(latest)))
+                    .all()
                 )
-                
-                db.add(new_cookie)
+            
+                now = datetime.utcnow()
+                inserts = []
+                updates = []
+                for afd_ip, cookie_request in latest.items():
+                    row = {
+                        'afd_ip': afd_ip,
+                        'baidulocnew': cookie_request.baidulocnew,
+                        'url': cookie_request.url,
+                        'timestamp': cookie_request.timestamp,
+                        'headers': cookie_request.headers,
+                        'proxy_ip': cookie_request.proxy_ip,
+                        'proxy_port': cookie_request.proxy_port,
+                        'proxy_city': cookie_request.proxy_city,
+                        'proxy_addr': cookie_request.proxy_addr,
+                        'updated_at': now,
+                    }
+                    if afd_ip in existing_ids:
+                        row['id'] = existing_ids[afd_ip]
+                        updates.append(row)
+                    else:
+                        row['created_at'] = now
+                        inserts.append(row)
+            
+                if inserts:
+                    db.bulk_insert_mappings(BaiduCookieData, inserts)
+                if updates:
+                    db.bulk_update_mappings(BaiduCookieData, updates)
                 db.commit()
-                db.refresh(new_cookie)
-                
-                logger.info(f"✅ Cookie 数据已保存（AFD_IP: {cookie_request.afd_ip[:20]}...）")
-                return self._convert_to_response(new_cookie)
-                
-        except IntegrityError as e:
-            db.rollback()
-            logger.error(f"❌ 数据库完整性错误（可能重复）: {e}")
-            return None
-        except Exception as e:
-            db.rollback()
-            logger.error(f"❌ 保存 Cookie 数据失败: {e}")
-            return None
-        finally:
-            db.close()
+                self._after_write(latest, len(inserts))
+            
+                logger.info(f"✅ 批量保存 Cookie 数据: 新增 {len(inserts)} 条, 更新 {len(updates)} 条")
+                return {'inserted': len(inserts), 'updated': len(updates), 'skipped': skipped}
+            
+            except Exception as e:
+                db.rollback()
+                logger.error(f"❌ 批量保存 Cookie 数据失败: {e}")
+                raise
     
     def get_all_cookies(self, limit: int = 100) -> List[BaiduCookieResponse]:
         """
@@ -190,23 +312,39 @@ class CookieService:
         Returns:
             Cookie 数据列表
         """
-        db = self.SessionLocal()
         try:
-            cookies = db.query(BaiduCookieData)\
-                .order_by(BaiduCookieData.created_at.desc())\
-                .limit(limit)\
-                .all()
-            
-            return [self._convert_to_response(c) for c in cookies]
+            return list(self.iter_cookies(limit))
         except Exception as e:
             logger.error(f"❌ 查询 Cookie 数据失败: {e}")
             return []
-        finally:
-            db.close()
+    
+    def iter_cookies(self, limit: int = 100, batch_size: int = 200) -> Iterator[BaiduCookieResponse]:
+        """
+        按创建时间降序逐条产出 Cookie 数据（用于导出大量数据）
+        
+        每次只从数据库取 batch_size 行，内存占用与 limit 无关；
+        迭代结束（或生成器被关闭）时释放数据库连接
+        
+        Args:
+            limit: 返回数量限制
+            batch_size: 每批从数据库读取的行数
+            
+        Yields:
+            Cookie 数据
+        """
+        stmt = (
+            select(BaiduCookieData)
+            .order_by(BaiduCookieData.created_at.desc())
+            .limit(limit)
+            .execution_options(yield_per=batch_size)
+        )
+        with self.get_db() as db:
+            for cookie in db.scalars(stmt):
+                yield self._convert_to_response(cookie)
     
     def get_cookie_by_afd_ip(self, afd_ip: str) -> Optional[BaiduCookieResponse]:
         """
-        根据 AFD_IP 查询 Cookie 数据
+        根据 AFD_IP 查询 Cookie 数据（结果缓存 AFD_IP_CACHE_TTL 秒，写入/删除时失效）
         
         Args:
             afd_ip: AFD_IP Cookie 值
@@ -214,20 +352,31 @@ class CookieService:
         Returns:
             Cookie 数据（如果存在）
         """
-        db = self.SessionLocal()
-        try:
-            cookie = db.query(BaiduCookieData).filter(
-                BaiduCookieData.afd_ip == afd_ip
-            ).first()
-            
-            if cookie:
-                return self._convert_to_response(cookie)
-            return None
-        except Exception as e:
-            logger.error(f"❌ 查询 Cookie 数据失败: {e}")
-            return None
-        finally:
-            db.close()
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._afd_ip_cache.get(afd_ip)
+            if entry and now - entry[0] < AFD_IP_CACHE_TTL:
+                return entry[1]
+            generation = self._cache_generation
+        
+        with self.get_db() as db:
+            try:
+                cookie = db.scalars(_SELECT_BY_AFD_IP, {'afd_ip': afd_ip}).first()
+                result = self._convert_to_response(cookie) if cookie else None
+            except Exception as e:
+                logger.error(f"❌ 查询 Cookie 数据失败: {e}")
+                return None
+        
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                if len(self._afd_ip_cache) >= AFD_IP_CACHE_MAXSIZE:
+                    # 先清理过期项，仍然满时淘汰最早写入的一项
+                    for stale_key in [k for k, (ts, _) in self._afd_ip_cache.items() if now - ts >= AFD_IP_CACHE_TTL]:
+                        del self._afd_ip_cache[stale_key]
+                    if len(self._afd_ip_cache) >= AFD_IP_CACHE_MAXSIZE:
+                        del self._afd_ip_cache[next(iter(self._afd_ip_cache))]
+                self._afd_ip_cache[afd_ip] = (now, result)
+        return result
     
     def delete_cookie(self, cookie_id: int) -> bool:
         """
@@ -239,45 +388,46 @@ class CookieService:
         Returns:
             是否删除成功
         """
-        db = self.SessionLocal()
-        try:
-            cookie = db.query(BaiduCookieData).filter(
-                BaiduCookieData.id == cookie_id
-            ).first()
+        with self.get_db(write=True) as db:
+            try:
+                # 一条 DELETE ... RETURNING 完成查找和删除，取回 AFD_IP 用于缓存失效
+                afd_ip = db.execute(_DELETE_BY_ID, {'cookie_id': cookie_id}).scalar()
             
-            if cookie:
-                db.delete(cookie)
-                db.commit()
-                logger.info(f"✅ Cookie 数据已删除（ID: {cookie_id}）")
-                return True
+                if afd_ip is not None:
+                    db.commit()
+                    self._after_write([afd_ip], -1)
+                    logger.info(f"✅ Cookie 数据已删除（ID: {cookie_id}）")
+                    return True
             
-            logger.warning(f"⚠️ Cookie 数据不存在（ID: {cookie_id}）")
-            return False
-        except Exception as e:
-            db.rollback()
-            logger.error(f"❌ 删除 Cookie 数据失败: {e}")
-            return False
-        finally:
-            db.close()
+                logger.warning(f"⚠️ Cookie 数据不存在（ID: {cookie_id}）")
+                return False
+            except Exception as e:
+                db.rollback()
+                logger.error(f"❌ 删除 Cookie 数据失败: {e}")
+                return False
     
     def get_cookie_count(self) -> int:
         """
-        获取 Cookie 数据总数
+        获取 Cookie 数据总数（内存计数，O(1)）
         
         Returns:
             数据总数
         """
-        db = self.SessionLocal()
-        try:
-            count = db.query(BaiduCookieData).count()
-            return count
-        except Exception as e:
-            logger.error(f"❌ 查询 Cookie 数据总数失败: {e}")
-            return 0
-        finally:
-            db.close()
+        with self._cache_lock:
+            return self._count
+
+
+# 全局单例实例（延迟初始化：首次使用时才创建数据库引擎和表）
+_cookie_service_instance: Optional[CookieService] = None
+_cookie_service_lock = threading.Lock()
 
 
-# 全局单例实例
-cookie_service = CookieService()
+def get_cookie_service() -> CookieService:
+    """获取全局 Cookie 服务实例（单例模式，线程安全）"""
+    global _cookie_service_instance
+    if _cookie_service_instance is None:
+        with _cookie_service_lock:
+            if _cookie_service_instance is None:
+                _cookie_service_instance = CookieService()
+    return _cookie_service_instance
 
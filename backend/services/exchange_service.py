@@ -8,7 +8,7 @@ import time
 import asyncio
 import ccxt
 from typing import Dict, List, Optional, Any
-from exchange_adapters import get_adapter
+from exchange_adapters import get_pooled_adapter, adapter_lock, CUSTOM_ADAPTERS, DEFAULT_SUPPORTED_EXCHANGES
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +33,71 @@ class ExchangeService:
         Returns:
             交易所名称列表（定制适配器 + 默认支持）
         """
-        from exchange_adapters import CUSTOM_ADAPTERS, DEFAULT_SUPPORTED_EXCHANGES
         # 定制适配器优先（经过优化）
         return list(CUSTOM_ADAPTERS.keys()) + DEFAULT_SUPPORTED_EXCHANGES
     
+    @staticmethod
+    def _run_connectivity_test(exchange_id: str, market_type: str, config: dict) -> Dict[str, Any]:
+        """在线程池中创建（或复用）适配器并测试连通性"""
+        adapter = get_pooled_adapter(
+            exchange_id=exchange_id,
+            market_type=market_type,
+            config=config
+        )
+        with adapter_lock(adapter):
+            return adapter.test_connectivity()
+    
+    async def _test_market_connection(
+        self,
+        exchange_id: str,
+        market_type: str,
+        label: str,
+        config: dict
+    ) -> Dict[str, Any]:
+        """
+        测试单个市场（现货/合约）账户的连接
+        
+        Args:
+            exchange_id: 交易所 ID
+            market_type: 市场类型 ('spot' 或 'futures')
+            label: 日志中使用的市场名称
+            config: 适配器配置
+            
+        Returns:
+            该市场的测试结果
+        """
+        try:
+            logger.info(f"🔍 测试交易所连接: {exchange_id} {label} (使用 Adapter)")
+            result = await asyncio.to_thread(self._run_connectivity_test, exchange_id, market_type, config)
+            
+            if result.get('ok'):
+                logger.info(f"✅ {exchange_id} {label}连接测试成功！延迟: {result.get('latencyMs', 0):.2f}ms")
+                return {
+                    "success": True,
+                    "serverTime": result.get('serverTime'),
+                    "accountId": result.get('accountId'),
+                    "latencyMs": result.get('latencyMs'),
+                    "balance": result.get('balance', {})
+                }
+            
+            logger.error(f"❌ {exchange_id} {label}连接测试失败: {result.get('error')}")
+            return {
+                "success": False,
+                "error": result.get('error', '连接测试失败')
+            }
+        except ValueError as e:
+            logger.error(f"❌ {exchange_id} {label}配置错误: {str(e)}")
+            return {
+                "success": False,
+                "error": f"配置错误: {str(e)}"
+            }
+        except Exception as e:
+            logger.error(f"❌ {exchange_id} {label}测试失败: {str(e)}")
+            return {
+                "success": False,
+                "error": f"未知错误: {str(e)}"
+            }
+    
     async def test_exchange_connection(
         self,
         exchange: str,
@@ -68,7 +129,6 @@ class ExchangeService:
             'timeout': 15000,  # 15秒超时
         }
         
-        loop = asyncio.get_event_loop()
         results = {
             'exchange': exchange_id,
             'spot': None,
@@ -76,81 +136,11 @@ class ExchangeService:
             'timestamp': int(time.time() * 1000)
         }
         
-        # 测试现货账户
-        try:
-            logger.info(f"🔍 测试交易所连接: {exchange_id} 现货 (使用 Adapter)")
-            spot_adapter = get_adapter(
-                exchange_id=exchange_id,
-                market_type='spot',
-                config=adapter_config
-            )
-            spot_result = await loop.run_in_executor(None, spot_adapter.test_connectivity)
-            
-            if spot_result.get('ok'):
-                logger.info(f"✅ {exchange_id} 现货连接测试成功！延迟: {spot_result.get('latencyMs', 0):.2f}ms")
-                results['spot'] = {
-                    "success": True,
-                    "serverTime": spot_result.get('serverTime'),
-                    "accountId": spot_result.get('accountId'),
-                    "latencyMs": spot_result.get('latencyMs'),
-                    "balance": spot_result.get('balance', {})
-                }
-            else:
-                logger.error(f"❌ {exchange_id} 现货连接测试失败: {spot_result.get('error')}")
-                results['spot'] = {
-                    "success": False,
-                    "error": spot_result.get('error', '连接测试失败')
-                }
-        except ValueError as e:
-            logger.error(f"❌ {exchange_id} 现货配置错误: {str(e)}")
-            results['spot'] = {
-                "success": False,
-                "error": f"配置错误: {str(e)}"
-            }
-        except Exception as e:
-            logger.error(f"❌ {exchange_id} 现货测试失败: {str(e)}")
-            results['spot'] = {
-                "success": False,
-                "error": f"未知错误: {str(e)}"
-            }
-        
-        # 测试合约账户
-        try:
-            logger.info(f"🔍 测试交易所连接: {exchange_id} 合约 (使用 Adapter)")
-            futures_adapter = get_adapter(
-                exchange_id=exchange_id,
-                market_type='futures',
-                config=adapter_config
-            )
-            futures_result = await loop.run_in_executor(None, futures_adapter.test_connectivity)
-            
-            if futures_result.get('ok'):
-                logger.info(f"✅ {exchange_id} 合约连接测试成功！延迟: {futures_result.get('latencyMs', 0):.2f}ms")
-                results['futures'] = {
-                    "success": True,
-                    "serverTime": futures_result.get('serverTime'),
-                    "accountId": futures_result.get('accountId'),
-                    "latencyMs": futures_result.get('latencyMs'),
-                    "balance": futures_result.get('balance', {})
-                }
-            else:
-                logger.error(f"❌ {exchange_id} 合约连接测试失败: {futures_result.get('error')}")
-                results['futures'] = {
-                    "success": False,
-                    "error": futures_result.get('error', '连接测试失败')
-                }
-        except ValueError as e:
-            logger.error(f"❌ {exchange_id} 合约配置错误: {str(e)}")
-            results['futures'] = {
-                "success": False,
-                "error": f"配置错误: {str(e)}"
-            }
-        except Exception as e:
-            logger.error(f"❌ {exchange_id} 合约测试失败: {str(e)}")
-            results['futures'] = {
-                "success": False,
-                "error": f"未知错误: {str(e)}"
-            }
+        # 现货和合约账户同时测试，总耗时取两者中较慢的一个
+        results['spot'], results['futures'] = await asyncio.gather(
+            self._test_market_connection(exchange_id, 'spot', '现货', adapter_config),
+            self._test_market_connection(exchange_id, 'futures', '合约', adapter_config)
+        )
         
         # 判断整体测试结果（至少有一个成功就算成功）
         overall_success = (results['spot'] and results['spot'].get('success')) or \
@@ -3,14 +3,36 @@
 处理K线数据、交易对列表、市场缓存管理等
 """
 
+import asyncio
 import logging
 import time
-from typing import Dict, List, Any, Set, Optional
+from typing import Dict, List, Any, Set, Optional, Tuple
 from util.market_cache import MarketCache, load_markets_with_cache
-from exchange_adapters import get_adapter
+from exchange_adapters import get_pooled_adapter, call_locked
+from services.rate_limiter import call_with_rate_limit
 
 logger = logging.getLogger(__name__)
 
+# 币种列表索引的有效期（秒）：交易所上下架以小时/天计
+SYMBOL_INDEX_TTL = 3600
+
+
+def _ohlcv_to_klines(ohlcv: List[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    将 CCXT OHLCV 数组转换为前端使用的 K线格式（价格/成交量为字符串）
+    
+    先按列转置，再用 map(str, 列) 批量转换，类型转换在 C 层循环中完成
+    """
+    if not ohlcv:
+        return []
+    times, opens, highs, lows, closes, volumes = list(zip(*ohlcv))[:6]
+    return [
+        {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for t, o, h, l, c, v in zip(
+            times, map(str, opens), map(str, highs), map(str, lows), map(str, closes), map(str, volumes)
+        )
+    ]
+
 
 class MarketService:
     """市场数据服务（基于 Adapter 架构）"""
@@ -41,6 +63,9 @@ class MarketService:
         self.markets_loading = markets_loading
         self.priority_exchanges = priority_exchanges
         self.proxy_config = proxy_config
+        # {exchange_id: (建立时间, 构建时的 markets 对象, {计价币种: 排序后的币种列表})}
+        # 计价币种为 '' 时表示不过滤；markets 被重新加载（对象变化）时自动重建
+        self._symbol_index: Dict[str, Tuple[float, Any, Dict[str, List[str]]]] = {}
         logger.info("市场数据服务初始化完成（Adapter 架构）")
     
     async def get_klines(
@@ -81,20 +106,14 @@ class MarketService:
                 config['proxies'] = self.proxy_config
             
             # ✅ 所有交易所统一走 Adapter（自动处理市场数据加载、代理配置等）
-            adapter = get_adapter(exchange_name, market_type, config)
-            ohlcv = adapter.fetch_klines(symbol, interval, limit)
+            adapter = get_pooled_adapter(exchange_name, market_type, config)
+            # 在线程中执行阻塞的 REST 请求，避免占用事件循环；同一交易所的请求共享全局限流
+            ohlcv = await asyncio.to_thread(
+                call_locked, adapter, call_with_rate_limit, exchange_name, adapter.fetch_klines, symbol, interval, limit
+            )
             
             # 统一转换数据格式
-            klines = []
-            for candle in ohlcv:
-                klines.append({
-                    'time': candle[0],
-                    'open': str(candle[1]),
-                    'high': str(candle[2]),
-                    'low': str(candle[3]),
-                    'close': str(candle[4]),
-                    'volume': str(candle[5])
-                })
+            klines = _ohlcv_to_klines(ohlcv)
             
             return {
                 'success': True,
@@ -148,6 +167,31 @@ class MarketService:
             }
         }
     
+    def _get_symbol_index(self, exchange_id: str, markets: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        获取交易所的币种索引 {计价币种: 排序后的 base 币种列表}（只包含活跃的现货交易对）
+        
+        索引在 SYMBOL_INDEX_TTL 内复用，查询只需按计价币种取出并截断
+        """
+        now = time.monotonic()
+        entry = self._symbol_index.get(exchange_id)
+        if entry and entry[1] is markets and now - entry[0] < SYMBOL_INDEX_TTL:
+            return entry[2]
+        
+        by_quote: Dict[str, Set[str]] = {'': set()}
+        for symbol, market in markets.items():
+            if market.get('spot') and market.get('active', True):
+                # 提取 base 币种（如 BTC/USDT → BTC）
+                base = market.get('base') or symbol.split('/')[0]
+                by_quote[''].add(base)
+                by_quote.setdefault(market.get('quote'), set()).add(base)
+        
+        index = {quote: sorted(bases) for quote, bases in by_quote.items()}
+        if markets:
+            # 市场数据加载失败（为空）时不缓存，下次请求重试
+            self._symbol_index[exchange_id] = (now, markets, index)
+        return index
+    
     async def get_symbols(
         self,
         exchange: str = "binance",
@@ -182,29 +226,10 @@ class MarketService:
                 except Exception as e:
                     logger.warning(f"市场数据加载失败: {e}")
             
-            markets = exchange_instance.markets or {}
-            
-            # 过滤现货交易对，只返回币种代码（不包含计价货币）
-            coin_codes = set()  # 使用 set 去重
-            
-            for symbol, market in markets.items():
-                # 只获取现货交易对
-                if market.get('spot') and market.get('active', True):
-                    # 如果指定了计价币种，进行过滤
-                    if quote:
-                        if market.get('quote') == quote.upper():
-                            # 提取 base 币种（如 BTC/USDT → BTC）
-                            base = market.get('base') or symbol.split('/')[0]
-                            coin_codes.add(base)
-                    else:
-                        base = market.get('base') or symbol.split('/')[0]
-                        coin_codes.add(base)
-            
-            # 转换为列表并排序
-            coin_list = sorted(list(coin_codes))
+            coins_by_quote = self._get_symbol_index(exchange_id, exchange_instance.markets or {})
             
             # 限制返回数量
-            coin_list = coin_list[:limit]
+            coin_list = coins_by_quote.get(quote.upper() if quote else '', [])[:limit]
             
             logger.info(f"✅ 返回 {len(coin_list)} 个币种代码（{exchange_id}）")
             
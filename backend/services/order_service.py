@@ -8,6 +8,7 @@ import time
 import asyncio
 from typing import Dict, List, Any
 from exchange_adapters import get_adapter
+from services.rate_limiter import call_with_rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -133,7 +134,7 @@ class OrderService:
                     
                     spot_orders = await loop.run_in_executor(
                         None,
-                        spot_adapter.fetch_orders,
+                        call_with_rate_limit, exchange_id, spot_adapter.fetch_orders,
                         None, since, limit, symbols
                     )
                     orders.extend(spot_orders)
@@ -151,7 +152,7 @@ class OrderService:
                     
                     futures_orders = await loop.run_in_executor(
                         None,
-                        futures_adapter.fetch_orders,
+                        call_with_rate_limit, exchange_id, futures_adapter.fetch_orders,
                         None, since, limit, symbols
                     )
                     orders.extend(futures_orders)
@@ -202,7 +203,7 @@ class OrderService:
                     # 传递交易对列表（作为 symbols 参数）
                     all_orders = await loop.run_in_executor(
                         None,
-                        adapter.fetch_orders,
+                        call_with_rate_limit, exchange_id, adapter.fetch_orders,
                         None,   # symbol=None 表示不指定单个交易对
                         since,  # 起始时间（None=完整历史）
                         limit,  # 订单数量限制
@@ -214,7 +215,7 @@ class OrderService:
                     # 🎯 传递 base_currencies 参数，让 adapter 根据币种推测交易对
                     all_orders = await loop.run_in_executor(
                         None,
-                        adapter.fetch_orders,
+                        call_with_rate_limit, exchange_id, adapter.fetch_orders,
                         None,   # symbol=None 表示不指定单个交易对
                         since,  # 起始时间（None=完整历史）
                         limit,  # 订单数量限制
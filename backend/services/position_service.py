@@ -6,8 +6,9 @@
 import logging
 import time
 import asyncio
-from typing import Dict, List, Any
-from exchange_adapters import get_adapter
+from typing import Dict, List, Any, Tuple
+from exchange_adapters import get_pooled_adapter, call_locked
+from services.rate_limiter import call_with_rate_limit
 from util.exchange_rules import generate_symbol
 
 logger = logging.getLogger(__name__)
@@ -30,7 +31,7 @@ class PositionService:
         self, 
         credentials: List[Dict[str, str]], 
         symbols: List[str] = None,
-        symbol_pairs: Dict[str, List[str]] = None
+        symbol_pairs: Dict[Tuple[str, str], List[str]] = None
     ) -> Dict[str, Any]:
         """
         获取多个交易所的持仓数据
@@ -45,6 +46,7 @@ class PositionService:
                 - password: 密码（可选，某些交易所需要）
             symbols: 可选的币种列表（如 ['BTC', 'ETH', 'PEOPLE']），用于过滤持仓
                      如果提供，只返回匹配的币种持仓，可以大幅提升查询速度
+            symbol_pairs: 可选的交易对映射 {(exchange, marketType): [symbols]}，优先于 symbols
             
         Returns:
             {
@@ -156,7 +158,7 @@ class PositionService:
         self, 
         cred: Dict[str, str], 
         symbol_set: set = None,
-        symbol_pairs: Dict[str, List[str]] = None
+        symbol_pairs: Dict[Tuple[str, str], List[str]] = None
     ) -> List[dict]:
         """
         获取单个交易所的持仓数据
@@ -165,7 +167,7 @@ class PositionService:
         Args:
             cred: 交易所凭证
             symbol_set: 可选的币种集合（用于过滤），None 表示不过滤（向后兼容）
-            symbol_pairs: 可选的交易对映射 {exchange_marketType: [symbols]}，优先使用此参数
+            symbol_pairs: 可选的交易对映射 {(exchange, marketType): [symbols]}，优先使用此参数
         """
         exchange_id = cred.get('exchange', '').lower()
         market_type = cred.get('marketType', 'spot').lower()
@@ -176,7 +178,7 @@ class PositionService:
         # 如果提供了 symbol_pairs，从中获取对应的交易对列表
         symbols_list = None
         if symbol_pairs:
-            key = f"{exchange_id}_{market_type}"
+            key = (exchange_id, market_type)
             if key in symbol_pairs:
                 symbols_list = symbol_pairs[key]
                 logger.debug(f"✅ 使用前端传递的交易对列表: {symbols_list}")
@@ -185,8 +187,8 @@ class PositionService:
                 # 统一账户可能使用 'unified' 作为 market_type
                 if market_type == 'unified':
                     # 统一账户需要分别获取现货和合约的交易对
-                    spot_key = f"{exchange_id}_spot"
-                    futures_key = f"{exchange_id}_futures"
+                    spot_key = (exchange_id, 'spot')
+                    futures_key = (exchange_id, 'futures')
                     # 这里暂时不处理，让后续逻辑处理
                     pass
         
@@ -215,21 +217,21 @@ class PositionService:
                 
                 # 如果提供了 symbol_pairs，从中获取交易对列表
                 if symbol_pairs:
-                    symbols_list_spot = symbol_pairs.get(f"{exchange_id}_spot")
-                    symbols_list_futures = symbol_pairs.get(f"{exchange_id}_futures")
+                    symbols_list_spot = symbol_pairs.get((exchange_id, 'spot'))
+                    symbols_list_futures = symbol_pairs.get((exchange_id, 'futures'))
                 else:
                     # 向后兼容：转换 symbol_set 为交易对列表
                     symbols_list_spot = self._convert_symbol_set_to_list(symbol_set, exchange_id, 'spot')
                     symbols_list_futures = self._convert_symbol_set_to_list(symbol_set, exchange_id, 'futures')
                 
                 # 使用 spot 类型的 adapter 获取余额（现货）
-                spot_adapter = get_adapter(exchange_id, 'spot', config)
+                spot_adapter = get_pooled_adapter(exchange_id, 'spot', config)
                 loop = asyncio.get_event_loop()
                 
                 # 获取现货余额
                 try:
                     spot_start = time.time()
-                    balance = await loop.run_in_executor(None, lambda: spot_adapter.fetch_balance(symbols=symbols_list_spot))
+                    balance = await loop.run_in_executor(None, lambda: call_locked(spot_adapter, call_with_rate_limit, exchange_id, spot_adapter.fetch_balance, symbols=symbols_list_spot))
                     spot_elapsed = time.time() - spot_start
                     spot_positions = self._format_spot_balance(balance, exchange_id, 'spot', symbol_set)
                     positions.extend(spot_positions)
@@ -240,8 +242,8 @@ class PositionService:
                 # 获取合约持仓
                 try:
                     futures_start = time.time()
-                    futures_adapter = get_adapter(exchange_id, 'futures', config)
-                    futures_positions = await loop.run_in_executor(None, lambda: futures_adapter.fetch_positions(symbols=symbols_list_futures))
+                    futures_adapter = get_pooled_adapter(exchange_id, 'futures', config)
+                    futures_positions = await loop.run_in_executor(None, lambda: call_locked(futures_adapter, call_with_rate_limit, exchange_id, futures_adapter.fetch_positions, symbols=symbols_list_futures))
                     futures_elapsed = time.time() - futures_start
                     formatted_futures = self._format_futures_positions(futures_positions, exchange_id, 'futures', symbol_set)
                     positions.extend(formatted_futures)
@@ -256,7 +258,7 @@ class PositionService:
             
             # 🔄 分离账户模式：按 market_type 分别获取
             # 🎯 使用 Adapter 创建交易所实例
-            adapter = get_adapter(exchange_id, market_type, config)
+            adapter = get_pooled_adapter(exchange_id, market_type, config)
             
             loop = asyncio.get_event_loop()
             
@@ -268,7 +270,7 @@ class PositionService:
             if market_type == 'spot':
                 # 现货：获取余额
                 spot_start = time.time()
-                balance = await loop.run_in_executor(None, lambda: adapter.fetch_balance(symbols=symbols_list))
+                balance = await loop.run_in_executor(None, lambda: call_locked(adapter, call_with_rate_limit, exchange_id, adapter.fetch_balance, symbols=symbols_list))
                 spot_elapsed = time.time() - spot_start
                 positions = self._format_spot_balance(balance, exchange_id, market_type, symbol_set)
                 logger.info(f"✅ {exchange_id} ({market_type}) 现货余额: {len(positions)} 个币种, 耗时: {spot_elapsed:.3f}秒")
@@ -277,7 +279,7 @@ class PositionService:
                 # 合约：获取持仓
                 # 传递交易对格式（如 ['PEOPLE/USDT']）给 CCXT
                 futures_start = time.time()
-                futures_positions = await loop.run_in_executor(None, lambda: adapter.fetch_positions(symbols=symbols_list))
+                futures_positions = await loop.run_in_executor(None, lambda: call_locked(adapter, call_with_rate_limit, exchange_id, adapter.fetch_positions, symbols=symbols_list))
                 futures_elapsed = time.time() - futures_start
                 positions = self._format_futures_positions(futures_positions, exchange_id, market_type, symbol_set)
                 logger.info(f"✅ {exchange_id} ({market_type}) 合约持仓: {len(positions)} 个, 耗时: {futures_elapsed:.3f}秒")
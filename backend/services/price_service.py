@@ -3,10 +3,13 @@
 处理多个币种的价格获取
 """
 
+import asyncio
 import logging
 import time
+from collections import defaultdict
 from typing import Dict, List, Any, Set
-from exchange_adapters import get_adapter
+from exchange_adapters import get_pooled_adapter, call_locked, CUSTOM_ADAPTERS, DefaultAdapter
+from exchange_adapters.async_default_adapter import get_shared_async_adapter
 
 logger = logging.getLogger(__name__)
 
@@ -38,50 +41,33 @@ class PriceService:
             if not symbols_list:
                 raise ValueError("symbols 参数不能为空")
             
-            prices = {}
-            
             # 按交易所分组
-            exchange_symbols = {}
+            exchange_symbols = defaultdict(list)
             for item in symbols_list:
                 exchange_id = item.get('exchange', '').lower()
                 symbol = item.get('symbol', '')
                 
                 if not exchange_id or not symbol:
                     continue
-                    
-                if exchange_id not in exchange_symbols:
-                    exchange_symbols[exchange_id] = []
+                
                 exchange_symbols[exchange_id].append(symbol)
             
-            # 🎯 使用 Adapter 获取价格（逐个交易所）
-            for exchange_id, symbols in exchange_symbols.items():
-                try:
-                    # 配置（价格查询是公开 API）
-                    config = {
-                        'apiKey': '',
-                        'secret': '',
-                    }
-                    
-                    if self.proxy_config.get('http') or self.proxy_config.get('https'):
-                        config['proxies'] = self.proxy_config
-                    
-                    # 获取 Adapter（默认现货市场）
-                    adapter = get_adapter(exchange_id, 'spot', config)
-                    prices[exchange_id] = {}
-                    
-                    # 获取每个交易对的价格
-                    for symbol in symbols:
-                        try:
-                            ticker = adapter.fetch_ticker(symbol)
-                            # 使用最新成交价
-                            prices[exchange_id][symbol] = ticker.get('last', 0)
-                        except Exception as e:
-                            logger.warning(f"获取 {exchange_id} {symbol} 价格失败: {e}")
-                            prices[exchange_id][symbol] = 0
-                            
-                except Exception as e:
-                    logger.error(f"初始化 {exchange_id} Adapter 失败: {e}")
+            # 🎯 各交易所并发查询，每个交易所一次批量请求（fetch_tickers）
+            results = await asyncio.gather(
+                *(
+                    self._fetch_exchange_prices(exchange_id, symbols)
+                    for exchange_id, symbols in exchange_symbols.items()
+                ),
+                return_exceptions=True
+            )
+            
+            prices = {}
+            for exchange_id, result in zip(exchange_symbols, results):
+                if isinstance(result, Exception):
+                    logger.error(f"获取 {exchange_id} 价格失败: {result}")
                     prices[exchange_id] = {}
+                else:
+                    prices[exchange_id] = result
             
             return {
                 "success": True,
@@ -92,4 +78,40 @@ class PriceService:
         except Exception as e:
             logger.error(f"获取价格失败: {str(e)}")
             raise
-
+    
+    async def _fetch_exchange_prices(self, exchange_id: str, symbols: List[str]) -> Dict[str, float]:
+        """
+        获取单个交易所多个交易对的最新成交价
+        
+        fetch_prices 在交易所支持 fetchTickers 时只发一次请求，否则逐个查询：
+        - CCXT 交易所：异步适配器直接在事件循环中请求（共享 aiohttp 连接池，不占用线程）
+        - 非 CCXT 交易所（如 Backpack）：同步 Adapter 放到线程池执行
+        
+        Args:
+            exchange_id: 交易所 ID
+            symbols: 交易对列表
+            
+        Returns:
+            {symbol: 最新成交价}，获取失败的交易对为 0
+        """
+        # 配置（价格查询是公开 API）
+        config = {
+            'apiKey': '',
+            'secret': '',
+        }
+        
+        if self.proxy_config.get('http') or self.proxy_config.get('https'):
+            config['proxies'] = self.proxy_config
+        
+        adapter_class = CUSTOM_ADAPTERS.get(exchange_id)
+        if adapter_class is None or issubclass(adapter_class, DefaultAdapter):
+            adapter = get_shared_async_adapter(exchange_id, 'spot', config)
+            tickers = await adapter.fetch_prices(symbols)
+        else:
+            # 获取 Adapter（默认现货市场）
+            adapter = get_pooled_adapter(exchange_id, 'spot', config)
+            loop = asyncio.get_event_loop()
+            tickers = await loop.run_in_executor(None, call_locked, adapter, adapter.fetch_prices, symbols)
+        
+        # 使用最新成交价
+        return {symbol: tickers.get(symbol, {}).get('last', 0) for symbol in symbols}
@@ -0,0 +1,159 @@
+"""
+交易所 REST 调用限流
+
+CCXT 的 enableRateLimit 只对单个交易所实例生效，而适配器按凭证池化，
+同一交易所可能同时存在多个实例。这里按 exchange_id 做全局限制：
+1. 最大并发请求数（信号量）
+2. 每秒请求数（令牌桶，允许短时突发）
+3. 触发限频（429 / -1003）后指数退避重试，退避期间该交易所的请求串行执行
+
+适配器接口均为同步方法（在线程池中执行），因此限流器基于 threading 实现
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from exchange_adapters.default_adapter import RATE_LIMIT_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# 每个交易所的限制：(最大并发数, 每秒请求数)
+EXCHANGE_LIMITS = MappingProxyType({
+    'binance': (10, 20),
+    'okx': (5, 10),
+    'gate': (5, 10),
+    'backpack': (5, 10),
+})
+DEFAULT_EXCHANGE_LIMITS = (5, 10)
+
+# 限频重试：第 n 次重试前等待 min(BASE * 2**n, MAX) 秒（附加随机抖动）
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 0.5
+RATE_LIMIT_BACKOFF_MAX = 8.0
+
+
+class _ExchangeLimiter:
+    """单个交易所的并发 + 速率限制"""
+
+    def __init__(self, max_concurrency: int, rps: float):
+        self.rps = rps
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._bucket_lock = threading.Lock()
+        self._tokens = float(rps)
+        self._updated = time.monotonic()
+        # 退避期间只允许一个请求在途
+        self._serial_lock = threading.Lock()
+        self._backoff_until = 0.0
+
+    def _take_token(self):
+        """取一个令牌；令牌不足时预约下一个令牌并等待到期"""
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._tokens = min(self.rps, self._tokens + (now - self._updated) * self.rps)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rps if self._tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """占用一个请求名额"""
+        serial = time.monotonic() < self._backoff_until
+        if serial:
+            self._serial_lock.acquire()
+        try:
+            with self._semaphore:
+                self._take_token()
+                yield
+        finally:
+            if serial:
+                self._serial_lock.release()
+
+    def backoff(self, delay: float):
+        """进入退避：delay 秒内的新请求串行执行"""
+        self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+
+
+_limiters: Dict[str, _ExchangeLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _get_limiter(exchange_id: str) -> _ExchangeLimiter:
+    """获取（或创建）交易所的限流器"""
+    limiter = _limiters.get(exchange_id)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(exchange_id)
+            if limiter is None:
+                limiter = _limiters[exchange_id] = _ExchangeLimiter(
+                    *EXCHANGE_LIMITS.get(exchange_id, DEFAULT_EXCHANGE_LIMITS)
+                )
+    return limiter
+
+
+def limiter(exchange_id: str):
+    """
+    占用交易所的一个请求名额（上下文管理器）
+
+    示例：
+        with limiter('binance'):
+            adapter.fetch_prices(symbols)
+    """
+    return _get_limiter(exchange_id).slot()
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    判断异常是否为交易所限频错误
+    
+    CCXT 已把 HTTP 429、币安 -1003 等映射为 RateLimitExceeded / DDoSProtection，
+    自研适配器（如 Backpack）也抛出同样的异常类型
+    """
+    return isinstance(error, RATE_LIMIT_ERRORS)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间（指数退避 + 抖动）"""
+    delay = min(RATE_LIMIT_BACKOFF_BASE * 2 ** attempt, RATE_LIMIT_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def call_with_rate_limit(
+    exchange_id: str,
+    func: Callable[..., Any],
+    /,
+    *args: Any,
+    retries: int = RATE_LIMIT_MAX_RETRIES,
+    **kwargs: Any
+) -> Any:
+    """
+    在限流器内调用适配器方法，遇到限频错误时退避重试
+
+    Args:
+        exchange_id: 交易所 ID
+        func: 适配器方法
+        retries: 限频错误的最大重试次数（下单等非幂等操作应传 0）
+
+    Returns:
+        func 的返回值；非限频错误或重试耗尽时抛出原异常
+    """
+    ex_limiter = _get_limiter(exchange_id)
+    attempt = 0
+    while True:
+        try:
+            with ex_limiter.slot():
+                return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_rate_limit_error(e):
+                raise
+            delay = _backoff_delay(attempt)
+            ex_limiter.backoff(delay)
+            attempt += 1
+            logger.warning(f"⏳ {exchange_id} 触发限频，{delay:.2f} 秒后第 {attempt} 次重试: {e}")
+        time.sleep(delay)
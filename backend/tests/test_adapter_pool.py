@@ -0,0 +1,243 @@
+"""
+测试适配器池化与连通性测试缓存
+
+验证点：
+1. 连通性测试只复用同一组凭证的成功结果，错误的 secret 不会命中缓存
+2. 返回的结果是副本，调用方修改不会污染缓存
+3. 池化按完整凭证和代理区分实例，get_adapter 始终创建新实例
+4. 池化实例可被单独、按交易所、按空闲时间回收
+5. 池化的 CCXT 实例带调用锁，多个线程的调用串行执行
+6. 异步适配器与同步适配器使用同一套 CCXT 配置，复用的异步实例会按空闲时间回收
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import exchange_adapters
+from exchange_adapters import async_default_adapter
+from exchange_adapters import (
+    adapter_lock,
+    call_locked,
+    evict_adapter,
+    evict_exchange_adapters,
+    evict_idle_adapters,
+    get_adapter,
+    get_pooled_adapter,
+)
+
+CONFIG = {'apiKey': 'k', 'secret': 's'}
+
+
+@pytest.fixture
+def clean_pool():
+    """每个用例使用空的适配器池，并 mock 掉 CCXT 交易所类"""
+    exchange_adapters._ADAPTER_POOL.clear()
+    with patch('ccxt.binance') as mock_exchange_class, patch('ccxt.okx') as mock_okx_class:
+        mock_exchange_class.side_effect = lambda *args, **kwargs: _mock_exchange()
+        mock_okx_class.side_effect = lambda *args, **kwargs: _mock_exchange()
+        yield
+    exchange_adapters._ADAPTER_POOL.clear()
+
+
+def _mock_exchange(fetch_balance=None, error=None):
+    """构造一个不发起网络请求的 CCXT 交易所实例"""
+    exchange = MagicMock()
+    exchange.markets = {}
+    if error is not None:
+        exchange.fetch_balance.side_effect = error
+    else:
+        exchange.fetch_balance.return_value = fetch_balance or {'BTC': {'total': 1}}
+    return exchange
+
+
+class TestConnectivityCache:
+    """测试 test_connectivity 的短时结果复用"""
+
+    def test_wrong_secret_is_not_answered_from_cache(self):
+        """相同 apiKey、错误 secret 的测试必须真正请求交易所"""
+        with patch('ccxt.binance') as mock_exchange_class:
+            mock_exchange_class.side_effect = [
+                _mock_exchange(),
+                _mock_exchange(error=Exception('Invalid API-key')),
+            ]
+            good = get_adapter('binance', 'spot', {'apiKey': 'k', 'secret': 'RIGHT'})
+            bad = get_adapter('binance', 'spot', {'apiKey': 'k', 'secret': 'WRONG'})
+
+            assert good.test_connectivity()['ok'] is True
+            assert bad.test_connectivity()['ok'] is False
+
+    def test_cached_result_is_a_copy(self):
+        """命中缓存时返回副本，不会请求交易所"""
+        with patch('ccxt.binance') as mock_exchange_class:
+            exchange = _mock_exchange()
+            mock_exchange_class.return_value = exchange
+            adapter = get_adapter('binance', 'spot', {'apiKey': 'k', 'secret': 's'})
+
+            first = adapter.test_connectivity()
+            first['balance']['ETH'] = '99'
+            first['ok'] = False
+
+            second = adapter.test_connectivity()
+            assert second['ok'] is True
+            assert second['balance'] == {'BTC': '1.0'}
+            assert exchange.fetch_balance.call_count == 1
+
+
+@pytest.mark.usefixtures('clean_pool')
+class TestPoolKeying:
+    """测试池化实例的复用与区分"""
+
+    def test_same_config_reuses_instance(self):
+        """相同交易所、市场和凭证复用同一实例"""
+        first = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        second = get_pooled_adapter('BINANCE', 'spot', dict(CONFIG))
+        assert first is second
+
+    @pytest.mark.parametrize('override', [
+        {'secret': 'other'},
+        {'password': 'pass'},
+        {'proxies': {'https': 'http://127.0.0.1:7890'}},
+    ])
+    def test_different_credentials_or_proxies_get_new_instance(self, override):
+        """secret / password / 代理不同时不能共享实例"""
+        base = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        other = get_pooled_adapter('binance', 'spot', {**CONFIG, **override})
+        assert other is not base
+
+    def test_market_type_is_part_of_key(self):
+        """现货与合约使用不同实例"""
+        spot = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        futures = get_pooled_adapter('binance', 'futures', dict(CONFIG))
+        assert spot is not futures
+
+    def test_get_adapter_is_not_pooled(self):
+        """get_adapter 每次都创建新实例，也不带调用锁"""
+        pooled = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        fresh = get_adapter('binance', 'spot', dict(CONFIG))
+        assert fresh is not pooled
+        assert '_pool_lock' not in vars(fresh)
+
+
+@pytest.mark.usefixtures('clean_pool')
+class TestPoolEviction:
+    """测试池化实例的回收"""
+
+    def test_evict_adapter(self):
+        """回收后同一配置得到新实例"""
+        first = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        assert evict_adapter('binance', 'spot', dict(CONFIG)) is True
+        assert evict_adapter('binance', 'spot', dict(CONFIG)) is False
+        assert get_pooled_adapter('binance', 'spot', dict(CONFIG)) is not first
+
+    def test_evict_exchange_adapters(self):
+        """只回收指定交易所的实例"""
+        get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        get_pooled_adapter('binance', 'futures', dict(CONFIG))
+        okx_config = {**CONFIG, 'password': 'p'}
+        okx = get_pooled_adapter('okx', 'spot', okx_config)
+
+        assert evict_exchange_adapters('binance') == 2
+        assert len(exchange_adapters._ADAPTER_POOL) == 1
+        assert get_pooled_adapter('okx', 'spot', okx_config) is okx
+
+    def test_evict_idle_adapters(self):
+        """只回收超过空闲时间的实例"""
+        idle = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        active = get_pooled_adapter('binance', 'futures', dict(CONFIG))
+        key = next(k for k, (_, adapter) in exchange_adapters._ADAPTER_POOL.items() if adapter is idle)
+        exchange_adapters._ADAPTER_POOL[key] = (time.time() - 1000, idle)
+
+        assert evict_idle_adapters(max_idle=600) == 1
+        assert get_pooled_adapter('binance', 'futures', dict(CONFIG)) is active
+        assert get_pooled_adapter('binance', 'spot', dict(CONFIG)) is not idle
+
+
+@pytest.mark.usefixtures('clean_pool')
+class TestPoolLock:
+    """测试池化实例的调用锁"""
+
+    def test_pooled_ccxt_adapter_calls_are_serialized(self):
+        """多个线程通过 call_locked 调用同一实例时不会并发进入交易所方法"""
+        adapter = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        active = []
+        overlaps = []
+
+        def slow_call():
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+        threads = [threading.Thread(target=call_locked, args=(adapter, slow_call)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == []
+
+    def test_lock_is_reentrant(self):
+        """持锁期间再次获取不会死锁（适配器方法内部可能嵌套调用）"""
+        adapter = get_pooled_adapter('binance', 'spot', dict(CONFIG))
+        with adapter_lock(adapter):
+            assert call_locked(adapter, lambda: 'ok') == 'ok'
+
+    def test_unpooled_adapter_has_no_lock(self):
+        """独立实例的 adapter_lock 为空上下文"""
+        adapter = get_adapter('binance', 'spot', dict(CONFIG))
+        with adapter_lock(adapter):
+            assert call_locked(adapter, lambda: 'ok') == 'ok'
+
+
+class TestSharedAsyncAdapters:
+    """测试异步适配器的配置与复用"""
+
+    @pytest.mark.parametrize('exchange_id, market_type', [
+        ('binance', 'futures'),
+        ('okx', 'futures'),
+        ('bybit', 'spot'),
+    ])
+    def test_config_matches_sync_adapter(self, exchange_id, market_type):
+        """模板、rateLimit、defaultType 与同步适配器一致（含子类覆盖）"""
+        async def build():
+            adapter = async_default_adapter.AsyncDefaultAdapter(exchange_id, market_type, dict(CONFIG))
+            try:
+                return adapter.exchange.enableRateLimit, adapter.exchange.rateLimit, adapter.exchange.options['defaultType']
+            finally:
+                await async_default_adapter.close_shared_aiohttp_session()
+
+        adapter_class = exchange_adapters.CUSTOM_ADAPTERS.get(exchange_id, exchange_adapters.DefaultAdapter)
+        expected = adapter_class._base_exchange_config(exchange_id, market_type, CONFIG)
+        enable_rate_limit, rate_limit, default_type = asyncio.run(build())
+
+        assert enable_rate_limit is True
+        assert default_type == expected['options']['defaultType']
+        if 'rateLimit' in expected:
+            assert rate_limit == expected['rateLimit']
+
+    def test_idle_adapters_are_evicted_and_closed(self):
+        """空闲超过 ADAPTER_POOL_IDLE_TTL 的实例在下一次获取时被回收并关闭"""
+        async def scenario():
+            try:
+                idle = async_default_adapter.get_shared_async_adapter('bybit', 'spot', dict(CONFIG))
+                loop = asyncio.get_running_loop()
+                adapters = async_default_adapter._shared_adapters[loop]
+                key = next(k for k, (_, adapter) in adapters.items() if adapter is idle)
+                adapters[key] = (time.time() - exchange_adapters.ADAPTER_POOL_IDLE_TTL - 1, idle)
+
+                with patch.object(idle, 'close', wraps=idle.close) as close:
+                    active = async_default_adapter.get_shared_async_adapter('bybit', 'futures', dict(CONFIG))
+                    await asyncio.gather(*async_default_adapter._closing_tasks)
+                    assert close.await_count == 1
+
+                assert [adapter for _, adapter in adapters.values()] == [active]
+                assert async_default_adapter.get_shared_async_adapter('bybit', 'spot', dict(CONFIG)) is not idle
+            finally:
+                await async_default_adapter.close_shared_aiohttp_session()
+
+        asyncio.run(scenario())
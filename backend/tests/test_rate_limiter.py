@@ -0,0 +1,88 @@
+"""
+测试交易所 REST 调用限流
+
+验证点：
+1. 只按 CCXT 异常类型识别限频错误，消息中碰巧包含 429 的普通错误不算
+2. 适配器查询接口不吞掉限频错误，call_with_rate_limit 能退避重试
+3. 批量价格接口限频时不再逐个交易对请求
+"""
+
+from unittest.mock import MagicMock, patch
+
+import ccxt
+import pytest
+
+from exchange_adapters import get_adapter
+from services import rate_limiter
+from services.rate_limiter import call_with_rate_limit, is_rate_limit_error
+
+
+@pytest.fixture
+def adapter():
+    """不发起网络请求的 Binance 现货适配器"""
+    with patch('ccxt.binance') as mock_exchange_class:
+        exchange = MagicMock()
+        exchange.markets = {'BTC/USDT': {}, 'ETH/USDT': {}}
+        exchange.has = {'fetchTickers': True}
+        mock_exchange_class.return_value = exchange
+        yield get_adapter('binance', 'spot', {'apiKey': 'k', 'secret': 's'})
+
+
+@pytest.fixture(autouse=True)
+def no_backoff_sleep():
+    """退避等待置零，避免测试变慢"""
+    with patch.object(rate_limiter, '_backoff_delay', return_value=0):
+        yield
+
+
+class TestRateLimitDetection:
+    """测试限频错误识别"""
+
+    @pytest.mark.parametrize('error', [
+        ccxt.RateLimitExceeded('binance {"code":-1003}'),
+        ccxt.DDoSProtection('429 Too Many Requests'),
+    ])
+    def test_ccxt_rate_limit_errors(self, error):
+        assert is_rate_limit_error(error) is True
+
+    @pytest.mark.parametrize('error', [
+        ccxt.InvalidOrder('price 64290.5 is invalid'),
+        ValueError('order 1003429 not found'),
+    ])
+    def test_messages_containing_digits_are_not_rate_limits(self, error):
+        assert is_rate_limit_error(error) is False
+
+
+class TestAdapterRetry:
+    """测试适配器查询接口与限流器的配合"""
+
+    def test_fetch_klines_is_retried_after_rate_limit(self, adapter):
+        """fetch_ohlcv 触发限频时由 call_with_rate_limit 重试，而不是返回空列表"""
+        candles = [[1, 2, 3, 4, 5, 6]]
+        adapter.exchange.fetch_ohlcv.side_effect = [ccxt.RateLimitExceeded('429'), candles]
+
+        assert call_with_rate_limit('binance', adapter.fetch_klines, 'BTC/USDT') == candles
+        assert adapter.exchange.fetch_ohlcv.call_count == 2
+
+    def test_rate_limit_propagates_when_retries_exhausted(self, adapter):
+        """重试耗尽后抛出原异常"""
+        adapter.exchange.fetch_ohlcv.side_effect = ccxt.RateLimitExceeded('429')
+
+        with pytest.raises(ccxt.RateLimitExceeded):
+            call_with_rate_limit('binance', adapter.fetch_klines, 'BTC/USDT', retries=1)
+        assert adapter.exchange.fetch_ohlcv.call_count == 2
+
+    def test_other_errors_still_return_empty(self, adapter):
+        """非限频错误保持原有行为：记录日志并返回空结果"""
+        adapter.exchange.fetch_ohlcv.side_effect = ccxt.ExchangeError('bad symbol')
+
+        assert call_with_rate_limit('binance', adapter.fetch_klines, 'BTC/USDT') == []
+        assert adapter.exchange.fetch_ohlcv.call_count == 1
+
+    def test_fetch_prices_does_not_fall_back_per_symbol_on_rate_limit(self, adapter):
+        """批量 ticker 限频时直接抛出，不再逐个请求 fetch_ticker"""
+        adapter.exchange.fetch_tickers.side_effect = ccxt.RateLimitExceeded('429')
+
+        with pytest.raises(ccxt.RateLimitExceeded):
+            adapter.fetch_prices(['BTC/USDT', 'ETH/USDT'])
+        adapter.exchange.fetch_ticker.assert_not_called()
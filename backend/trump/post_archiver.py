@@ -15,6 +15,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import re
 import os
+from itertools import islice
 from pathlib import Path
 
 # 配置日志
@@ -38,10 +39,12 @@ class TrumpPostArchiver:
         base_dir = Path(__file__).parent
         self.archive_file = archive_file or str(base_dir / 'trump_posts_archive.json')
         self.posts_dict = {}  # 使用字典存储，key为post_id
+        self._sorted_posts = None  # 按时间倒序的帖子列表，存档变化时置空
         self.load_archive()
     
     def load_archive(self):
         """加载已存档的帖子"""
+        self._sorted_posts = None
         try:
             if os.path.exists(self.archive_file):
                 with open(self.archive_file, 'r', encoding='utf-8') as f:
@@ -168,6 +171,9 @@ class TrumpPostArchiver:
                     self.posts_dict[post_id].update(post_data)
                     updated_count += 1
         
+        if new_count or updated_count:
+            self._sorted_posts = None
+        
         self.save_archive()
         return new_count
     
@@ -227,11 +233,26 @@ class TrumpPostArchiver:
         print(f"📊 存档总数: {len(self.posts_dict)}")
         print("=" * 80 + "\n")
     
+    def _get_sorted_posts(self) -> List[Dict]:
+        """按时间倒序的帖子列表（存档未变化时直接复用）"""
+        posts = self._sorted_posts
+        if posts is None:
+            posts = list(self.posts_dict.values())
+            posts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+            self._sorted_posts = posts
+        return posts
+    
     def get_all_posts(self) -> List[Dict]:
         """获取所有帖子（按时间倒序）"""
-        posts = list(self.posts_dict.values())
-        posts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        return posts
+        return list(self._get_sorted_posts())
+    
+    def get_posts(self, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """分页获取帖子（按时间倒序）"""
+        return list(islice(self._get_sorted_posts(), offset, offset + limit))
+    
+    def count_posts(self) -> int:
+        """帖子总数"""
+        return len(self.posts_dict)
     
     def get_post_by_id(self, post_id: str) -> Optional[Dict]:
         """根据ID获取帖子"""
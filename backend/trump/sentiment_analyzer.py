@@ -15,6 +15,7 @@ import re
 from datetime import datetime
 from typing import Dict, Optional, List, Tuple
 import os
+from itertools import islice
 from pathlib import Path
 
 # 设置日志
@@ -94,6 +95,11 @@ class TrumpSentimentAnalyzer:
         
         # 加载分析结果
         self.analyses = {}
+        # 按时间倒序、按情绪分桶的列表视图 {None(全部)/'bullish'/'bearish'/'neutral': [...]}
+        # 分析结果变化时置空，下次查询时重建
+        self._views = None
+        # 统计计数（随分析结果增量更新，get_statistics 直接读取）
+        self._counts = {}
         self.load_analyses()
         
         # 统计信息
@@ -147,6 +153,7 @@ class TrumpSentimentAnalyzer:
     
     def load_analyses(self):
         """加载已有的分析结果"""
+        self._views = None
         try:
             if os.path.exists(self.output_file):
                 with open(self.output_file, 'r', encoding='utf-8') as f:
@@ -157,6 +164,37 @@ class TrumpSentimentAnalyzer:
         except Exception as e:
             logger.error(f"❌ 加载分析结果失败: {e}")
             self.analyses = {}
+        
+        self._rebuild_counts()
+    
+    def _rebuild_counts(self):
+        """根据全部分析结果重建统计计数（仅在整体加载时调用）"""
+        self._counts = {
+            'bullish': 0,
+            'bearish': 0,
+            'neutral': 0,
+            'high_risk': 0,
+            'total_stars': 0,
+            'emotion_distribution': {},
+            'last_updated': None,
+        }
+        for analysis in list(self.analyses.values()):
+            self._count_analysis(analysis)
+    
+    def _count_analysis(self, analysis: Dict):
+        """将一条新的分析结果计入统计"""
+        counts = self._counts
+        counts[self._sentiment_of(analysis)] += 1
+        if analysis.get('is_high_risk', False):
+            counts['high_risk'] += 1
+        counts['total_stars'] += analysis['analysis'].get('rating_stars', 3)
+        
+        emotion = analysis['analysis'].get('emotion', '未知')
+        counts['emotion_distribution'][emotion] = counts['emotion_distribution'].get(emotion, 0) + 1
+        
+        analyzed_at = analysis.get('analyzed_at')
+        if analyzed_at and (counts['last_updated'] is None or analyzed_at > counts['last_updated']):
+            counts['last_updated'] = analyzed_at
     
     def save_analyses(self):
         """保存分析结果"""
@@ -397,6 +435,8 @@ class TrumpSentimentAnalyzer:
                     'analyzed_at': datetime.now().isoformat(),
                     'retry_count': 0
                 }
+                self._views = None
+                self._count_analysis(self.analyses[post_id])
                 
                 self.stats['success_count'] += 1
                 self.stats['last_analysis_time'] = datetime.now().isoformat()
@@ -496,11 +536,49 @@ class TrumpSentimentAnalyzer:
             logger.error(f"❌ 监控出错: {e}")
             self.save_analyses()
     
+    @staticmethod
+    def _sentiment_of(analysis: Dict) -> str:
+        """分析结果的情绪类型：bullish/bearish/neutral"""
+        is_bullish = analysis['analysis'].get('is_bullish')
+        if is_bullish is True:
+            return 'bullish'
+        if is_bullish is False:
+            return 'bearish'
+        return 'neutral'
+    
+    def _get_views(self) -> Dict[Optional[str], List[Dict]]:
+        """获取排序分桶视图（结果未变化时直接复用）"""
+        views = self._views
+        if views is None:
+            analyses_list = list(self.analyses.values())
+            analyses_list.sort(key=lambda x: x.get('post_timestamp', ''), reverse=True)
+            views = {None: analyses_list, 'bullish': [], 'bearish': [], 'neutral': []}
+            for analysis in analyses_list:
+                views[self._sentiment_of(analysis)].append(analysis)
+            self._views = views
+        return views
+    
+    def get_analyses(self, offset: int = 0, limit: int = 100, sentiment_type: Optional[str] = None) -> List[Dict]:
+        """
+        分页获取分析结果（按时间倒序）
+        
+        Args:
+            offset: 偏移量
+            limit: 返回数量
+            sentiment_type: 情绪类型筛选（bullish/bearish/neutral），其他值不筛选
+        """
+        views = self._get_views()
+        bucket = views.get(sentiment_type, views[None])
+        return list(islice(bucket, offset, offset + limit))
+    
+    def count_analyses(self, sentiment_type: Optional[str] = None) -> int:
+        """分析结果数量（可按情绪类型筛选）"""
+        views = self._get_views()
+        return len(views.get(sentiment_type, views[None]))
+    
     def get_all_analyses(self) -> List[Dict]:
         """获取所有分析结果（按时间倒序）"""
-        analyses_list = list(self.analyses.values())
-        analyses_list.sort(key=lambda x: x.get('post_timestamp', ''), reverse=True)
-        return analyses_list
+        return list(self._get_views()[None])
     
     def get_analysis_by_id(self, post_id: str) -> Optional[Dict]:
         """根据ID获取分析结果"""
@@ -520,40 +598,20 @@ class TrumpSentimentAnalyzer:
                 'last_updated': None
             }
         
-        analyses_list = list(self.analyses.values())
-        
-        # 统计利好/利空/中性
-        bullish_count = sum(1 for a in analyses_list if a['analysis'].get('is_bullish') is True)
-        bearish_count = sum(1 for a in analyses_list if a['analysis'].get('is_bullish') is False)
-        neutral_count = len(analyses_list) - bullish_count - bearish_count
-        
-        # 统计高风险帖子数量
-        high_risk_count = sum(1 for a in analyses_list if a.get('is_high_risk', False))
-        
-        # 计算平均星级
-        total_stars = sum(a['analysis'].get('rating_stars', 3) for a in analyses_list)
-        average_rating = total_stars / len(analyses_list) if analyses_list else 0
-        
-        # 情绪分布
-        emotion_distribution = {}
-        for analysis in analyses_list:
-            emotion = analysis['analysis'].get('emotion', '未知')
-            emotion_distribution[emotion] = emotion_distribution.get(emotion, 0) + 1
-        
-        # 获取最新更新时间
-        timestamps = [a.get('analyzed_at') for a in analyses_list if a.get('analyzed_at')]
-        last_updated = max(timestamps) if timestamps else None
+        counts = self._counts
+        total = len(self.analyses)
+        high_risk_count = counts['high_risk']
         
         return {
-            'total_analyzed': len(analyses_list),
-            'bullish_count': bullish_count,
-            'bearish_count': bearish_count,
-            'neutral_count': neutral_count,
+            'total_analyzed': total,
+            'bullish_count': counts['bullish'],
+            'bearish_count': counts['bearish'],
+            'neutral_count': counts['neutral'],
             'high_risk_count': high_risk_count,  # 新增：高风险帖子数量
-            'high_risk_percentage': round(high_risk_count / len(analyses_list) * 100, 2) if analyses_list else 0,
-            'average_rating': round(average_rating, 2),
-            'emotion_distribution': emotion_distribution,
-            'last_updated': last_updated,
+            'high_risk_percentage': round(high_risk_count / total * 100, 2),
+            'average_rating': round(counts['total_stars'] / total, 2),
+            'emotion_distribution': dict(counts['emotion_distribution']),
+            'last_updated': counts['last_updated'],
             'success_rate': round(self.stats['success_count'] / max(self.stats['total_analyzed'], 1) * 100, 2) if self.stats['total_analyzed'] > 0 else 0
         }
 
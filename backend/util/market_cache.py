@@ -11,25 +11,40 @@ import json
 import os
 import time
 import logging
-from typing import Dict, Optional
+import threading
+from typing import Dict, Optional, Tuple
 from pathlib import Path
 
+# 可选：orjson 序列化/解析市场数据更快，未安装时回退到标准库 json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 
 class MarketCache:
     """市场数据缓存管理器"""
     
-    def __init__(self, cache_dir: str = "data/market_cache", cache_ttl: int = 86400):
+    def __init__(self, cache_dir: str = "data/market_cache", cache_ttl: int = 86400, memory_ttl: int = 300):
         """
         初始化缓存管理器
         
         Args:
             cache_dir: 缓存目录路径
             cache_ttl: 缓存过期时间（秒），默认 86400 秒（24小时）
+            memory_ttl: 内存缓存过期时间（秒），默认 300 秒
         """
         self.cache_dir = Path(cache_dir)
         self.cache_ttl = cache_ttl
+        self.memory_ttl = memory_ttl
+        
+        # 内存缓存 {exchange_id: (缓存时间, 市场数据)}，位于文件缓存之前
+        # 有效期内重复创建适配器时跳过磁盘读取和 JSON 解析
+        self._memory: Dict[str, Tuple[float, Dict]] = {}
+        self._memory_lock = threading.Lock()
         
         # 创建缓存目录
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -43,6 +58,11 @@ class MarketCache:
         """获取交易所的元数据文件路径（存储缓存时间等）"""
         return self.cache_dir / f"{exchange_id}_meta.json"
     
+    def _remember(self, exchange_id: str, markets: Dict):
+        """写入内存缓存"""
+        with self._memory_lock:
+            self._memory[exchange_id] = (time.time(), markets)
+    
     def is_cache_valid(self, exchange_id: str) -> bool:
         """
         检查缓存是否有效
@@ -91,15 +111,23 @@ class MarketCache:
         Returns:
             市场数据字典，如果缓存无效返回 None
         """
+        entry = self._memory.get(exchange_id)
+        if entry and time.time() - entry[0] < self.memory_ttl:
+            return entry[1]
+        
         if not self.is_cache_valid(exchange_id):
             return None
         
         cache_file = self._get_cache_file(exchange_id)
         
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                markets = json.load(f)
+            if HAS_ORJSON:
+                markets = orjson.loads(cache_file.read_bytes())
+            else:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    markets = json.load(f)
             
+            self._remember(exchange_id, markets)
             logger.info(f"✅ 从缓存加载 {exchange_id} 市场数据 ({len(markets)} 个交易对)")
             return markets
             
@@ -123,8 +151,19 @@ class MarketCache:
         
         try:
             # 保存市场数据
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(markets, f, indent=2, ensure_ascii=False)
+            data = None
+            if HAS_ORJSON:
+                try:
+                    data = orjson.dumps(markets, option=orjson.OPT_INDENT_2)
+                except TypeError:
+                    # 含 orjson 不支持的类型（如非字符串键），回退到标准库
+                    data = None
+            
+            if data is not None:
+                cache_file.write_bytes(data)
+            else:
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    json.dump(markets, f, indent=2, ensure_ascii=False)
             
             # 保存元数据
             meta = {
@@ -136,6 +175,7 @@ class MarketCache:
             with open(meta_file, 'w', encoding='utf-8') as f:
                 json.dump(meta, f, indent=2)
             
+            self._remember(exchange_id, markets)
             logger.info(f"💾 已缓存 {exchange_id} 市场数据 ({len(markets)} 个交易对)")
             return True
             
@@ -150,6 +190,12 @@ class MarketCache:
         Args:
             exchange_id: 交易所 ID，如果为 None 则清除所有缓存
         """
+        with self._memory_lock:
+            if exchange_id:
+                self._memory.pop(exchange_id, None)
+            else:
+                self._memory.clear()
+        
         if exchange_id:
             # 清除指定交易所的缓存
             cache_file = self._get_cache_file(exchange_id)
@@ -206,6 +252,25 @@ class MarketCache:
         }
 
 
+def apply_cached_markets(exchange, markets: Dict) -> None:
+    """
+    将缓存的市场数据注入 ccxt 交易所实例
+    
+    只赋值 exchange.markets 时，markets_by_id/symbols/ids/currencies 等索引为空，
+    ccxt 会在首次调用统一接口时再重新解析一遍全部市场；
+    这里直接调用 set_markets() 一次性构建这些索引
+    
+    Args:
+        exchange: ccxt 交易所实例
+        markets: 市场数据字典
+    """
+    exchange.markets = markets
+    try:
+        exchange.set_markets(markets)
+    except Exception as e:
+        logger.warning(f"构建市场索引失败，将由 ccxt 延迟构建: {e}")
+
+
 def load_markets_with_cache(exchange, exchange_id: str, cache: MarketCache) -> Dict:
     """
     使用缓存加载市场数据（辅助函数）
@@ -223,7 +288,7 @@ def load_markets_with_cache(exchange, exchange_id: str, cache: MarketCache) -> D
     
     if markets:
         # 缓存有效，直接使用
-        exchange.markets = markets
+        apply_cached_markets(exchange, markets)
         return markets
     
     # 2. 缓存无效，从交易所加载
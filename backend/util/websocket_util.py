@@ -13,7 +13,7 @@ from typing import Dict, Set, Optional
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 import ccxt.pro as ccxtpro
-from util.market_cache import MarketCache
+from util.market_cache import MarketCache, apply_cached_markets
 from util.backpack_websocket import BackpackWebSocketClient
 
 logger = logging.getLogger(__name__)
@@ -179,7 +179,7 @@ class WebSocketManager:
                 # 尝试从缓存加载
                 cached_markets = self.market_cache.load_from_cache(exchange_name)
                 if cached_markets:
-                    exchange.markets = cached_markets
+                    apply_cached_markets(exchange, cached_markets)
                     logger.info(f"✅ {exchange_name} (pro-{market_type}) 已从缓存加载市场数据")
                 else:
                     await exchange.load_markets()
@@ -317,10 +317,12 @@ class WebSocketManager:
                         if subscription_key in self.subscriptions:
                             subscribers = self.subscriptions[subscription_key]
                             
+                            # 每条消息只序列化一次，所有订阅者共享同一个字符串
+                            payload = json.dumps(message)
                             disconnected = set()
                             for client in subscribers:
                                 try:
-                                    await client.send_text(json.dumps(message))
+                                    await client.send_text(payload)
                                 except:
                                     disconnected.add(client)
                             
@@ -414,10 +416,11 @@ class WebSocketManager:
                         if subscription_key in self.subscriptions:
                             subscribers = self.subscriptions[subscription_key]
                             
+                            payload = json.dumps(message)
                             disconnected = set()
                             for client in subscribers:
                                 try:
-                                    await client.send_text(json.dumps(message))
+                                    await client.send_text(payload)
                                 except:
                                     disconnected.add(client)
                             
@@ -510,10 +513,11 @@ class WebSocketManager:
                         if subscription_key in self.subscriptions:
                             subscribers = self.subscriptions[subscription_key]
                             
+                            payload = json.dumps(message)
                             disconnected = set()
                             for client in subscribers:
                                 try:
-                                    await client.send_text(json.dumps(message))
+                                    await client.send_text(payload)
                                 except:
                                     disconnected.add(client)
                             
@@ -946,10 +950,11 @@ class WebSocketManager:
             subscribers = self.subscriptions[subscription_key]
             logger.debug(f"🔍 精准推送给 {len(subscribers)} 个订阅者 - {subscription_key}")
             
+            payload = json.dumps(message)
             disconnected = set()
             for client in subscribers:
                 try:
-                    await client.send_text(json.dumps(message))
+                    await client.send_text(payload)
                     logger.debug(f"✅ 已发送消息给订阅者: {message['type']}")
                 except Exception as e:
                     logger.error(f"❌ 发送消息失败: {e}")